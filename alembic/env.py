@@ -8,6 +8,12 @@ from alembic import context
 from app.config import settings
 from app.database import Base
 from app.models.claim import Claim  # noqa: F401 — register model metadata
+from app.models.claim_counter import ClaimCounter  # noqa: F401
+from app.models import reference  # noqa: F401
+from app.models.ingest_checkpoint import IngestCheckpoint  # noqa: F401
+from app.models.benefit_accumulator import BenefitAccumulator  # noqa: F401
+from app.models.cost_stat import CostStat  # noqa: F401
+from app.services.claim_partitions import is_partition
 
 config = context.config
 config.set_main_option("sqlalchemy.url", settings.database_url)
@@ -18,11 +24,26 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names) -> bool:
+    # Partitions of claims come and go with app.archive.
+    return not (type_ == "table" and is_partition(name))
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    # Indexes the models create on one dialect only (Index.ddl_if).
+    ddl_if = getattr(obj, "_ddl_if", None)
+    if type_ == "index" and ddl_if is not None and ddl_if.dialect is not None:
+        return ddl_if.dialect == context.get_context().dialect.name
+    return True
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -31,7 +52,12 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=include_object,
+    )
     with context.begin_transaction():
         context.run_migrations()
 
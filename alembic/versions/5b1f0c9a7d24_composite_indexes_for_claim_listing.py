@@ -0,0 +1,56 @@
+"""composite indexes for claim listing
+
+Revision ID: 5b1f0c9a7d24
+Revises: e48dab523573
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1f0c9a7d24'
+down_revision: Union[str, Sequence[str], None] = 'e48dab523573'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built CONCURRENTLY on PostgreSQL so large tables keep taking writes;
+    # that cannot run inside a transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_claims_created_at_id', 'claims', ['created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_claims_member_id_created_at', 'claims',
+            ['member_id', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_claims_status_created_at', 'claims',
+            ['status', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_claims_fraud_created_at', 'claims', ['created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+            postgresql_where=sa.text('fraud_flag = true'),
+            sqlite_where=sa.text('fraud_flag = 1'),
+        )
+    # Leading column of ix_claims_member_id_created_at; now redundant.
+    op.drop_index('ix_claims_member_id', table_name='claims')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_claims_member_id', 'claims', ['member_id'], unique=False)
+    op.drop_index('ix_claims_fraud_created_at', table_name='claims')
+    op.drop_index('ix_claims_status_created_at', table_name='claims')
+    op.drop_index('ix_claims_member_id_created_at', table_name='claims')
+    op.drop_index('ix_claims_created_at_id', table_name='claims')
@@ -0,0 +1,46 @@
+"""claim counters rollup
+
+Revision ID: 8c3e2d41f6a9
+Revises: 5b1f0c9a7d24
+Create Date: 2026-10-17 11:40:03.527716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3e2d41f6a9'
+down_revision: Union[str, Sequence[str], None] = '5b1f0c9a7d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('claim_counters',
+    sa.Column('member_id', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('fraud_flag', sa.Boolean(), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('member_id', 'status', 'fraud_flag', 'shard')
+    )
+    # Backfill from existing claims; '' rows are the all-member totals.
+    op.execute(
+        "INSERT INTO claim_counters (member_id, status, fraud_flag, shard, count) "
+        "SELECT member_id, status, fraud_flag, 0, count(*) FROM claims "
+        "GROUP BY member_id, status, fraud_flag"
+    )
+    op.execute(
+        "INSERT INTO claim_counters (member_id, status, fraud_flag, shard, count) "
+        "SELECT '', status, fraud_flag, 0, count(*) FROM claims "
+        "GROUP BY status, fraud_flag"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('claim_counters')
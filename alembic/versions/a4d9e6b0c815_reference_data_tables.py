@@ -0,0 +1,83 @@
+"""reference data tables
+
+Revision ID: a4d9e6b0c815
+Revises: 8c3e2d41f6a9
+Create Date: 2026-10-17 14:05:51.902317
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services import mock_data
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d9e6b0c815'
+down_revision: Union[str, Sequence[str], None] = '8c3e2d41f6a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    members = op.create_table('members',
+    sa.Column('member_id', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.PrimaryKeyConstraint('member_id')
+    )
+    providers = op.create_table('providers',
+    sa.Column('provider_id', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('type', sa.String(length=30), nullable=False),
+    sa.PrimaryKeyConstraint('provider_id')
+    )
+    benefit_limits = op.create_table('benefit_limits',
+    sa.Column('diagnosis_code', sa.String(length=20), nullable=False),
+    sa.Column('limit_amount', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('diagnosis_code')
+    )
+    procedure_costs = op.create_table('procedure_costs',
+    sa.Column('procedure_code', sa.String(length=20), nullable=False),
+    sa.Column('avg_cost', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('procedure_code')
+    )
+    version = op.create_table('reference_data_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Seed with the data that used to be hard-coded in mock_data.
+    op.bulk_insert(members, [
+        {'member_id': m, 'name': info['name'], 'status': info['status']}
+        for m, info in mock_data.MEMBERS.items()
+    ])
+    op.bulk_insert(providers, [
+        {'provider_id': p, 'name': info['name'], 'type': info['type']}
+        for p, info in mock_data.PROVIDERS.items()
+    ])
+    op.bulk_insert(benefit_limits, [
+        {'diagnosis_code': d, 'limit_amount': limit}
+        for d, limit in mock_data.BENEFIT_LIMITS.items()
+    ])
+    op.bulk_insert(procedure_costs, [
+        {'procedure_code': p, 'avg_cost': cost}
+        for p, cost in mock_data.PROCEDURE_AVG_COSTS.items()
+    ])
+    op.bulk_insert(version, [
+        {'id': 1, 'version': 1, 'updated_at': datetime.now(timezone.utc)}
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('reference_data_version')
+    op.drop_table('procedure_costs')
+    op.drop_table('benefit_limits')
+    op.drop_table('providers')
+    op.drop_table('members')
@@ -0,0 +1,32 @@
+"""claim fingerprints
+
+Revision ID: a7c4e9b2d318
+Revises: f3a6c1d9e852
+Create Date: 2026-10-17 22:41:09.518627
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e9b2d318'
+down_revision: Union[str, Sequence[str], None] = 'f3a6c1d9e852'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('claims', sa.Column('service_date', sa.Date(), nullable=True))
+    op.add_column('claims', sa.Column('fingerprint', sa.String(length=32), nullable=True))
+    op.create_index('ux_claims_fingerprint', 'claims', ['fingerprint'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_claims_fingerprint', table_name='claims')
+    op.drop_column('claims', 'fingerprint')
+    op.drop_column('claims', 'service_date')
@@ -0,0 +1,204 @@
+"""compact claim storage
+
+Amounts become integer cents, status a smallint code, ids 16-byte UUIDs
+(native uuid on PostgreSQL) and rejection_reasons JSON (JSONB on
+PostgreSQL); see app.models.types. PostgreSQL converts in place with
+ALTER COLUMN ... USING. SQLite cannot change column types, so claims is
+copied into a new table in chunks (its ids need converting in Python).
+
+Revision ID: b5e8d3c7a912
+Revises: a7c4e9b2d318
+Create Date: 2026-10-17 09:12:44.301257
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8d3c7a912'
+down_revision: Union[str, Sequence[str], None] = 'a7c4e9b2d318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUS_CODES = {'PENDING': 0, 'APPROVED': 1, 'PARTIAL': 2, 'REJECTED': 3}
+COPY_CHUNK = 10_000
+
+TO_CODE = 'CASE status ' + ' '.join(
+    f"WHEN '{name}' THEN {code}" for name, code in STATUS_CODES.items()
+) + ' END'
+TO_NAME = 'CASE status ' + ' '.join(
+    f"WHEN {code} THEN '{name}'" for name, code in STATUS_CODES.items()
+) + ' END'
+
+
+def _claims_table(name: str, compact: bool) -> sa.Table:
+    if compact:
+        id_type, amount, status, reasons = (
+            sa.LargeBinary(16), sa.BigInteger(), sa.SmallInteger(),
+            sa.JSON(none_as_null=True),
+        )
+    else:
+        id_type, amount, status, reasons = (
+            sa.String(36), sa.Float(), sa.String(20), sa.Text()
+        )
+    return sa.Table(
+        name,
+        sa.MetaData(),
+        sa.Column('id', id_type, primary_key=True),
+        sa.Column('member_id', sa.String(50), nullable=False),
+        sa.Column('provider_id', sa.String(50), nullable=False),
+        sa.Column('diagnosis_code', sa.String(20), nullable=False),
+        sa.Column('procedure_code', sa.String(20), nullable=False),
+        sa.Column('claim_amount', amount, nullable=False),
+        sa.Column('service_date', sa.Date(), nullable=True),
+        sa.Column('fingerprint', sa.String(32), nullable=True),
+        sa.Column('status', status, nullable=False),
+        sa.Column('fraud_flag', sa.Boolean(), nullable=False),
+        sa.Column('approved_amount', amount, nullable=False),
+        sa.Column('rejection_reasons', reasons, nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def _create_claim_indexes() -> None:
+    op.create_index('ix_claims_provider_id', 'claims', ['provider_id'])
+    op.create_index('ix_claims_created_at_id', 'claims', ['created_at', 'id'])
+    op.create_index(
+        'ix_claims_member_id_created_at', 'claims', ['member_id', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_claims_status_created_at', 'claims', ['status', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_claims_fraud_created_at',
+        'claims',
+        ['created_at', 'id'],
+        sqlite_where=sa.text('fraud_flag = 1'),
+    )
+    op.create_index('ux_claims_fingerprint', 'claims', ['fingerprint'], unique=True)
+
+
+def _to_compact(row: dict) -> dict:
+    reasons = row['rejection_reasons']
+    return {
+        **row,
+        'id': bytes.fromhex(row['id'].replace('-', '')),
+        'claim_amount': round(row['claim_amount'] * 100),
+        'approved_amount': (
+            None if row['approved_amount'] is None
+            else round(row['approved_amount'] * 100)
+        ),
+        'status': STATUS_CODES[row['status']],
+        'rejection_reasons': json.loads(reasons) if reasons else None,
+    }
+
+
+def _to_legacy(row: dict) -> dict:
+    h = row['id'].hex()
+    reasons = row['rejection_reasons']
+    return {
+        **row,
+        'id': f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}',
+        'claim_amount': row['claim_amount'] / 100,
+        'approved_amount': (
+            None if row['approved_amount'] is None
+            else row['approved_amount'] / 100
+        ),
+        'status': {code: name for name, code in STATUS_CODES.items()}[row['status']],
+        'rejection_reasons': json.dumps(reasons) if reasons else None,
+    }
+
+
+def _rebuild_sqlite_claims(compact: bool) -> None:
+    bind = op.get_bind()
+    old = _claims_table('claims', not compact)
+    new = _claims_table('claims_rebuilt', compact)
+    convert = _to_compact if compact else _to_legacy
+    new.create(bind)
+    last = 0
+    while True:
+        rows = bind.execute(
+            sa.select(sa.literal_column('rowid'), *old.c)
+            .where(sa.literal_column('rowid') > last)
+            .order_by(sa.literal_column('rowid'))
+            .limit(COPY_CHUNK)
+        ).all()
+        if not rows:
+            break
+        last = rows[-1][0]
+        bind.execute(
+            new.insert(),
+            [convert(dict(zip(old.c.keys(), row[1:]))) for row in rows],
+        )
+    op.drop_table('claims')
+    op.rename_table('claims_rebuilt', 'claims')
+    _create_claim_indexes()
+
+
+def _rebuild_sqlite_counters(status_expr: str, status_type) -> None:
+    op.create_table('claim_counters_rebuilt',
+    sa.Column('member_id', sa.String(length=50), nullable=False),
+    sa.Column('status', status_type, nullable=False),
+    sa.Column('fraud_flag', sa.Boolean(), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('member_id', 'status', 'fraud_flag', 'shard')
+    )
+    op.execute(
+        'INSERT INTO claim_counters_rebuilt '
+        '(member_id, status, fraud_flag, shard, count) '
+        f'SELECT member_id, {status_expr}, fraud_flag, shard, count FROM claim_counters'
+    )
+    op.drop_table('claim_counters')
+    op.rename_table('claim_counters_rebuilt', 'claim_counters')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            'ALTER TABLE claims '
+            'ALTER COLUMN id TYPE uuid USING id::uuid, '
+            'ALTER COLUMN claim_amount TYPE bigint '
+            'USING round(claim_amount * 100)::bigint, '
+            'ALTER COLUMN approved_amount TYPE bigint '
+            'USING round(approved_amount * 100)::bigint, '
+            f'ALTER COLUMN status TYPE smallint USING {TO_CODE}, '
+            'ALTER COLUMN rejection_reasons TYPE jsonb '
+            'USING rejection_reasons::jsonb'
+        )
+        op.execute(
+            'ALTER TABLE claim_counters '
+            f'ALTER COLUMN status TYPE smallint USING {TO_CODE}'
+        )
+        return
+    _rebuild_sqlite_claims(compact=True)
+    _rebuild_sqlite_counters(TO_CODE, sa.SmallInteger())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            'ALTER TABLE claims '
+            'ALTER COLUMN id TYPE varchar(36) USING id::text, '
+            'ALTER COLUMN claim_amount TYPE double precision '
+            'USING claim_amount / 100.0, '
+            'ALTER COLUMN approved_amount TYPE double precision '
+            'USING approved_amount / 100.0, '
+            f'ALTER COLUMN status TYPE varchar(20) USING {TO_NAME}, '
+            'ALTER COLUMN rejection_reasons TYPE text '
+            'USING rejection_reasons::text'
+        )
+        op.execute(
+            'ALTER TABLE claim_counters '
+            f'ALTER COLUMN status TYPE varchar(20) USING {TO_NAME}'
+        )
+        return
+    _rebuild_sqlite_claims(compact=False)
+    _rebuild_sqlite_counters(TO_NAME, sa.String(length=20))
@@ -0,0 +1,148 @@
+"""partition claims by month
+
+PostgreSQL only: claims becomes a table partitioned by range on
+created_at, one partition per month (claims_YYYY_MM) from the oldest
+claim to CLAIM_PARTITIONS_AHEAD months from now, plus claims_default;
+see app.services.claim_partitions. The rows are copied into the new
+table, so claims is unavailable while this runs. The primary key
+becomes (id, created_at) and the fingerprint index is unique per
+partition, as PostgreSQL requires unique indexes to include the
+partition key. created_at and updated_at become timestamptz, as the
+model declares them (the first migration made them timestamp); the
+stored values are UTC. SQLite is left as it is.
+
+Revision ID: c6d2a8f4e157
+Revises: b5e8d3c7a912
+Create Date: 2026-10-17 14:03:27.815390
+
+"""
+import os
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6d2a8f4e157'
+down_revision: Union[str, Sequence[str], None] = 'b5e8d3c7a912'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_AHEAD = int(os.getenv('CLAIM_PARTITIONS_AHEAD', '3'))
+CLAIM_INDEXES = (
+    'ix_claims_provider_id',
+    'ix_claims_created_at_id',
+    'ix_claims_member_id_created_at',
+    'ix_claims_status_created_at',
+    'ix_claims_fraud_created_at',
+)
+
+
+def _create_claim_indexes() -> None:
+    op.create_index('ix_claims_provider_id', 'claims', ['provider_id'])
+    op.create_index('ix_claims_created_at_id', 'claims', ['created_at', 'id'])
+    op.create_index(
+        'ix_claims_member_id_created_at', 'claims', ['member_id', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_claims_status_created_at', 'claims', ['status', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_claims_fraud_created_at',
+        'claims',
+        ['created_at', 'id'],
+        postgresql_where=sa.text('fraud_flag = true'),
+    )
+
+
+def _month_start(at: datetime) -> datetime:
+    at = at.astimezone(timezone.utc)
+    return datetime(at.year, at.month, 1, tzinfo=timezone.utc)
+
+
+def _add_months(start: datetime, months: int) -> datetime:
+    index = start.year * 12 + start.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _create_partition(name: str, bounds: str) -> None:
+    op.execute(f'CREATE TABLE {name} PARTITION OF claims {bounds}')
+    op.execute(f'CREATE UNIQUE INDEX {name}_fingerprint_key ON {name} (fingerprint)')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute('ALTER TABLE claims RENAME TO claims_unpartitioned')
+    op.execute('ALTER TABLE claims_unpartitioned DROP CONSTRAINT claims_pkey')
+    op.execute('DROP INDEX ux_claims_fingerprint')
+    for name in CLAIM_INDEXES:
+        op.execute(f'DROP INDEX {name}')
+
+    # The partition key's type cannot change later; set it on an empty copy.
+    op.execute(
+        'CREATE TEMPORARY TABLE claims_layout '
+        '(LIKE claims_unpartitioned INCLUDING DEFAULTS)'
+    )
+    op.execute(
+        'ALTER TABLE claims_layout '
+        'ALTER COLUMN created_at TYPE timestamptz, '
+        'ALTER COLUMN updated_at TYPE timestamptz'
+    )
+    op.execute(
+        'CREATE TABLE claims (LIKE claims_layout INCLUDING DEFAULTS) '
+        'PARTITION BY RANGE (created_at)'
+    )
+    op.execute('DROP TABLE claims_layout')
+    now = datetime.now(timezone.utc)
+    oldest = bind.execute(
+        sa.text('SELECT min(created_at) FROM claims_unpartitioned')
+    ).scalar()
+    if oldest is not None and oldest.tzinfo is None:
+        # Still timestamp here; the values are UTC.
+        oldest = oldest.replace(tzinfo=timezone.utc)
+    start = _month_start(min(oldest or now, now))
+    last = _add_months(_month_start(now), PARTITIONS_AHEAD)
+    while start <= last:
+        end = _add_months(start, 1)
+        _create_partition(
+            f'claims_{start:%Y_%m}',
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')",
+        )
+        start = end
+    _create_partition('claims_default', 'DEFAULT')
+
+    # Reads the timestamp columns as UTC.
+    op.execute("SET LOCAL TIME ZONE 'UTC'")
+    op.execute('INSERT INTO claims SELECT * FROM claims_unpartitioned')
+    op.execute('DROP TABLE claims_unpartitioned')
+    op.create_primary_key('claims_pkey', 'claims', ['id', 'created_at'])
+    _create_claim_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('ALTER TABLE claims RENAME TO claims_partitioned')
+    op.execute('ALTER TABLE claims_partitioned DROP CONSTRAINT claims_pkey')
+    for name in CLAIM_INDEXES:
+        op.execute(f'DROP INDEX {name}')
+
+    op.execute('CREATE TABLE claims (LIKE claims_partitioned INCLUDING DEFAULTS)')
+    op.execute(
+        'ALTER TABLE claims '
+        'ALTER COLUMN created_at TYPE timestamp, '
+        'ALTER COLUMN updated_at TYPE timestamp'
+    )
+    op.execute("SET LOCAL TIME ZONE 'UTC'")
+    op.execute('INSERT INTO claims SELECT * FROM claims_partitioned')
+    # Drops every partition with it.
+    op.execute('DROP TABLE claims_partitioned')
+    op.create_primary_key('claims_pkey', 'claims', ['id'])
+    _create_claim_indexes()
+    op.create_index('ux_claims_fingerprint', 'claims', ['fingerprint'], unique=True)
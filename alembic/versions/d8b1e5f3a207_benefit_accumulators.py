@@ -0,0 +1,66 @@
+"""benefit accumulators
+
+Revision ID: d8b1e5f3a207
+Revises: c2f7a9e4b3d1
+Create Date: 2026-10-17 19:12:45.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b1e5f3a207'
+down_revision: Union[str, Sequence[str], None] = 'c2f7a9e4b3d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('benefit_accumulators',
+    sa.Column('member_id', sa.String(length=50), nullable=False),
+    sa.Column('diagnosis_code', sa.String(length=20), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('used_amount', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('member_id', 'diagnosis_code', 'year')
+    )
+    # Backfill year-to-date usage from existing claims.
+    claims = sa.table(
+        'claims',
+        sa.column('member_id', sa.String),
+        sa.column('diagnosis_code', sa.String),
+        sa.column('approved_amount', sa.Float),
+        sa.column('created_at', sa.DateTime(timezone=True)),
+    )
+    accumulators = sa.table(
+        'benefit_accumulators',
+        sa.column('member_id', sa.String),
+        sa.column('diagnosis_code', sa.String),
+        sa.column('year', sa.Integer),
+        sa.column('used_amount', sa.Float),
+        sa.column('updated_at', sa.DateTime(timezone=True)),
+    )
+    year = sa.cast(sa.extract('year', claims.c.created_at), sa.Integer)
+    op.execute(
+        accumulators.insert().from_select(
+            ['member_id', 'diagnosis_code', 'year', 'used_amount', 'updated_at'],
+            sa.select(
+                claims.c.member_id,
+                claims.c.diagnosis_code,
+                year,
+                sa.func.sum(claims.c.approved_amount),
+                sa.func.current_timestamp(),
+            )
+            .where(claims.c.approved_amount > 0)
+            .group_by(claims.c.member_id, claims.c.diagnosis_code, year),
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('benefit_accumulators')
@@ -0,0 +1,37 @@
+"""cost stats
+
+Revision ID: f3a6c1d9e852
+Revises: d8b1e5f3a207
+Create Date: 2026-10-17 21:03:12.734190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a6c1d9e852'
+down_revision: Union[str, Sequence[str], None] = 'd8b1e5f3a207'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cost_stats',
+    sa.Column('provider_id', sa.String(length=50), nullable=False),
+    sa.Column('procedure_code', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.Column('mean', sa.Float(), nullable=False),
+    sa.Column('m2', sa.Float(), nullable=False),
+    sa.Column('sketch', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('provider_id', 'procedure_code')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cost_stats')
@@ -0,0 +1,169 @@
+"""Admission control: per-key limits and global load shedding.
+
+``AdmissionMiddleware`` runs before routing. Requests carrying a known
+``X-API-Key`` are checked, in order, against:
+
+- global load shedding (503): ``load_monitor`` keeps a smoothed DB pool
+  checkout wait and event loop lag. While either is above its threshold,
+  each request is refused with probability ``overshoot - 1`` (capped at
+  1), so the service sheds just enough to stay near the threshold
+  instead of queueing every request behind a saturated pool;
+- the key's concurrent request limit (429);
+- the key's token bucket (429).
+
+Requests without a known key pass through untouched: the route's
+``require_api_key`` answers 401, and ``/health`` and ``/metrics`` are
+never shed. A check is a dict lookup and a few float operations; the
+signals are only recomputed by the monitor task.
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+
+from app.auth import ApiClient, api_clients
+from app.config import settings
+from app.metrics import registry
+
+ADMISSION_REJECTED = registry.counter(
+    "admission_rejected_total",
+    "API requests refused before reaching a route.",
+    ("client", "reason"),
+)
+
+# Weight of the newest sample in the smoothed signals.
+SMOOTHING = 0.5
+
+
+class LoadMonitor:
+    def __init__(self, pool_wait_threshold: float, loop_lag_threshold: float) -> None:
+        self.pool_wait_threshold = pool_wait_threshold
+        self.loop_lag_threshold = loop_lag_threshold
+        self.pool_wait = 0.0
+        self.loop_lag = 0.0
+        # Probability of refusing the next request; read per request.
+        self.shed_probability = 0.0
+        self._window_pool_wait = 0.0
+
+    def observe_pool_wait(self, seconds: float) -> None:
+        """Record one pool checkout; the slowest per interval counts."""
+        if seconds > self._window_pool_wait:
+            self._window_pool_wait = seconds
+
+    def update(self, loop_lag: float) -> None:
+        """Fold in one interval's loop lag and slowest pool checkout."""
+        self.pool_wait += SMOOTHING * (self._window_pool_wait - self.pool_wait)
+        self.loop_lag += SMOOTHING * (loop_lag - self.loop_lag)
+        self._window_pool_wait = 0.0
+        overshoot = max(
+            self.pool_wait / self.pool_wait_threshold
+            if self.pool_wait_threshold
+            else 0.0,
+            self.loop_lag / self.loop_lag_threshold
+            if self.loop_lag_threshold
+            else 0.0,
+        )
+        self.shed_probability = min(1.0, max(0.0, overshoot - 1.0))
+
+    async def run(self, interval: float) -> None:
+        """Measure event loop lag as oversleep, every ``interval`` seconds."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.update(max(0.0, loop.time() - start - interval))
+
+    def reset(self) -> None:
+        self.pool_wait = self.loop_lag = self.shed_probability = 0.0
+        self._window_pool_wait = 0.0
+
+
+load_monitor = LoadMonitor(
+    pool_wait_threshold=settings.shed_pool_wait_ms / 1000,
+    loop_lag_threshold=settings.shed_loop_lag_ms / 1000,
+)
+
+
+def _load_metrics() -> list[str]:
+    return [
+        "# HELP admission_pool_wait_seconds Smoothed slowest pool checkout.",
+        "# TYPE admission_pool_wait_seconds gauge",
+        f"admission_pool_wait_seconds {load_monitor.pool_wait}",
+        "# HELP admission_loop_lag_seconds Smoothed event loop lag.",
+        "# TYPE admission_loop_lag_seconds gauge",
+        f"admission_loop_lag_seconds {load_monitor.loop_lag}",
+        "# HELP admission_shed_probability Share of API requests being shed.",
+        "# TYPE admission_shed_probability gauge",
+        f"admission_shed_probability {load_monitor.shed_probability}",
+    ]
+
+
+registry.add_collector(_load_metrics)
+
+
+def _refusal(status: int, detail: str, retry_after: float) -> tuple:
+    body = json.dumps({"detail": detail}).encode()
+    start = {
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    }
+    return start, {"type": "http.response.body", "body": body}
+
+
+class AdmissionMiddleware:
+    def __init__(
+        self,
+        app,
+        clients: dict[str, ApiClient] | None = None,
+        monitor: LoadMonitor | None = None,
+    ) -> None:
+        self.app = app
+        self.clients = api_clients if clients is None else clients
+        self.monitor = monitor or load_monitor
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        client = None
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                client = self.clients.get(value.decode("latin-1"))
+                break
+        if client is None:
+            await self.app(scope, receive, send)
+            return
+
+        refusal = self._admit(client)
+        if refusal is not None:
+            start, body = refusal
+            await send(start)
+            await send(body)
+            return
+        client.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            client.in_flight -= 1
+
+    def _admit(self, client: ApiClient) -> tuple | None:
+        shed = self.monitor.shed_probability
+        if shed and random.random() < shed:
+            ADMISSION_REJECTED.inc(client.name, "overload")
+            return _refusal(503, "Service overloaded; retry later", 1)
+        if client.max_concurrency and client.in_flight >= client.max_concurrency:
+            ADMISSION_REJECTED.inc(client.name, "concurrency")
+            return _refusal(429, "Too many concurrent requests", 1)
+        if client.bucket is not None:
+            wait = client.bucket.take(time.monotonic())
+            if wait:
+                ADMISSION_REJECTED.inc(client.name, "rate")
+                return _refusal(429, "Rate limit exceeded", wait)
+        return None
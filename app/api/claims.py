@@ -1,21 +1,50 @@
+import base64
 import json
 import logging
 import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Select, false, select, true, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.auth import require_api_key
-from app.database import get_db
+from app.config import settings
+from app.database import async_session, get_db, get_read_db, read_session_factory
 from app.models.claim import Claim
+from app.models.types import claim_id_time, is_uuid, uuid_bytes
 from app.schemas.claim import (
+    BatchClaimItemResult,
+    BatchClaimResponse,
     ClaimDetailResponse,
     ClaimRequest,
     ClaimResponse,
     PaginatedClaimsResponse,
 )
-from app.services.claim_processor import ClaimProcessor
+from app.services.adjudication_queue import QueueFull, adjudication_queue
+from app.services.benefit_accumulators import (
+    BenefitLimitExceeded,
+    accumulator_key,
+    benefit_ledger,
+)
+from app.services.claim_archive import claim_archive
+from app.services.claim_cache import claim_cache, claim_etag
+from app.services.claim_counters import count_claims
+from app.services.claim_export import (
+    MEDIA_TYPES,
+    ExportRow,
+    export_query,
+    stream_export,
+)
+from app.services.claim_processor import AdjudicationResult, ClaimProcessor
+from app.services.claim_writer import PENDING, build_claim_row, insert_claims
+from app.services.cost_stats import cost_stats
+from app.services.duplicates import claim_fingerprint, duplicate_filter
+from app.services.write_coalescer import write_coalescer
 
 logger = logging.getLogger(__name__)
 router = APIRouter(
@@ -26,11 +55,139 @@ router = APIRouter(
 
 processor = ClaimProcessor()
 
+# Attempts at a submission that lost a race with another process (benefit
+# limit spent first, or the same claim stored first); each one re-reads
+# and adjudicates again.
+SUBMIT_ATTEMPTS = 3
+
+# A claim's created_at is the time its version 7 id carries, to the
+# millisecond (app.services.claim_writer); the margin only guards clock
+# rounding.
+CLAIM_ID_TIME_SLACK = timedelta(seconds=1)
+
+
+def _apply_filters(
+    query: Select,
+    member_id: str | None,
+    status_filter: str | None,
+    fraud_flag: bool | None,
+) -> Select:
+    if member_id:
+        query = query.where(Claim.member_id == member_id)
+    if status_filter:
+        query = query.where(Claim.status == status_filter.upper())
+    if fraud_flag is not None:
+        # Rendered as a literal so the planner can match the partial
+        # fraud_flag index, which a bound parameter would not.
+        query = query.where(Claim.fraud_flag == (true() if fraud_flag else false()))
+    return query
+
+
+def _list_query(
+    member_id: str | None,
+    status_filter: str | None,
+    fraud_flag: bool | None,
+    after: tuple[datetime, str] | None = None,
+) -> Select:
+    query = _apply_filters(select(Claim), member_id, status_filter, fraud_flag)
+    query = query.order_by(Claim.created_at.desc(), Claim.id.desc())
+    if after is not None:
+        bound = tuple_(*after, types=(Claim.created_at.type, Claim.id.type))
+        query = query.where(tuple_(Claim.created_at, Claim.id) < bound)
+    return query
+
+
+def _detail_query(claim_id: str) -> Select:
+    query = select(Claim).where(Claim.id == claim_id)
+    created = claim_id_time(claim_id)
+    if created is not None:
+        # Reads only the claim's month partition on PostgreSQL.
+        query = query.where(
+            Claim.created_at >= created - CLAIM_ID_TIME_SLACK,
+            Claim.created_at < created + CLAIM_ID_TIME_SLACK,
+        )
+    return query
+
+
+def _encode_cursor(claim: Claim) -> str:
+    raw = json.dumps([claim.created_at.isoformat(), claim.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, claim_id = json.loads(raw)
+        uuid_bytes(claim_id)
+        return datetime.fromisoformat(created_at), claim_id
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from None
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _claim_response(row: dict, result: AdjudicationResult) -> ClaimResponse:
+    return ClaimResponse(
+        claim_id=row["id"],
+        status=row["status"],
+        fraud_flag=row["fraud_flag"],
+        approved_amount=row["approved_amount"],
+        rejection_reasons=result.rejection_reasons or None,
+    )
+
+
+def _adjudicate(
+    payload: ClaimRequest, now: datetime
+) -> tuple[dict, AdjudicationResult]:
+    """Adjudicate against the member's year-to-date usage and reserve the
+    approved amount; there must be no ``await`` between the two."""
+    key = accumulator_key(payload.member_id, payload.diagnosis_code, now)
+    result = processor.adjudicate(
+        member_id=payload.member_id,
+        provider_id=payload.provider_id,
+        diagnosis_code=payload.diagnosis_code,
+        procedure_code=payload.procedure_code,
+        claim_amount=payload.claim_amount,
+        ytd_used=benefit_ledger.used(key),
+    )
+    row = build_claim_row(payload, result, now)
+    benefit_ledger.reserve(row)
+    return row, result
+
+
+def _stored_claim_response(claim: Claim) -> ClaimResponse:
+    return ClaimResponse(
+        claim_id=claim.id,
+        status=claim.status,
+        fraud_flag=claim.fraud_flag,
+        approved_amount=claim.approved_amount,
+        rejection_reasons=claim.rejection_reasons or None,
+    )
+
+
+def _limit_conflict(exc: BenefitLimitExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"{exc}; retry the submission",
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
 
 def _build_detail(claim: Claim) -> ClaimDetailResponse:
-    rejection_reasons = None
-    if claim.rejection_reasons:
-        rejection_reasons = json.loads(claim.rejection_reasons)
     return ClaimDetailResponse(
         claim_id=claim.id,
         member_id=claim.member_id,
@@ -38,10 +195,11 @@ def _build_detail(claim: Claim) -> ClaimDetailResponse:
         diagnosis_code=claim.diagnosis_code,
         procedure_code=claim.procedure_code,
         claim_amount=claim.claim_amount,
+        service_date=claim.service_date,
         status=claim.status,
         fraud_flag=claim.fraud_flag,
         approved_amount=claim.approved_amount,
-        rejection_reasons=rejection_reasons,
+        rejection_reasons=claim.rejection_reasons or None,
         created_at=claim.created_at,
         updated_at=claim.updated_at,
     )
@@ -51,91 +209,360 @@ def _build_detail(claim: Claim) -> ClaimDetailResponse:
     "",
     response_model=ClaimResponse,
     status_code=status.HTTP_201_CREATED,
+    responses={
+        200: {"description": "Duplicate; the original claim is returned"},
+        202: {"description": "Stored as PENDING and queued (async=true)"},
+        503: {"description": "Adjudication queue full (async=true); see Retry-After"},
+    },
 )
 async def submit_claim(
-    payload: ClaimRequest, db: AsyncSession = Depends(get_db)
+    payload: ClaimRequest,
+    response: Response,
+    queued: bool = Query(
+        False,
+        alias="async",
+        description="Store the claim as PENDING and adjudicate it in the "
+        "background; poll GET /claims/{claim_id} for the outcome",
+    ),
+    db: AsyncSession = Depends(get_db),
 ):
-    result = processor.adjudicate(
-        member_id=payload.member_id,
-        provider_id=payload.provider_id,
-        diagnosis_code=payload.diagnosis_code,
-        procedure_code=payload.procedure_code,
-        claim_amount=payload.claim_amount,
-    )
+    if queued:
+        return await _submit_queued(payload, response, db)
+    fingerprint = claim_fingerprint(payload)
+    probe_all = False
+    for attempt in range(1, SUBMIT_ATTEMPTS + 1):
+        if fingerprint is not None:
+            existing = await duplicate_filter.find(db, [fingerprint], probe_all)
+            if existing:
+                response.status_code = status.HTTP_200_OK
+                return _stored_claim_response(existing[fingerprint])
+        now = datetime.now(timezone.utc)
+        key = accumulator_key(payload.member_id, payload.diagnosis_code, now)
+        await benefit_ledger.load([key])
+        row, result = _adjudicate(payload, now)
+        try:
+            if settings.write_coalesce_enabled:
+                await write_coalescer.submit(row)
+            else:
+                # Every column value is generated client-side, so nothing
+                # needs to be read back after the commit.
+                await insert_claims(db, [row])
+                await db.commit()
+        except BenefitLimitExceeded as exc:
+            await db.rollback()
+            if attempt == SUBMIT_ATTEMPTS:
+                raise _limit_conflict(exc) from None
+            await benefit_ledger.refresh(exc.keys)
+            continue
+        except IntegrityError:
+            # Stored by another process since the filter was built.
+            await db.rollback()
+            if fingerprint is None or attempt == SUBMIT_ATTEMPTS:
+                raise
+            probe_all = True
+            continue
+        finally:
+            benefit_ledger.release([row])
+        duplicate_filter.add([fingerprint])
+        cost_stats.record(
+            payload.provider_id, payload.procedure_code, payload.claim_amount
+        )
+        return _claim_response(row, result)
 
-    claim = Claim(
-        member_id=payload.member_id,
-        provider_id=payload.provider_id,
-        diagnosis_code=payload.diagnosis_code,
-        procedure_code=payload.procedure_code,
-        claim_amount=payload.claim_amount,
-        status=result.status,
-        fraud_flag=result.fraud_flag,
-        approved_amount=result.approved_amount,
-        rejection_reasons=(
-            json.dumps(result.rejection_reasons)
-            if result.rejection_reasons
-            else None
-        ),
-    )
-    db.add(claim)
-    await db.commit()
-    await db.refresh(claim)
 
-    return ClaimResponse(
-        claim_id=claim.id,
-        status=claim.status,
-        fraud_flag=claim.fraud_flag,
-        approved_amount=claim.approved_amount,
-        rejection_reasons=result.rejection_reasons or None,
-    )
+async def _submit_queued(
+    payload: ClaimRequest, response: Response, db: AsyncSession
+) -> ClaimResponse:
+    fingerprint = claim_fingerprint(payload)
+    probe_all = False
+    for attempt in range(1, SUBMIT_ATTEMPTS + 1):
+        if fingerprint is not None:
+            existing = await duplicate_filter.find(db, [fingerprint], probe_all)
+            if existing:
+                response.status_code = status.HTTP_200_OK
+                return _stored_claim_response(existing[fingerprint])
+        row = build_claim_row(payload, AdjudicationResult(status=PENDING))
+        try:
+            adjudication_queue.reserve(row["id"])
+        except QueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Adjudication queue is full; retry later",
+                headers={"Retry-After": str(settings.adjudication_retry_after)},
+            ) from None
+        try:
+            await insert_claims(db, [row])
+            await db.commit()
+        except IntegrityError:
+            adjudication_queue.cancel(row["id"])
+            await db.rollback()
+            if fingerprint is None or attempt == SUBMIT_ATTEMPTS:
+                raise
+            probe_all = True
+            continue
+        except BaseException:
+            adjudication_queue.cancel(row["id"])
+            raise
+        adjudication_queue.put(row["id"])
+        duplicate_filter.add([fingerprint])
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"{router.prefix}/{row['id']}"
+        return _claim_response(row, AdjudicationResult())
+
+
+@router.post("/batch", response_model=BatchClaimResponse)
+async def submit_claims_batch(
+    payload: list[Any] = Body(
+        ...,
+        min_length=1,
+        max_length=settings.batch_max_size,
+        description="Claims to submit; each item is validated as a ClaimRequest",
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """Adjudicate and store many claims in one transaction.
+
+    Items are validated individually so one malformed claim does not fail
+    the batch; results are returned in request order. Claims are
+    adjudicated in order, so later items see the benefit usage of
+    earlier ones. Items already stored (or repeated within the batch)
+    are returned as ``duplicate`` with the original claim.
+    """
+    items: list[ClaimRequest | BatchClaimItemResult] = []
+    for index, item in enumerate(payload):
+        try:
+            items.append(ClaimRequest.model_validate(item))
+        except ValidationError as exc:
+            items.append(
+                BatchClaimItemResult(
+                    index=index,
+                    errors=exc.errors(include_url=False, include_context=False),
+                )
+            )
+
+    fingerprints = [
+        claim_fingerprint(item) if isinstance(item, ClaimRequest) else None
+        for item in items
+    ]
+    failed = sum(isinstance(item, BatchClaimItemResult) for item in items)
+
+    probe_all = False
+    for attempt in range(1, SUBMIT_ATTEMPTS + 1):
+        stored = {
+            fingerprint: _stored_claim_response(claim)
+            for fingerprint, claim in (
+                await duplicate_filter.find(db, fingerprints, probe_all)
+            ).items()
+        }
+        now = datetime.now(timezone.utc)
+        await benefit_ledger.load(
+            accumulator_key(item.member_id, item.diagnosis_code, now)
+            for item in items
+            if isinstance(item, ClaimRequest)
+        )
+        results: list[BatchClaimItemResult] = []
+        rows: list[dict] = []
+        for index, (item, fingerprint) in enumerate(zip(items, fingerprints)):
+            if isinstance(item, BatchClaimItemResult):
+                results.append(item)
+                continue
+            if fingerprint in stored:
+                results.append(
+                    BatchClaimItemResult(
+                        index=index, claim=stored[fingerprint], duplicate=True
+                    )
+                )
+                continue
+            row, result = _adjudicate(item, now)
+            rows.append(row)
+            claim = _claim_response(row, result)
+            if fingerprint is not None:
+                stored[fingerprint] = claim
+            results.append(BatchClaimItemResult(index=index, claim=claim))
+        try:
+            await insert_claims(db, rows)
+            await db.commit()
+        except BenefitLimitExceeded as exc:
+            await db.rollback()
+            if attempt == SUBMIT_ATTEMPTS:
+                raise _limit_conflict(exc) from None
+            await benefit_ledger.refresh(exc.keys)
+            continue
+        except IntegrityError:
+            await db.rollback()
+            if attempt == SUBMIT_ATTEMPTS:
+                raise
+            probe_all = True
+            continue
+        finally:
+            benefit_ledger.release(rows)
+        duplicate_filter.add(row["fingerprint"] for row in rows)
+        cost_stats.record_rows(rows)
+        return BatchClaimResponse(
+            results=results,
+            created=len(rows),
+            failed=failed,
+            duplicates=len(results) - len(rows) - failed,
+        )
 
 
 @router.get("", response_model=PaginatedClaimsResponse)
 async def list_claims(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: str | None = Query(
+        None,
+        description="Opaque cursor from a previous response's next_cursor; "
+        "seeks past it instead of using page",
+    ),
+    include_total: bool | None = Query(
+        None,
+        description="Return total and pages; defaults to true in page mode "
+        "and false in cursor mode",
+    ),
     member_id: str | None = Query(None, description="Filter by member ID"),
     status_filter: str | None = Query(
         None, alias="status", description="Filter by status"
     ),
     fraud_flag: bool | None = Query(None, description="Filter by fraud flag"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    query = select(Claim)
-    count_query = select(func.count(Claim.id))
+    if include_total is None:
+        include_total = cursor is None
 
-    if member_id:
-        query = query.where(Claim.member_id == member_id)
-        count_query = count_query.where(Claim.member_id == member_id)
-    if status_filter:
-        query = query.where(Claim.status == status_filter.upper())
-        count_query = count_query.where(Claim.status == status_filter.upper())
-    if fraud_flag is not None:
-        query = query.where(Claim.fraud_flag == fraud_flag)
-        count_query = count_query.where(Claim.fraud_flag == fraud_flag)
+    total = None
+    if include_total:
+        total = await count_claims(
+            db,
+            member_id,
+            status_filter.upper() if status_filter else None,
+            fraud_flag,
+        )
+
+    after = _decode_cursor(cursor) if cursor is not None else None
+    query = _list_query(member_id, status_filter, fraud_flag, after)
+    if after is None:
+        query = query.offset((page - 1) * page_size)
+    # One extra row tells us whether another page exists without counting.
+    rows = (await db.execute(query.limit(page_size + 1))).scalars().all()
 
-    total = (await db.execute(count_query)).scalar_one()
-    offset = (page - 1) * page_size
-    query = query.order_by(Claim.created_at.desc()).offset(offset).limit(page_size)
-    rows = (await db.execute(query)).scalars().all()
+    pages = None
+    if total is not None:
+        pages = math.ceil(total / page_size) if total else 0
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = _encode_cursor(rows[-1])
 
     return PaginatedClaimsResponse(
         items=[_build_detail(c) for c in rows],
         total=total,
-        page=page,
+        page=page if cursor is None else None,
         page_size=page_size,
-        pages=math.ceil(total / page_size) if total else 0,
+        pages=pages,
+        next_cursor=next_cursor,
     )
 
 
-@router.get("/{claim_id}", response_model=ClaimDetailResponse)
-async def get_claim(claim_id: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Claim).where(Claim.id == claim_id))
-    claim = result.scalar_one_or_none()
-    if claim is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Claim {claim_id} not found",
-        )
-    return _build_detail(claim)
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}}
+    },
+)
+async def export_claims(
+    fmt: Literal["ndjson", "csv"] = Query(
+        "ndjson", alias="format", description="Output format"
+    ),
+    member_id: str | None = Query(None, description="Filter by member ID"),
+    status_filter: str | None = Query(
+        None, alias="status", description="Filter by status"
+    ),
+    fraud_flag: bool | None = Query(None, description="Filter by fraud flag"),
+    created_from: datetime | None = Query(
+        None, description="Only claims created at or after this time"
+    ),
+    created_to: datetime | None = Query(
+        None, description="Only claims created before this time"
+    ),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(
+        read_session_factory
+    ),
+):
+    """Stream every matching claim, oldest first, archived claims included."""
+    if created_from is not None:
+        created_from = _as_utc(created_from)
+    if created_to is not None:
+        created_to = _as_utc(created_to)
+    query = _apply_filters(export_query(), member_id, status_filter, fraud_flag)
+    if created_from is not None:
+        query = query.where(Claim.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(Claim.created_at < created_to)
+    query = query.order_by(Claim.created_at, Claim.id)
+    archived = claim_archive.scan(
+        ExportRow._fields,
+        settings.export_chunk_size,
+        member_id=member_id,
+        status=status_filter.upper() if status_filter else None,
+        fraud_flag=fraud_flag,
+        created_from=created_from,
+        created_to=created_to,
+    )
+
+    return StreamingResponse(
+        stream_export(query, fmt, session_factory, archived),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="claims.{fmt}"'},
+    )
+
+
+def _claim_not_found(claim_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Claim {claim_id} not found",
+    )
+
+
+@router.get(
+    "/{claim_id}",
+    response_model=ClaimDetailResponse,
+    responses={304: {"description": "Not modified since the given ETag"}},
+)
+async def get_claim(
+    claim_id: str,
+    if_none_match: str | None = Header(default=None),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(
+        read_session_factory
+    ),
+):
+    # Not a UUID: there is no such claim, and the id could not be bound.
+    if not is_uuid(claim_id):
+        raise _claim_not_found(claim_id)
+    cached = claim_cache.get(claim_id)
+    if cached is not None:
+        etag, body = cached.etag, cached.body
+    else:
+        version = claim_cache.version(claim_id)
+        async with session_factory() as db:
+            result = await db.execute(_detail_query(claim_id))
+            claim = result.scalar_one_or_none()
+        # A lagging replica's row is served but not cached for everyone.
+        cacheable = session_factory is async_session
+        if claim is None:
+            archived = await claim_archive.find(claim_id)
+            claim = Claim(**archived) if archived is not None else None
+            # Archived claims no longer change.
+            cacheable = True
+        if claim is None:
+            raise _claim_not_found(claim_id)
+        etag = claim_etag(claim.updated_at)
+        body = _build_detail(claim).model_dump_json().encode()
+        if cacheable:
+            claim_cache.put(claim_id, etag, body, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,188 @@
+"""Move old months of claims into the Parquet archive.
+
+Usage::
+
+    python -m app.archive [--dry-run]
+
+Meant to run once a month (cron or similar). On PostgreSQL it first
+creates the partitions for the next ``CLAIM_PARTITIONS_AHEAD`` months
+(see ``app.services.claim_partitions``). Then each month before the
+cutoff, ``ARCHIVE_AFTER_MONTHS`` before the current one, is streamed to
+``ARCHIVE_DIR`` (see ``app.services.claim_archive``) and removed from
+``claims`` in one transaction with the matching claim counter
+decrements, by dropping its partition where there is one and deleting
+its rows otherwise. Months of the current year are never archived:
+``app.reconcile`` rebuilds this year's benefit usage from ``claims``.
+
+Each month's file is written to ``<file>.tmp`` and renamed after the
+rows are deleted. A run interrupted in between leaves the ``.tmp``
+behind; the next run keeps it if its rows are gone from the table and
+removes it (the month is archived again) if they are not.
+"""
+
+import argparse
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.logging_config import configure_logging
+from app.models.claim import Claim
+from app.services.claim_archive import (
+    ArchiveUnavailable,
+    archive_cutoff,
+    claim_archive,
+)
+from app.services.claim_counters import apply_counter_deltas
+from app.services.claim_partitions import (
+    add_months,
+    drop_partition,
+    ensure_partitions,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def recover(db: AsyncSession) -> None:
+    """Settle ``.tmp`` files left by an interrupted run."""
+    for tmp in claim_archive.pending():
+        claim_id = claim_archive.first_id(tmp)
+        stored = claim_id is not None and await db.scalar(
+            select(func.count()).where(Claim.id == claim_id)
+        )
+        if claim_id is None or stored:
+            logger.info("Removing %s: its month was not archived", tmp.name)
+            tmp.unlink()
+        else:
+            path = tmp.with_name(tmp.name.removesuffix(".tmp"))
+            logger.info("Keeping %s: its rows were already deleted", path.name)
+            tmp.replace(path)
+
+
+async def months_to_archive(db: AsyncSession, cutoff: datetime) -> list[datetime]:
+    """Months before ``cutoff`` with claims or a partition, oldest first."""
+    months = {start for start in await list_partitions(db) if start < cutoff}
+    oldest = await db.scalar(
+        select(func.min(Claim.created_at)).where(Claim.created_at < cutoff)
+    )
+    if oldest is not None:
+        start = month_start(oldest)
+        while start < cutoff:
+            months.add(start)
+            start = add_months(start, 1)
+    return sorted(months)
+
+
+async def archive_month(db: AsyncSession, start: datetime) -> int:
+    """Archive ``start``'s month and commit. Returns the rows archived."""
+    end = add_months(start, 1)
+    in_month = (Claim.created_at >= start) & (Claim.created_at < end)
+    partitioned = start in await list_partitions(db)
+    if partitioned:
+        # Queue workers could still update a row; hold them off until commit.
+        await db.execute(text(f"LOCK TABLE {partition_name(start)} IN SHARE MODE"))
+
+    writer = None
+    counted: Counter = Counter()
+    try:
+        result = await db.stream(
+            select(*Claim.__table__.columns)
+            .where(in_month)
+            .order_by(Claim.created_at, Claim.id)
+            .execution_options(yield_per=settings.export_chunk_size)
+        )
+        async for rows in result.partitions():
+            records = [row._asdict() for row in rows]
+            if writer is None:
+                writer = claim_archive.writer(start)
+            writer.write(records)
+            counted.update(
+                (r["member_id"], r["status"], r["fraud_flag"]) for r in records
+            )
+        if writer is not None:
+            writer.close()
+
+        if partitioned:
+            # asyncpg leaves the read's cursor open until the transaction
+            # ends, and PostgreSQL won't drop a table a cursor is open on.
+            await db.execute(text("CLOSE ALL"))
+            await drop_partition(db, start)
+        elif writer is not None:
+            await db.execute(delete(Claim).where(in_month))
+        await apply_counter_deltas(
+            db, Counter({key: -count for key, count in counted.items()})
+        )
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        if writer is not None:
+            writer.discard()
+        raise
+    if writer is None:
+        return 0
+    path = writer.publish()
+    logger.info(
+        "Archived %d claims from %s to %s", writer.rows, f"{start:%Y-%m}", path.name
+    )
+    return writer.rows
+
+
+async def archive(
+    now: datetime | None = None, dry_run: bool = False
+) -> dict[str, int]:
+    """Run the archive job. Returns the rows archived per ``YYYY-MM``, for
+    the months that had any (or, with ``dry_run``, that would be looked at)."""
+    now = now or datetime.now(timezone.utc)
+    claim_archive.require()
+    async with async_session() as db:
+        if not dry_run:
+            created = await ensure_partitions(
+                db, now, settings.claim_partitions_ahead
+            )
+            await db.commit()
+            for start in created:
+                logger.info("Created partition %s", partition_name(start))
+            await recover(db)
+        months = await months_to_archive(
+            db, archive_cutoff(now, settings.archive_after_months)
+        )
+        await db.rollback()
+        if dry_run:
+            for start in months:
+                logger.info("Would archive %s", f"{start:%Y-%m}")
+            return {f"{start:%Y-%m}": 0 for start in months}
+
+        archived = {}
+        for start in months:
+            if rows := await archive_month(db, start):
+                archived[f"{start:%Y-%m}"] = rows
+    return archived
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.archive",
+        description="Move old months of claims into the Parquet archive.",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="list the months without archiving"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    try:
+        asyncio.run(archive(dry_run=args.dry_run))
+    except ArchiveUnavailable as exc:
+        parser.exit(1, f"{parser.prog}: {exc}\n")
+
+
+if __name__ == "__main__":
+    main()
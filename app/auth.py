@@ -1,15 +1,92 @@
-from fastapi import Depends, HTTPException, Security, status
+"""API keys and the limits attached to each.
+
+``API_KEY`` is always accepted (as client ``default``); ``API_KEYS`` adds
+more as comma-separated ``name:key[:rate[:burst[:max_concurrency]]]``
+entries. Omitted limits fall back to ``RATE_LIMIT_PER_SECOND``,
+``RATE_LIMIT_BURST`` and ``API_KEY_MAX_CONCURRENCY``; ``0`` means
+unlimited. The limits are enforced by ``app.admission``.
+"""
+
+import time
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Security, status
 from fastapi.security import APIKeyHeader
 
-from app.config import settings
+from app.config import Settings, settings
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``capacity``."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Take one token; returns 0, or the seconds until one is available."""
+        tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if tokens >= 1:
+            self.tokens = tokens - 1
+            return 0.0
+        self.tokens = tokens
+        return (1 - tokens) / self.rate
+
+
+@dataclass(slots=True, eq=False)
+class ApiClient:
+    name: str
+    bucket: TokenBucket | None
+    # 0 means unlimited.
+    max_concurrency: int
+    in_flight: int = 0
+
+
+def _client(
+    name: str,
+    rate: float,
+    burst: float,
+    max_concurrency: int,
+) -> ApiClient:
+    bucket = TokenBucket(rate, burst or max(rate, 1.0)) if rate > 0 else None
+    return ApiClient(name, bucket, max_concurrency)
+
+
+def parse_api_keys(config: Settings) -> dict[str, ApiClient]:
+    """Clients by key, from ``API_KEY`` and ``API_KEYS``."""
+    defaults = (
+        config.rate_limit_per_second,
+        config.rate_limit_burst,
+        config.api_key_max_concurrency,
+    )
+    clients = {}
+    if config.api_key:
+        clients[config.api_key] = _client("default", *defaults)
+    for entry in filter(None, (e.strip() for e in config.api_keys.split(","))):
+        name, key, *limits = entry.split(":")
+        if not name or not key or len(limits) > 3:
+            raise ValueError(f"Invalid API_KEYS entry for {name or '?'}")
+        rate = float(limits[0]) if len(limits) > 0 else defaults[0]
+        burst = float(limits[1]) if len(limits) > 1 else defaults[1]
+        max_concurrency = int(limits[2]) if len(limits) > 2 else defaults[2]
+        clients[key] = _client(name, rate, burst, max_concurrency)
+    return clients
+
+
+api_clients = parse_api_keys(settings)
+
+
 async def require_api_key(
     api_key: str | None = Security(api_key_header),
 ) -> str:
-    if api_key is None or api_key != settings.api_key:
+    if api_key is None or api_key not in api_clients:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing API key",
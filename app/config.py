@@ -7,9 +7,104 @@ class Settings(BaseSettings):
     database_url: str = os.getenv(
         "DATABASE_URL", "sqlite+aiosqlite:///./claims.db"
     )
+    # Optional replica for list, detail and export reads; see app.database.
+    read_database_url: str = os.getenv("READ_DATABASE_URL", "")
+    # After a write, the client's reads go to the primary for this long.
+    read_after_write_seconds: float = float(
+        os.getenv("READ_AFTER_WRITE_SECONDS", "2")
+    )
+    # "tuned" applies the pool and SQLite settings below; "default"
+    # leaves SQLAlchemy's defaults untouched.
+    database_profile: str = os.getenv("DATABASE_PROFILE", "tuned")
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # asyncpg: prepared statements cached per connection (0 behind
+    # pgbouncer in transaction mode), and JIT, which costs more than it
+    # saves on short OLTP queries.
+    pg_statement_cache_size: int = int(os.getenv("PG_STATEMENT_CACHE_SIZE", "500"))
+    pg_jit: str = os.getenv("PG_JIT", "off")
+    # Batches at least this large are written with COPY on PostgreSQL.
+    pg_copy_threshold: int = int(os.getenv("PG_COPY_THRESHOLD", "500"))
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # Negative values are KiB, as in PRAGMA cache_size.
+    sqlite_cache_size: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
     app_name: str = "Claims Processing Service"
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    # "text" or "json"; see app.logging_config.
+    log_format: str = os.getenv("LOG_FORMAT", "text")
+    # Share of approved/partial adjudications logged; rejections and fraud
+    # flags always are.
+    log_adjudication_sample_rate: float = float(
+        os.getenv("LOG_ADJUDICATION_SAMPLE_RATE", "1")
+    )
     api_key: str = os.getenv("API_KEY", "dev-test-api-key")
+    # More keys as "name:key[:rate[:burst[:max_concurrency]]]", comma
+    # separated; see app.auth. Limits of 0 mean unlimited.
+    api_keys: str = os.getenv("API_KEYS", "")
+    rate_limit_per_second: float = float(os.getenv("RATE_LIMIT_PER_SECOND", "0"))
+    rate_limit_burst: float = float(os.getenv("RATE_LIMIT_BURST", "0"))
+    api_key_max_concurrency: int = int(os.getenv("API_KEY_MAX_CONCURRENCY", "0"))
+    # Load shedding: API requests are refused with 503 (with a probability
+    # that grows with the overshoot) while the smoothed pool checkout wait
+    # or event loop lag is above these thresholds; 0 disables a signal.
+    shed_pool_wait_ms: float = float(os.getenv("SHED_POOL_WAIT_MS", "250"))
+    shed_loop_lag_ms: float = float(os.getenv("SHED_LOOP_LAG_MS", "200"))
+    load_monitor_interval: float = float(os.getenv("LOAD_MONITOR_INTERVAL", "0.1"))
+    batch_max_size: int = int(os.getenv("BATCH_MAX_SIZE", "1000"))
+    claim_counter_shards: int = int(os.getenv("CLAIM_COUNTER_SHARDS", "16"))
+    reference_poll_interval: float = float(
+        os.getenv("REFERENCE_POLL_INTERVAL", "30")
+    )
+    write_coalesce_enabled: bool = (
+        os.getenv("WRITE_COALESCE_ENABLED", "false").lower() == "true"
+    )
+    write_coalesce_window_ms: float = float(
+        os.getenv("WRITE_COALESCE_WINDOW_MS", "2")
+    )
+    write_coalesce_max_batch: int = int(os.getenv("WRITE_COALESCE_MAX_BATCH", "256"))
+    export_chunk_size: int = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+    # Cold archive (see app.archive): months older than this are moved
+    # from claims into Parquet files under ARCHIVE_DIR, which
+    # GET /claims/{claim_id} and the export also read. Empty disables it.
+    archive_dir: str = os.getenv("ARCHIVE_DIR", "")
+    archive_after_months: int = int(os.getenv("ARCHIVE_AFTER_MONTHS", "24"))
+    # PostgreSQL: monthly partitions created ahead of the current month.
+    claim_partitions_ahead: int = int(os.getenv("CLAIM_PARTITIONS_AHEAD", "3"))
+    claim_cache_size: int = int(os.getenv("CLAIM_CACHE_SIZE", "10000"))
+    claim_cache_ttl: float = float(os.getenv("CLAIM_CACHE_TTL", "30"))
+    benefit_cache_size: int = int(os.getenv("BENEFIT_CACHE_SIZE", "100000"))
+    # "static" flags claims above the procedure's average cost times
+    # the fraud rule's multiplier. "zscore" and "quantile" use thresholds from
+    # running cost statistics once a key has FRAUD_MIN_SAMPLES claims,
+    # falling back to "static" below that.
+    fraud_rule: str = os.getenv("FRAUD_RULE", "static")
+    fraud_zscore: float = float(os.getenv("FRAUD_ZSCORE", "3"))
+    fraud_quantile: float = float(os.getenv("FRAUD_QUANTILE", "0.99"))
+    fraud_min_samples: int = int(os.getenv("FRAUD_MIN_SAMPLES", "30"))
+    cost_stats_interval: float = float(os.getenv("COST_STATS_INTERVAL", "60"))
+    # Adjudication rule config (JSON, or YAML with PyYAML installed);
+    # empty means the bundled app/services/default_rules.json.
+    rules_path: str = os.getenv("RULES_PATH", "")
+    rules_poll_interval: float = float(os.getenv("RULES_POLL_INTERVAL", "5"))
+    # POST /claims?async=true: claims waiting for a worker before further
+    # submissions get 503, and an optional local SQLite file that keeps
+    # queued claim ids across restarts.
+    adjudication_queue_size: int = int(os.getenv("ADJUDICATION_QUEUE_SIZE", "10000"))
+    adjudication_workers: int = int(os.getenv("ADJUDICATION_WORKERS", "4"))
+    adjudication_batch_size: int = int(os.getenv("ADJUDICATION_BATCH_SIZE", "100"))
+    adjudication_queue_path: str = os.getenv("ADJUDICATION_QUEUE_PATH", "")
+    adjudication_retry_after: int = int(os.getenv("ADJUDICATION_RETRY_AFTER", "1"))
+    duplicate_filter_capacity: int = int(
+        os.getenv("DUPLICATE_FILTER_CAPACITY", "1000000")
+    )
+    duplicate_filter_error_rate: float = float(
+        os.getenv("DUPLICATE_FILTER_ERROR_RATE", "0.01")
+    )
 
 
 settings = Settings()
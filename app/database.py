@@ -1,22 +1,171 @@
+"""Database engines and sessions.
+
+``engine`` is the primary and takes every write. With
+``READ_DATABASE_URL`` set, ``read_engine`` is a replica that serves the
+list, detail and export endpoints through ``get_read_db``. Replicas lag,
+so a client that just wrote through ``get_db`` has its reads pinned to
+the primary for ``READ_AFTER_WRITE_SECONDS`` (``read_pins``) and sees its
+own writes. Clients are told apart by their API key.
+"""
+
+import time
 from collections.abc import AsyncGenerator
 
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import Settings, settings
+
+
+def engine_options(config: Settings) -> dict:
+    """Keyword arguments for ``create_async_engine`` under ``config``'s profile."""
+    if config.database_profile != "tuned":
+        return {}
+    url = make_url(config.database_url)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return {}
+        # A file database defaults to NullPool, which would reopen the
+        # file (and re-apply the pragmas) on every checkout.
+        return {
+            "poolclass": AsyncAdaptedQueuePool,
+            "pool_size": config.db_pool_size,
+            "max_overflow": config.db_max_overflow,
+            "pool_timeout": config.db_pool_timeout,
+            "pool_pre_ping": config.db_pool_pre_ping,
+        }
+    options = {
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_timeout": config.db_pool_timeout,
+        "pool_recycle": config.db_pool_recycle,
+        "pool_pre_ping": config.db_pool_pre_ping,
+    }
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            # SQLAlchemy's per-connection cache of asyncpg prepared
+            # statements; asyncpg's own cache follows the same size.
+            "prepared_statement_cache_size": config.pg_statement_cache_size,
+            "statement_cache_size": config.pg_statement_cache_size,
+            "server_settings": {
+                "jit": config.pg_jit,
+                "application_name": config.app_name,
+            },
+        }
+    return options
+
+
+def sqlite_pragmas(config: Settings) -> list[str]:
+    """Statements run on every new SQLite connection under the tuned profile.
+
+    WAL lets readers proceed while a write is in progress, and with
+    ``synchronous=NORMAL`` a commit no longer fsyncs the database file
+    (only checkpoints do); a crash can lose the last commits but never
+    corrupts the database.
+    """
+    return [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={config.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout_ms)}",
+        f"PRAGMA cache_size={int(config.sqlite_cache_size)}",
+        f"PRAGMA mmap_size={int(config.sqlite_mmap_size)}",
+    ]
 
-from app.config import settings
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
-)
+def create_engine(config: Settings):
+    engine = create_async_engine(
+        config.database_url, echo=False, **engine_options(config)
+    )
+    if config.database_profile == "tuned" and engine.dialect.name == "sqlite":
+        pragmas = sqlite_pragmas(config)
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    return engine
+
+
+engine = create_engine(settings)
 
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
+if settings.read_database_url:
+    read_engine = create_engine(
+        settings.model_copy(update={"database_url": settings.read_database_url})
+    )
+    read_session = async_sessionmaker(read_engine, expire_on_commit=False)
+else:
+    read_engine = engine
+    read_session = async_session
+
 
 class Base(DeclarativeBase):
     pass
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+class ReadPins:
+    """Clients whose reads stay on the primary until a deadline."""
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._until: dict[str, float] = {}
+
+    def pin(self, client: str | None) -> None:
+        if client and self.window > 0:
+            self._until[client] = time.monotonic() + self.window
+
+    def pinned(self, client: str | None) -> bool:
+        until = self._until.get(client)
+        if until is None:
+            return False
+        if until > time.monotonic():
+            return True
+        del self._until[client]
+        return False
+
+    def clear(self) -> None:
+        self._until.clear()
+
+
+read_pins = ReadPins(settings.read_after_write_seconds)
+
+
+def _client(request: Request) -> str | None:
+    return request.headers.get("x-api-key")
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """A primary session; the caller's reads are pinned to the primary."""
     async with async_session() as session:
         yield session
+    # Runs before the response is sent, so the client's next read is
+    # already pinned.
+    read_pins.pin(_client(request))
+
+
+def read_session_factory(request: Request) -> async_sessionmaker[AsyncSession]:
+    """The replica's sessions, or the primary's for a client that just wrote."""
+    if read_session is async_session or read_pins.pinned(_client(request)):
+        return async_session
+    return read_session
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with read_session_factory(request)() as session:
+        yield session
+
+
+def dialect_insert(db: AsyncSession):
+    """Return the dialect's ``insert`` construct, which supports upserts."""
+    if db.bind.dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
@@ -0,0 +1,301 @@
+"""Bulk-load a claims file without going through HTTP.
+
+Usage::
+
+    python -m app.ingest claims.jsonl [--workers 8] [--chunk-size 10000]
+
+Input is JSON Lines or CSV (with a header row using the ``ClaimRequest``
+field names). Records are read lazily and adjudicated in chunks on a
+process pool with ``ClaimProcessor.adjudicate_many``; at most
+``2 * workers`` chunks are in flight, so memory does not grow with the
+file. Chunks are written in input order, each in one transaction
+together with the job's row in ``ingest_checkpoints``, after dropping
+duplicate claims and capping approved amounts at each member's
+remaining annual limit. Re-running the same command after a crash skips
+the records already committed.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import nullcontext
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from multiprocessing import get_context
+from pathlib import Path
+from types import MappingProxyType
+from typing import IO
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import Base, async_session, dialect_insert, engine
+from app.logging_config import configure_logging
+from app.models.ingest_checkpoint import IngestCheckpoint
+from app.schemas.claim import ClaimRequest
+from app.services.benefit_accumulators import accumulator_key, benefit_ledger
+from app.services.claim_processor import ClaimProcessor
+from app.services.claim_writer import build_claim_rows, insert_claims
+from app.services.cost_stats import CostKey, cost_stats
+from app.services.duplicates import duplicate_filter
+from app.services.reference_data import ReferenceSnapshot, reference_data
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("jsonl", "csv")
+
+
+def _init_worker(
+    snapshot: ReferenceSnapshot, thresholds: dict[CostKey, float]
+) -> None:
+    reference_data.snapshot = snapshot
+    cost_stats.thresholds = MappingProxyType(thresholds)
+
+
+def adjudicate_chunk(
+    start: int, records: list, fmt: str
+) -> tuple[list[dict], list[dict]]:
+    """Validate and adjudicate one chunk; runs in a worker process.
+
+    ``start`` is the 1-based number of the chunk's first record. Returns
+    the claim rows and an entry for every record that failed validation.
+    """
+    payloads = []
+    invalid = []
+    for number, record in enumerate(records, start):
+        try:
+            if fmt == "jsonl":
+                payloads.append(ClaimRequest.model_validate_json(record))
+            else:
+                payloads.append(ClaimRequest.model_validate(record))
+        except ValidationError as exc:
+            invalid.append(
+                {
+                    "record": number,
+                    "errors": exc.errors(include_url=False, include_context=False),
+                }
+            )
+    if not payloads:
+        return [], invalid
+    columns = ClaimProcessor().adjudicate_many(
+        [p.member_id for p in payloads],
+        [p.provider_id for p in payloads],
+        [p.diagnosis_code for p in payloads],
+        [p.procedure_code for p in payloads],
+        [p.claim_amount for p in payloads],
+    )
+    return build_claim_rows(payloads, columns), invalid
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator:
+    """Yield raw JSONL lines or CSV row dicts; blank lines are not records."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        yield from (line for line in stream if line.strip())
+
+
+def infer_format(path: Path) -> str:
+    return "csv" if path.suffix.lower() == ".csv" else "jsonl"
+
+
+async def load_checkpoint(db: AsyncSession, job: str) -> IngestCheckpoint | None:
+    return await db.get(IngestCheckpoint, job)
+
+
+async def save_checkpoint(
+    db: AsyncSession, job: str, records_done: int, inserted: int, invalid: int
+) -> None:
+    stmt = dialect_insert(db)(IngestCheckpoint).values(
+        job=job,
+        records_done=records_done,
+        inserted=inserted,
+        invalid=invalid,
+        updated_at=datetime.now(timezone.utc),
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[IngestCheckpoint.job],
+            set_={
+                "records_done": stmt.excluded.records_done,
+                "inserted": stmt.excluded.inserted,
+                "invalid": stmt.excluded.invalid,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+    )
+
+
+async def ingest(
+    path: Path,
+    fmt: str | None = None,
+    job: str | None = None,
+    chunk_size: int = 10_000,
+    workers: int = 0,
+    progress_interval: float = 5.0,
+    rejects: Path | None = None,
+) -> IngestCheckpoint:
+    """Load ``path`` into the claims table and return the final checkpoint.
+
+    With ``workers=0`` chunks are adjudicated in this process, which is
+    only worth it for small files.
+    """
+    fmt = fmt or infer_format(path)
+    job = job or str(path.resolve())
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session() as db:
+        await reference_data.refresh_if_changed(db)
+        checkpoint = await load_checkpoint(db, job)
+    await cost_stats.load()
+    await duplicate_filter.rebuild()
+    done = checkpoint.records_done if checkpoint else 0
+    inserted = checkpoint.inserted if checkpoint else 0
+    invalid = checkpoint.invalid if checkpoint else 0
+    if done:
+        logger.info("Resuming %s after %d records", job, done)
+
+    executor: Executor | None = None
+    if workers > 0:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(reference_data.snapshot, dict(cost_stats.thresholds)),
+        )
+    pending: deque[tuple[int, Future]] = deque()
+    started = time.monotonic()
+    last_report = started
+    session_rows = 0
+    duplicates = 0
+    reject_log = rejects.open("a", encoding="utf-8") if rejects else nullcontext()
+    with path.open(newline="", encoding="utf-8") as stream, reject_log as reject_file:
+        records = read_records(stream, fmt)
+        for _ in islice(records, done):
+            pass
+        next_start = done + 1
+        try:
+            while True:
+                while len(pending) < max(workers, 1) * 2:
+                    chunk = list(islice(records, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(
+                        (len(chunk), _submit(executor, next_start, chunk, fmt))
+                    )
+                    next_start += len(chunk)
+                if not pending:
+                    break
+                count, future = pending.popleft()
+                rows, rejected = await asyncio.wrap_future(future)
+                async with async_session() as db:
+                    kept = await duplicate_filter.drop_stored(db, rows)
+                duplicates += len(rows) - len(kept)
+                rows = kept
+                done += count
+                inserted += len(rows)
+                invalid += len(rejected)
+                # Annual limits depend on every earlier claim, so they are
+                # applied here, in record order, not in the workers.
+                await benefit_ledger.load(
+                    accumulator_key(
+                        row["member_id"], row["diagnosis_code"], row["created_at"]
+                    )
+                    for row in rows
+                )
+                benefit_ledger.apply_limits(rows)
+                try:
+                    async with async_session() as db:
+                        await insert_claims(db, rows)
+                        await save_checkpoint(db, job, done, inserted, invalid)
+                        await db.commit()
+                finally:
+                    benefit_ledger.release(rows)
+                duplicate_filter.add(row["fingerprint"] for row in rows)
+                cost_stats.record_rows(rows)
+                if reject_file is not None:
+                    reject_file.writelines(json.dumps(r) + "\n" for r in rejected)
+                session_rows += count
+                now = time.monotonic()
+                if now - last_report >= progress_interval:
+                    logger.info(
+                        "%d records (%d inserted, %d invalid), %.0f rows/s",
+                        done,
+                        inserted,
+                        invalid,
+                        session_rows / (now - started),
+                    )
+                    last_report = now
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+    await cost_stats.flush()
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        "Finished %s: %d records (%d inserted, %d invalid, %d duplicates) "
+        "in %.1fs, %.0f rows/s",
+        job,
+        done,
+        inserted,
+        invalid,
+        duplicates,
+        elapsed,
+        session_rows / elapsed if elapsed else 0.0,
+    )
+    return IngestCheckpoint(
+        job=job, records_done=done, inserted=inserted, invalid=invalid
+    )
+
+
+def _submit(executor: Executor | None, start: int, chunk: list, fmt: str) -> Future:
+    if executor is not None:
+        return executor.submit(adjudicate_chunk, start, chunk, fmt)
+    future: Future = Future()
+    future.set_result(adjudicate_chunk(start, chunk, fmt))
+    return future
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.ingest", description="Bulk-load a claims file."
+    )
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--format", choices=FORMATS, help="default: from the file suffix"
+    )
+    parser.add_argument("--job", help="checkpoint key (default: absolute path)")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--progress-interval", type=float, default=5.0)
+    parser.add_argument(
+        "--rejects", type=Path, help="append invalid records here as JSONL"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    # adjudicate_many logs a line per chunk; keep the progress report readable.
+    logging.getLogger("app.services.claim_processor").setLevel(logging.WARNING)
+    asyncio.run(
+        ingest(
+            args.path,
+            fmt=args.format,
+            job=args.job,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            progress_interval=args.progress_interval,
+            rejects=args.rejects,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
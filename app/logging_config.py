@@ -0,0 +1,96 @@
+"""Logging setup shared by the app and the command line tools.
+
+``configure_logging`` puts a ``QueueHandler`` on the root logger, so a
+log call only builds its record and appends it to an in-memory queue; a
+``QueueListener`` thread formats it and writes it to stderr. A slow or
+blocked stderr then stalls that thread instead of the event loop.
+
+``LOG_FORMAT=json`` writes one JSON object per line, with any
+``extra={...}`` fields of the call as top-level keys.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from app.config import Settings, settings
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Attributes every LogRecord has; anything else came from ``extra``.
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the args now, as the base class does, but leave the rest of
+        the formatting (timestamp, JSON, level, traceback) to the listener
+        thread. The traceback's frames and source lines do not change once
+        raised, so ``exc_info`` travels as is."""
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener: QueueListener | None = None
+
+
+def make_formatter(fmt: str) -> logging.Formatter:
+    if fmt == "json":
+        return JsonFormatter()
+    if fmt == "text":
+        return logging.Formatter(TEXT_FORMAT)
+    raise ValueError(f"Unknown LOG_FORMAT {fmt!r}")
+
+
+def configure_logging(config: Settings = settings) -> None:
+    """Route the root logger through a queue to a stderr writer thread.
+
+    Replaces earlier handlers, so calling it again applies new settings.
+    """
+    global _listener
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(make_formatter(config.log_format))
+    if _listener is not None:
+        _listener.stop()
+    _listener = QueueListener(queue.SimpleQueue(), output)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(_listener.queue))
+    root.setLevel(config.log_level)
+
+
+@atexit.register
+def _flush() -> None:
+    # Drains what is still queued before the interpreter exits.
+    if _listener is not None:
+        _listener.stop()
@@ -1,23 +1,53 @@
-import logging
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
+from fastapi.responses import Response
 
+from app.admission import AdmissionMiddleware, load_monitor
 from app.api.claims import router as claims_router
 from app.config import settings
-from app.database import Base, engine
+from app.database import Base, async_session, engine, read_engine
+from app.logging_config import configure_logging
+from app.metrics import CONTENT_TYPE, MetricsMiddleware, instrument_engine, registry
+from app.services.adjudication_queue import adjudication_queue
+from app.services.benefit_accumulators import benefit_ledger
+from app.services.claim_cache import claim_cache
+from app.services.cost_stats import cost_stats
+from app.services.duplicates import duplicate_filter
+from app.services.reference_data import reference_data, seed_reference_data
+from app.services.rules import rule_set
+from app.services.write_coalescer import write_coalescer
 
-logging.basicConfig(
-    level=settings.log_level,
-    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
-)
+configure_logging()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    async with async_session() as db:
+        if await seed_reference_data(db):
+            await db.commit()
+        await reference_data.load(db)
+    rule_set.load()
+    await cost_stats.load()
+    await duplicate_filter.rebuild()
+    await adjudication_queue.start()
+    pollers = [
+        asyncio.create_task(reference_data.poll(settings.reference_poll_interval)),
+        asyncio.create_task(cost_stats.poll(settings.cost_stats_interval)),
+        asyncio.create_task(rule_set.poll(settings.rules_poll_interval)),
+        asyncio.create_task(load_monitor.run(settings.load_monitor_interval)),
+    ]
     yield
+    await adjudication_queue.stop()
+    await write_coalescer.stop()
+    for poller in pollers:
+        poller.cancel()
+        with suppress(asyncio.CancelledError):
+            await poller
+    await cost_stats.flush()
 
 
 app = FastAPI(
@@ -27,9 +57,29 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Added last, so metrics wrap admission and count refused requests too.
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(claims_router)
+instrument_engine(engine, on_checkout=load_monitor.observe_pool_wait)
+if read_engine is not engine:
+    instrument_engine(read_engine)
 
 
 @app.get("/health", tags=["health"])
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/stats/cache", tags=["health"])
+async def cache_stats():
+    return {
+        "claims": claim_cache.stats(),
+        "benefits": benefit_ledger.stats(),
+        "duplicates": duplicate_filter.stats(),
+    }
+
+
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
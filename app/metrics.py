@@ -0,0 +1,280 @@
+"""In-process Prometheus metrics, rendered by ``GET /metrics``.
+
+Deliberately tiny: counters and fixed-bucket histograms keyed by label
+tuples, updated from the event loop thread without locks. Recording a
+sample is a ``bisect`` and two additions on a series the hot paths bind
+once, cheap enough to leave on for every request, rule and statement.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+RULE_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 1e-3)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(
+                f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            )
+        return lines
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class _HistogramSeries:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # +Inf last
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self._series: dict[tuple, _HistogramSeries] = {}
+
+    def labels(self, *labels) -> _HistogramSeries:
+        """Return the series for ``labels``; hot paths can bind it once."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _HistogramSeries(self.buckets)
+        return series
+
+    def observe(self, value: float, *labels) -> None:
+        self.labels(*labels).observe(value)
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series.counts) if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series.counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            suffix = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {_number(series.sum)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        self._series.clear()
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], Iterable[str]]] = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Register a callable returning exposition lines at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        for metric in self._metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+ADJUDICATION_RULE_SECONDS = registry.histogram(
+    "adjudication_rule_duration_seconds",
+    "Time spent in each adjudication rule.",
+    ("rule",),
+    buckets=RULE_BUCKETS,
+)
+DB_STATEMENT_SECONDS = registry.histogram(
+    "db_statement_duration_seconds",
+    "SQL statement execution time by leading keyword.",
+    ("statement",),
+)
+DB_STATEMENT_ERRORS = registry.counter(
+    "db_statement_errors_total",
+    "SQL statements that raised.",
+    ("statement",),
+)
+DB_POOL_CHECKOUT_SECONDS = registry.histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time to obtain a connection from the pool, including waiting for a "
+    "free slot and opening new connections.",
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by its route template.
+
+    Requests that match no route share one ``route`` label so scanners
+    cannot blow up the series count.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+            )
+
+
+def _statement_kind(statement: str) -> str:
+    head = statement.lstrip()[:16].split(None, 1)
+    return head[0].upper() if head else ""
+
+
+def instrument_engine(
+    engine: AsyncEngine, on_checkout: Callable[[float], None] | None = None
+) -> None:
+    """Time SQL statements and pool checkouts on ``engine``; ``on_checkout``
+    also gets each checkout's duration."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        DB_STATEMENT_SECONDS.observe(
+            time.perf_counter() - started, _statement_kind(statement)
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        if context.connection is not None:
+            stack = context.connection.info.get("metrics_started")
+            if stack:
+                stack.pop()
+        if context.statement:
+            DB_STATEMENT_ERRORS.inc(_statement_kind(context.statement))
+
+    pool = sync_engine.pool
+    connect = pool.connect
+    checkouts = DB_POOL_CHECKOUT_SECONDS.labels()
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            elapsed = time.perf_counter() - start
+            checkouts.observe(elapsed)
+            if on_checkout is not None:
+                on_checkout(elapsed)
+
+    pool.connect = timed_connect
@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class BenefitAccumulator(Base):
+    """Approved amount per member and diagnosis for one calendar year.
+
+    Updated in the same transaction as every claim insert; the year is
+    that of the claim's ``created_at`` (UTC).
+    """
+
+    __tablename__ = "benefit_accumulators"
+
+    member_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    diagnosis_code: Mapped[str] = mapped_column(String(20), primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    used_amount: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
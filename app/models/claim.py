@@ -1,29 +1,79 @@
-import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, Float, String, Text
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Date,
+    DateTime,
+    Index,
+    PrimaryKeyConstraint,
+    String,
+    event,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
+from app.models.types import Cents, ClaimStatus, CompactUuid, JsonList, new_claim_id
 
 
 class Claim(Base):
+    """A submitted claim.
+
+    On PostgreSQL ``claims`` is partitioned by month on ``created_at``
+    (see ``app.services.claim_partitions``), which requires every unique
+    index to include it: there the primary key is ``(id, created_at)``,
+    added after the table is created, and ``fingerprint`` is unique per
+    partition. ``create_all`` makes the ``claims_default`` partition;
+    ``python -m app.archive`` adds the monthly ones. Ids are unique on
+    their own, so the ORM identifies a claim by ``id`` alone.
+    """
+
     __tablename__ = "claims"
+    __table_args__ = (
+        # (id, created_at) on PostgreSQL; see the listeners below.
+        PrimaryKeyConstraint("id").ddl_if(dialect="sqlite"),
+        # One index per filter shape offered by GET /claims, each ending in
+        # the (created_at, id) sort key so pages and cursor seeks avoid a sort.
+        Index("ix_claims_created_at_id", "created_at", "id"),
+        Index("ix_claims_member_id_created_at", "member_id", "created_at", "id"),
+        Index("ix_claims_status_created_at", "status", "created_at", "id"),
+        Index(
+            "ix_claims_fraud_created_at",
+            "created_at",
+            "id",
+            postgresql_where=text("fraud_flag = true"),
+            sqlite_where=text("fraud_flag = 1"),
+        ),
+        # NULL (no service date) never conflicts. On PostgreSQL each
+        # partition has its own <partition>_fingerprint_key instead.
+        Index("ux_claims_fingerprint", "fingerprint", unique=True).ddl_if(
+            dialect="sqlite"
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
+    # Columns are stored compactly; see app.models.types.
     id: Mapped[str] = mapped_column(
-        String(36),
+        CompactUuid,
         primary_key=True,
-        default=lambda: str(uuid.uuid4()),
+        # Wrapped: SQLAlchemy passes a one-argument default its context.
+        default=lambda: new_claim_id(),
     )
-    member_id: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    member_id: Mapped[str] = mapped_column(String(50), nullable=False)
     provider_id: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
     diagnosis_code: Mapped[str] = mapped_column(String(20), nullable=False)
     procedure_code: Mapped[str] = mapped_column(String(20), nullable=False)
-    claim_amount: Mapped[float] = mapped_column(Float, nullable=False)
-    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    claim_amount: Mapped[float] = mapped_column(Cents, nullable=False)
+    service_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    # See app.services.duplicates.claim_fingerprint.
+    fingerprint: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    status: Mapped[str] = mapped_column(ClaimStatus, nullable=False)
     fraud_flag: Mapped[bool] = mapped_column(Boolean, default=False)
-    approved_amount: Mapped[float] = mapped_column(Float, default=0.0)
-    rejection_reasons: Mapped[str | None] = mapped_column(Text, nullable=True)
+    approved_amount: Mapped[float] = mapped_column(Cents, default=0.0)
+    rejection_reasons: Mapped[list[str] | None] = mapped_column(
+        JsonList, nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
@@ -32,3 +82,17 @@ class Claim(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+
+
+# The partitioned layout of migration c6d2a8f4e157, for create_all.
+for statement in (
+    "ALTER TABLE claims ADD CONSTRAINT claims_pkey PRIMARY KEY (id, created_at)",
+    "CREATE TABLE claims_default PARTITION OF claims DEFAULT",
+    "CREATE UNIQUE INDEX claims_default_fingerprint_key "
+    "ON claims_default (fingerprint)",
+):
+    event.listen(
+        Claim.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
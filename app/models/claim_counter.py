@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Boolean, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.types import ClaimStatus
+
+
+class ClaimCounter(Base):
+    """Rollup of claim counts by (member_id, status, fraud_flag).
+
+    Rows with an empty ``member_id`` hold the totals across all members.
+    Those are written on every insert, so they are spread over ``shard``
+    rows to avoid every writer queueing on one row lock.
+    """
+
+    __tablename__ = "claim_counters"
+
+    member_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    status: Mapped[str] = mapped_column(ClaimStatus, primary_key=True)
+    fraud_flag: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    shard: Mapped[int] = mapped_column(SmallInteger, primary_key=True, default=0)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, BigInteger, DateTime, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CostStat(Base):
+    """Running claim amount statistics per (provider_id, procedure_code).
+
+    Rows with an empty ``provider_id`` cover the procedure across all
+    providers. ``m2`` is the sum of squared deviations from ``mean``
+    (Welford), and ``sketch`` maps log-scale bucket indexes to counts.
+    """
+
+    __tablename__ = "cost_stats"
+
+    provider_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    procedure_code: Mapped[str] = mapped_column(String(20), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    mean: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    m2: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sketch: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
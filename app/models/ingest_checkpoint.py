@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class IngestCheckpoint(Base):
+    """Progress of a bulk ingest job, committed together with each chunk."""
+
+    __tablename__ = "ingest_checkpoints"
+
+    job: Mapped[str] = mapped_column(String(500), primary_key=True)
+    records_done: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    inserted: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    invalid: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
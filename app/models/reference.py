@@ -0,0 +1,57 @@
+"""Reference data used by adjudication.
+
+Read into an in-memory snapshot (see ``app.services.reference_data``);
+any change to these tables must bump ``reference_data_version`` in the
+same transaction so running processes pick it up.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DateTime, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class Member(Base):
+    __tablename__ = "members"
+
+    member_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+
+
+class Provider(Base):
+    __tablename__ = "providers"
+
+    provider_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    type: Mapped[str] = mapped_column(String(30), nullable=False)
+
+
+class BenefitLimit(Base):
+    __tablename__ = "benefit_limits"
+
+    diagnosis_code: Mapped[str] = mapped_column(String(20), primary_key=True)
+    limit_amount: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class ProcedureCost(Base):
+    __tablename__ = "procedure_costs"
+
+    procedure_code: Mapped[str] = mapped_column(String(20), primary_key=True)
+    avg_cost: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class ReferenceDataVersion(Base):
+    """Single row (id=1) whose ``version`` changes with the reference data."""
+
+    __tablename__ = "reference_data_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
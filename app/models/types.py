@@ -0,0 +1,134 @@
+"""Compact column types for ``claims``.
+
+Python code keeps working with float amounts, status names and string
+ids; the conversion happens in bind and result processing:
+
+- ``Cents``: float amounts stored as a ``BIGINT`` number of cents.
+- ``ClaimStatus``: status names stored as a ``SMALLINT`` code.
+- ``CompactUuid``: native ``uuid`` on PostgreSQL, 16-byte ``BLOB``
+  elsewhere (the string form takes 36 bytes plus overhead, in the table
+  and again in every index that ends in ``id``).
+
+Raw SQL and ``INSERT ... SELECT`` see the stored values, not the Python
+ones; ``type_coerce`` to the underlying type when that matters.
+
+New claim ids are version 7 UUIDs (``new_claim_id``): they start with the
+creation time in milliseconds, so ``claim_id_time`` tells which month an
+archived claim lives in, and consecutive ids land next to each other in
+the primary key index.
+"""
+
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import JSON, BigInteger, LargeBinary, SmallInteger
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+
+STATUS_CODES = {"PENDING": 0, "APPROVED": 1, "PARTIAL": 2, "REJECTED": 3}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+# Bound for names outside STATUS_CODES, e.g. ?status=foo; matches no row.
+UNKNOWN_STATUS = -1
+
+
+def to_cents(amount: float) -> int:
+    return round(amount * 100)
+
+
+def round_cents(amount: float) -> float:
+    """``amount`` as ``Cents`` stores it."""
+    return to_cents(amount) / 100
+
+
+def uuid_bytes(value: str) -> bytes:
+    """The 16 bytes of a UUID string; raises ``ValueError`` if it is not one."""
+    raw = value.replace("-", "")
+    if len(raw) != 32:
+        raise ValueError(f"Not a UUID: {value!r}")
+    return bytes.fromhex(raw)
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def new_claim_id(at: datetime | None = None) -> str:
+    """A version 7 UUID for a claim created at ``at`` (default now, UTC)."""
+    ms = ((at or datetime.now(timezone.utc)) - EPOCH) // _MILLISECOND
+    value = (ms << 80) | int.from_bytes(os.urandom(10))
+    # Version 7 in bits 76-79 and the RFC 4122 variant in bits 62-63.
+    value = (value & ~(0xF << 76) & ~(0x3 << 62)) | (0x7 << 76) | (0x2 << 62)
+    return str(uuid.UUID(int=value))
+
+
+def claim_id_time(claim_id: str) -> datetime | None:
+    """When a version 7 claim id was created, to the millisecond; ``None``
+    for other (older, random) ids."""
+    value = uuid.UUID(claim_id)
+    if value.version != 7:
+        return None
+    return EPOCH + (value.int >> 80) * _MILLISECOND
+
+
+def is_uuid(value: str) -> bool:
+    try:
+        uuid_bytes(value)
+    except ValueError:
+        return False
+    return True
+
+
+class Cents(TypeDecorator):
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else value / 100
+
+
+class ClaimStatus(TypeDecorator):
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else STATUS_CODES.get(value, UNKNOWN_STATUS)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else STATUS_NAMES[value]
+
+
+class CompactUuid(TypeDecorator):
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return uuid_bytes(value)
+
+    def literal_processor(self, dialect):
+        # Only hex digits reach the SQL text.
+        if dialect.name == "postgresql":
+            return lambda value: f"'{uuid_bytes(value).hex()}'"
+        return lambda value: f"X'{uuid_bytes(value).hex()}'"
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        h = value.hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# JSONB on PostgreSQL; JSON text elsewhere. None is stored as SQL NULL.
+JsonList = JSON(none_as_null=True).with_variant(
+    postgresql.JSONB(none_as_null=True), "postgresql"
+)
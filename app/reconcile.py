@@ -0,0 +1,32 @@
+"""Rebuild derived tables from the claims table.
+
+Usage::
+
+    python -m app.reconcile
+"""
+
+import asyncio
+import logging
+
+from app.database import async_session
+from app.logging_config import configure_logging
+from app.services.benefit_accumulators import rebuild_accumulators
+from app.services.claim_counters import rebuild_counters
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile() -> None:
+    async with async_session() as db:
+        written = await rebuild_counters(db)
+        await db.commit()
+    logger.info("Rebuilt claim counters: %d rows", written)
+    async with async_session() as db:
+        written = await rebuild_accumulators(db)
+        await db.commit()
+    logger.info("Rebuilt benefit accumulators: %d rows", written)
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(reconcile())
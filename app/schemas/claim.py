@@ -1,14 +1,27 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any
 
 from pydantic import BaseModel, Field
 
+# Amounts are stored as BIGINT cents (app.models.types.Cents); floats hold
+# whole cents exactly up to 2**53 of them.
+MAX_CLAIM_AMOUNT = 10**13
+
 
 class ClaimRequest(BaseModel):
     member_id: str = Field(..., min_length=1, max_length=50, examples=["M123"])
     provider_id: str = Field(..., min_length=1, max_length=50, examples=["H456"])
     diagnosis_code: str = Field(..., min_length=1, max_length=20, examples=["D001"])
     procedure_code: str = Field(..., min_length=1, max_length=20, examples=["P001"])
-    claim_amount: float = Field(..., gt=0, examples=[50000])
+    claim_amount: float = Field(
+        ..., gt=0, le=MAX_CLAIM_AMOUNT, multiple_of=0.01, examples=[50000]
+    )
+    service_date: date | None = Field(
+        None,
+        examples=["2026-03-14"],
+        description="Date of service; resubmissions with the same claim "
+        "details and service date are detected as duplicates",
+    )
 
 
 class ClaimResponse(BaseModel):
@@ -27,6 +40,7 @@ class ClaimDetailResponse(ClaimResponse):
     diagnosis_code: str
     procedure_code: str
     claim_amount: float
+    service_date: date | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -35,7 +49,23 @@ class ClaimDetailResponse(ClaimResponse):
 
 class PaginatedClaimsResponse(BaseModel):
     items: list[ClaimDetailResponse]
-    total: int
-    page: int
+    total: int | None = None
+    page: int | None = None
     page_size: int
-    pages: int
+    pages: int | None = None
+    next_cursor: str | None = None
+
+
+class BatchClaimItemResult(BaseModel):
+    index: int
+    claim: ClaimResponse | None = None
+    errors: list[dict[str, Any]] | None = None
+    # The claim was already stored; ``claim`` is the original.
+    duplicate: bool = False
+
+
+class BatchClaimResponse(BaseModel):
+    results: list[BatchClaimItemResult]
+    created: int
+    failed: int
+    duplicates: int = 0
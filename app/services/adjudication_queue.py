@@ -0,0 +1,302 @@
+"""Asynchronous adjudication for ``POST /claims?async=true``.
+
+The API stores the claim as ``PENDING``, hands its id to
+``adjudication_queue`` and answers 202 without adjudicating. The queue
+is bounded: ``reserve`` raises ``QueueFull`` once ``max_size`` claims are
+waiting, and the API turns that into 503 with ``Retry-After`` rather
+than letting the backlog (and the time to a decision) grow without
+limit. ``workers`` background tasks each take up to ``batch_size``
+claims at a time, adjudicate them in queue order and write the outcomes,
+counters and benefit usage in one transaction per batch.
+
+With ``ADJUDICATION_QUEUE_PATH`` set, every queued id is also recorded
+in a local SQLite file (``DurableQueueStore``) until its batch commits;
+``start`` requeues whatever a previous run left there. Without it, a
+crash leaves the claims that were still queued ``PENDING``.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from collections.abc import Iterable
+from contextlib import suppress
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.metrics import registry
+from app.models.claim import Claim
+from app.services.benefit_accumulators import (
+    BenefitLimitExceeded,
+    accumulator_key,
+    benefit_ledger,
+)
+from app.services.claim_processor import ClaimProcessor
+from app.services.claim_writer import PENDING, complete_claims
+from app.services.cost_stats import cost_stats
+
+logger = logging.getLogger(__name__)
+
+# Attempts at a batch whose benefit usage lost a race with another process.
+BATCH_ATTEMPTS = 3
+
+QUEUE_LAG_SECONDS = registry.histogram(
+    "adjudication_queue_lag_seconds",
+    "Time from queueing a claim to committing its adjudication.",
+)
+QUEUE_REJECTED = registry.counter(
+    "adjudication_queue_rejected_total",
+    "Async submissions refused because the adjudication queue was full.",
+)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class DurableQueueStore:
+    """Queued claim ids in a local SQLite file.
+
+    Calls are synchronous; each is a single-row write to a WAL database
+    on local disk, which is cheaper than handing it to a thread.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS queued_claims "
+            "(claim_id TEXT PRIMARY KEY, queued_at REAL NOT NULL)"
+        )
+
+    def add(self, claim_id: str, queued_at: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO queued_claims VALUES (?, ?)",
+            (claim_id, queued_at),
+        )
+
+    def remove(self, claim_ids: Iterable[str]) -> None:
+        self._conn.executemany(
+            "DELETE FROM queued_claims WHERE claim_id = ?",
+            [(claim_id,) for claim_id in claim_ids],
+        )
+
+    def pending(self) -> list[tuple[str, float]]:
+        return self._conn.execute(
+            "SELECT claim_id, queued_at FROM queued_claims ORDER BY queued_at"
+        ).fetchall()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class AdjudicationQueue:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_size: int,
+        workers: int,
+        batch_size: int,
+        store: DurableQueueStore | None = None,
+        processor: ClaimProcessor | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self.max_size = max_size
+        self.workers = workers
+        self.batch_size = batch_size
+        self._store = store
+        self._processor = processor or ClaimProcessor()
+        # (claim_id, time.time() when queued)
+        self._queue: asyncio.Queue[tuple[str, float]] = asyncio.Queue()
+        # Slots promised to submissions that have not committed yet.
+        self._reserved = 0
+        self._tasks: list[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() + self._reserved
+
+    def reserve(self, claim_id: str) -> None:
+        """Claim a slot for ``claim_id`` before it is stored; raises
+        ``QueueFull`` if there is none. Follow with ``put`` or ``cancel``."""
+        if self.depth >= self.max_size:
+            QUEUE_REJECTED.inc()
+            raise QueueFull(f"{self.depth} claims already queued")
+        self._reserved += 1
+        if self._store is not None:
+            self._store.add(claim_id, time.time())
+
+    def put(self, claim_id: str) -> None:
+        """Queue a reserved claim once it is committed as ``PENDING``."""
+        self._reserved -= 1
+        self._queue.put_nowait((claim_id, time.time()))
+        self._ensure_workers()
+
+    def cancel(self, claim_id: str) -> None:
+        """Give back the slot of a claim that was not stored."""
+        self._reserved -= 1
+        if self._store is not None:
+            self._store.remove([claim_id])
+
+    async def start(self) -> int:
+        """Requeue what the durable store still holds and start the workers.
+
+        Returns the number of claims requeued.
+        """
+        pending = self._store.pending() if self._store is not None else []
+        for item in pending:
+            self._queue.put_nowait(item)
+        self._ensure_workers()
+        if pending:
+            logger.info("Requeued %d claims for adjudication", len(pending))
+        return len(pending)
+
+    async def join(self) -> None:
+        """Wait until every queued claim has been processed."""
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        """Finish the queued claims, then stop the workers."""
+        if self._tasks:
+            await self.join()
+        for task in self._tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        # asyncio.Queue binds to the loop it first waited on.
+        self._queue = asyncio.Queue()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "workers": len(self._tasks),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def _ensure_workers(self) -> None:
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._work()))
+
+    async def _work(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._process(batch)
+            except Exception:
+                # Left PENDING (and in the durable store, for the next start).
+                self.failed += len(batch)
+                logger.exception("Adjudication of %d queued claims failed", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _process(self, batch: list[tuple[str, float]]) -> None:
+        queued_at = dict(batch)
+        for attempt in range(1, BATCH_ATTEMPTS + 1):
+            async with self._session_factory() as db:
+                claims = (
+                    await db.execute(
+                        select(Claim)
+                        .where(Claim.id.in_(queued_at), Claim.status == PENDING)
+                        .order_by(Claim.created_at, Claim.id)
+                        # Another process working the same claims skips them.
+                        .with_for_update(skip_locked=True)
+                    )
+                ).scalars().all()
+                await benefit_ledger.load(
+                    accumulator_key(c.member_id, c.diagnosis_code, c.created_at)
+                    for c in claims
+                )
+                rows = [self._adjudicate(claim) for claim in claims]
+                try:
+                    await complete_claims(db, claims, rows)
+                    await db.commit()
+                except BenefitLimitExceeded as exc:
+                    await db.rollback()
+                    if attempt == BATCH_ATTEMPTS:
+                        raise
+                    await benefit_ledger.refresh(exc.keys)
+                    continue
+                finally:
+                    benefit_ledger.release(rows)
+            break
+
+        if self._store is not None:
+            self._store.remove(queued_at)
+        cost_stats.record_rows(rows)
+        now = time.time()
+        for row in rows:
+            QUEUE_LAG_SECONDS.observe(now - queued_at[row["id"]])
+        self.completed += len(rows)
+
+    def _adjudicate(self, claim: Claim) -> dict:
+        """Adjudicate ``claim`` and reserve its approved amount; there must
+        be no ``await`` between the two."""
+        result = self._processor.adjudicate(
+            member_id=claim.member_id,
+            provider_id=claim.provider_id,
+            diagnosis_code=claim.diagnosis_code,
+            procedure_code=claim.procedure_code,
+            claim_amount=claim.claim_amount,
+            ytd_used=benefit_ledger.used(
+                accumulator_key(claim.member_id, claim.diagnosis_code, claim.created_at)
+            ),
+        )
+        row = {
+            "id": claim.id,
+            "member_id": claim.member_id,
+            "provider_id": claim.provider_id,
+            "diagnosis_code": claim.diagnosis_code,
+            "procedure_code": claim.procedure_code,
+            "claim_amount": claim.claim_amount,
+            "created_at": claim.created_at,
+            "status": result.status,
+            "fraud_flag": result.fraud_flag,
+            "approved_amount": result.approved_amount,
+            "rejection_reasons": result.rejection_reasons or None,
+            "updated_at": datetime.now(timezone.utc),
+        }
+        benefit_ledger.reserve(row)
+        return row
+
+
+adjudication_queue = AdjudicationQueue(
+    async_session,
+    max_size=settings.adjudication_queue_size,
+    workers=settings.adjudication_workers,
+    batch_size=settings.adjudication_batch_size,
+    store=(
+        DurableQueueStore(settings.adjudication_queue_path)
+        if settings.adjudication_queue_path
+        else None
+    ),
+)
+
+
+def _queue_metrics() -> list[str]:
+    stats = adjudication_queue.stats()
+    return [
+        "# HELP adjudication_queue_depth Claims waiting for async adjudication.",
+        "# TYPE adjudication_queue_depth gauge",
+        f"adjudication_queue_depth {stats['depth']}",
+        "# HELP adjudication_queue_capacity Async adjudication queue bound.",
+        "# TYPE adjudication_queue_capacity gauge",
+        f"adjudication_queue_capacity {stats['max_size']}",
+    ]
+
+
+registry.add_collector(_queue_metrics)
@@ -0,0 +1,334 @@
+"""Year-to-date benefit usage per member and diagnosis.
+
+``benefit_accumulators`` holds the approved amount per
+``(member_id, diagnosis_code, year)`` and is upserted in the same
+transaction as every claim insert (``record_usage``), so it never drifts
+from the claims table; ``rebuild_accumulators`` recomputes it from
+scratch (see ``app.reconcile``).
+
+Adjudication reads usage from ``benefit_ledger``, an in-process cache,
+so the annual limit check stays a dict lookup. A limit cannot be spent
+twice by concurrent submissions:
+
+- Within a process, a claim's approved amount is reserved in the ledger
+  right after it is adjudicated, with no ``await`` in between, so the
+  next claim for the same key already sees it. On commit the
+  reservation is swapped for the new committed total in one step.
+- Across processes, ``record_usage`` raises ``BenefitLimitExceeded``
+  when a returned total is over its limit; the caller rolls back,
+  refreshes the ledger and adjudicates again.
+"""
+
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    cast,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+    text,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.config import settings
+from app.database import async_session, dialect_insert
+from app.models.benefit_accumulator import BenefitAccumulator
+from app.models.claim import Claim
+from app.models.types import round_cents
+from app.services.rules import benefit_exhausted_reason
+from app.services.reference_data import reference_data
+
+AccumulatorKey = tuple[str, str, int]
+
+# Float sums of the same amounts can differ in the last bits.
+LIMIT_TOLERANCE = 1e-6
+
+_PENDING_KEY = "benefit_usage"
+
+
+class BenefitLimitExceeded(Exception):
+    def __init__(self, keys: list[AccumulatorKey]) -> None:
+        super().__init__(
+            "Annual benefit limit exceeded for "
+            + ", ".join(f"{m}/{d}/{y}" for m, d, y in keys)
+        )
+        self.keys = keys
+
+
+def accumulator_key(
+    member_id: str, diagnosis_code: str, at: datetime
+) -> AccumulatorKey:
+    return (member_id, diagnosis_code, at.year)
+
+
+def _row_key(row: dict) -> AccumulatorKey:
+    return accumulator_key(row["member_id"], row["diagnosis_code"], row["created_at"])
+
+
+def usage(rows: Iterable[dict]) -> Counter:
+    """Approved amount per accumulator key in ``rows``."""
+    amounts: Counter = Counter()
+    for row in rows:
+        if row["approved_amount"] > 0:
+            amounts[_row_key(row)] += row["approved_amount"]
+    return amounts
+
+
+class BenefitLedger:
+    """LRU cache of committed usage plus in-flight reservations.
+
+    Committed values only ever move up (the table is append-only), so
+    a stale read racing a commit can never lower a cached total.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_entries: int,
+    ) -> None:
+        self._session_factory = session_factory
+        self.max_entries = max_entries
+        self._committed: OrderedDict[AccumulatorKey, float] = OrderedDict()
+        self._reserved: Counter = Counter()
+        self._reservations: dict[str, tuple[AccumulatorKey, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def used(self, key: AccumulatorKey) -> float:
+        """Committed plus reserved usage for ``key``; ``load`` it first."""
+        committed = self._committed.get(key)
+        if committed is None:
+            # Evicted or never loaded: record_usage still catches overspend.
+            self.misses += 1
+            committed = 0.0
+        else:
+            self.hits += 1
+            self._committed.move_to_end(key)
+        return committed + self._reserved[key]
+
+    async def load(self, keys: Iterable[AccumulatorKey]) -> None:
+        """Read the keys not cached yet from the table."""
+        missing = [key for key in set(keys) if key not in self._committed]
+        if missing:
+            await self.refresh(missing)
+
+    async def refresh(self, keys: Iterable[AccumulatorKey]) -> None:
+        """Re-read ``keys`` from the table, e.g. after another process won."""
+        keys = list(set(keys))
+        async with self._session_factory() as db:
+            values = await read_usage(db, keys)
+        for key in keys:
+            self._observe(key, values.get(key, 0.0))
+
+    def reserve(self, row: dict) -> None:
+        """Hold ``row``'s approved amount until its transaction ends."""
+        amount = row["approved_amount"]
+        if amount > 0 and row["id"] not in self._reservations:
+            key = _row_key(row)
+            self._reservations[row["id"]] = (key, amount)
+            self._reserved[key] += amount
+
+    def release(self, rows: Iterable[dict]) -> None:
+        """Drop reservations for ``rows``; a no-op once they committed."""
+        for row in rows:
+            reservation = self._reservations.pop(row["id"], None)
+            if reservation is not None:
+                key, amount = reservation
+                self._reserved[key] -= amount
+                if self._reserved[key] <= LIMIT_TOLERANCE:
+                    del self._reserved[key]
+
+    def apply_limits(self, rows: list[dict]) -> None:
+        """Cap ``rows`` from ``adjudicate_many`` at the remaining annual limit.
+
+        Rows are capped and reserved in order, like ``adjudicate`` with
+        ``ytd_used`` per claim; ``load`` their keys first. Rows whose
+        diagnosis has no limit (e.g. a rule set without ``benefit_limit``)
+        are left as they are.
+        """
+        limit_of = reference_data.snapshot.benefit_limits.get
+        for row in rows:
+            limit = limit_of(row["diagnosis_code"])
+            if row["approved_amount"] <= 0 or limit is None:
+                continue
+            remaining = limit - self.used(_row_key(row))
+            if remaining <= 0:
+                row["status"] = "REJECTED"
+                row["approved_amount"] = 0.0
+                row["rejection_reasons"] = [
+                    benefit_exhausted_reason(row["diagnosis_code"])
+                ]
+                continue
+            if row["approved_amount"] > remaining:
+                row["approved_amount"] = round_cents(remaining)
+                row["status"] = "PARTIAL"
+            self.reserve(row)
+
+    def clear(self) -> None:
+        self._committed.clear()
+        self._reserved.clear()
+        self._reservations.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._committed),
+            "max_entries": self.max_entries,
+            "reserved": len(self._reservations),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _observe(self, key: AccumulatorKey, value: float) -> None:
+        self._committed[key] = max(self._committed.get(key, 0.0), value)
+        self._committed.move_to_end(key)
+        while len(self._committed) > self.max_entries:
+            self._committed.popitem(last=False)
+
+    def _committed_usage(self, totals: dict, claim_ids: list[str]) -> None:
+        # Runs synchronously inside commit, so no claim can be adjudicated
+        # between the reservation going away and the total arriving.
+        self.release({"id": claim_id} for claim_id in claim_ids)
+        for key, total in totals.items():
+            self._observe(key, total)
+
+
+async def read_usage(
+    db: AsyncSession, keys: list[AccumulatorKey]
+) -> dict[AccumulatorKey, float]:
+    if not keys:
+        return {}
+    result = await db.execute(
+        select(
+            BenefitAccumulator.member_id,
+            BenefitAccumulator.diagnosis_code,
+            BenefitAccumulator.year,
+            BenefitAccumulator.used_amount,
+        ).where(
+            tuple_(
+                BenefitAccumulator.member_id,
+                BenefitAccumulator.diagnosis_code,
+                BenefitAccumulator.year,
+            ).in_(keys)
+        )
+    )
+    return {(m, d, y): used for m, d, y, used in result.tuples()}
+
+
+async def record_usage(
+    db: AsyncSession, rows: list[dict], check_limits: bool = True
+) -> dict[AccumulatorKey, float]:
+    """Add the approved amounts in ``rows`` and return the new totals.
+
+    Raises ``BenefitLimitExceeded`` if ``check_limits`` and a total went
+    over its diagnosis limit; the caller must roll back. ``benefit_ledger``
+    picks the totals up when the transaction commits.
+    """
+    amounts = usage(rows)
+    if not amounts:
+        return {}
+    now = datetime.now(timezone.utc)
+    insert_ = dialect_insert(db)
+    stmt = insert_(BenefitAccumulator)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["member_id", "diagnosis_code", "year"],
+        set_={
+            "used_amount": BenefitAccumulator.used_amount + stmt.excluded.used_amount,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ).returning(
+        BenefitAccumulator.member_id,
+        BenefitAccumulator.diagnosis_code,
+        BenefitAccumulator.year,
+        BenefitAccumulator.used_amount,
+    )
+    totals = {}
+    # One statement per key: RETURNING is not available for executemany
+    # upserts on every backend, and a claim batch touches few keys.
+    # Sorted so concurrent transactions lock rows in the same order.
+    for (member_id, diagnosis_code, year), amount in sorted(amounts.items()):
+        m, d, y, total = (
+            await db.execute(
+                stmt,
+                {
+                    "member_id": member_id,
+                    "diagnosis_code": diagnosis_code,
+                    "year": year,
+                    "used_amount": amount,
+                    "updated_at": now,
+                },
+            )
+        ).one()
+        totals[(m, d, y)] = total
+
+    if check_limits:
+        limits = reference_data.snapshot.benefit_limits
+        over = [
+            key
+            for key, total in totals.items()
+            if key[1] in limits and total > limits[key[1]] + LIMIT_TOLERANCE
+        ]
+        if over:
+            raise BenefitLimitExceeded(over)
+
+    pending = db.sync_session.info.setdefault(_PENDING_KEY, ({}, []))
+    pending[0].update(totals)
+    pending[1].extend(row["id"] for row in rows if row["approved_amount"] > 0)
+    return totals
+
+
+async def rebuild_accumulators(db: AsyncSession) -> int:
+    """Recompute every accumulator row from ``claims``. The caller commits.
+
+    Returns the number of rows written. Running services keep their
+    cached totals, which can only err high, until restarted.
+    """
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(text("LOCK TABLE claims IN SHARE MODE"))
+    await db.execute(delete(BenefitAccumulator))
+    year = cast(func.extract("year", Claim.created_at), Integer)
+    query = (
+        select(
+            Claim.member_id,
+            Claim.diagnosis_code,
+            year,
+            # Stored in cents; see app.models.types.Cents.
+            func.sum(type_coerce(Claim.approved_amount, BigInteger)) / 100.0,
+            func.current_timestamp(),
+        )
+        .where(Claim.approved_amount > 0)
+        .group_by(Claim.member_id, Claim.diagnosis_code, year)
+    )
+    result = await db.execute(
+        insert(BenefitAccumulator).from_select(
+            ["member_id", "diagnosis_code", "year", "used_amount", "updated_at"],
+            query,
+        )
+    )
+    return result.rowcount
+
+
+benefit_ledger = BenefitLedger(async_session, max_entries=settings.benefit_cache_size)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_usage(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending is not None:
+        benefit_ledger._committed_usage(*pending)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_usage(session: Session, transaction: SessionTransaction) -> None:
+    # Fires after after_commit too, so only rolled back usage is left here.
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
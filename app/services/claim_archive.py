@@ -0,0 +1,313 @@
+"""Cold archive of old claims in Parquet files.
+
+``app.archive`` moves whole months out of ``claims`` into
+``<ARCHIVE_DIR>/claims-YYYY-MM.parquet``: every column, with the values
+the API uses (float amounts, status names), zstd-compressed, in
+``(created_at, id)`` order and row groups of ``ROW_GROUP_SIZE`` rows.
+Rows archived after their month already has a file go into the next free
+``claims-YYYY-MM.N.parquet``.
+
+``claim_archive`` reads them back for ``GET /claims/{claim_id}`` (when
+the claim is not in the table) and for the export, which streams the
+matching archived months before the table's rows. A version 7 claim id
+carries its creation time (``app.models.types.claim_id_time``), so a
+lookup of one newer than ``archive_cutoff`` returns at once, and any
+other opens that month's file only and, with the ids sorted, skips every
+row group whose id range misses. Older random ids are looked for in
+every file; the last ``MISS_CACHE_SIZE`` of them not found are
+remembered until the set of files changes, so repeating an unknown id
+costs no reads.
+
+pyarrow is optional: without it, or without ``ARCHIVE_DIR``, nothing is
+archived and reads only see the table.
+"""
+
+import asyncio
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.config import settings
+from app.metrics import registry
+from app.models.types import claim_id_time
+from app.services.claim_partitions import add_months, month_start
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+ROW_GROUP_SIZE = 16_384
+COMPRESSION = "zstd"
+MISS_CACHE_SIZE = 10_000
+
+ARCHIVE_LOOKUPS = registry.counter(
+    "claim_archive_lookups_total",
+    "Claim reads that missed the claims table and looked in the archive.",
+    ("result",),
+)
+
+
+class ArchiveUnavailable(RuntimeError):
+    pass
+
+
+def archive_cutoff(now: datetime, after_months: int) -> datetime:
+    """Months starting before this are archived."""
+    cutoff = add_months(month_start(now), -after_months)
+    return min(cutoff, datetime(now.year, 1, 1, tzinfo=timezone.utc))
+
+
+def archive_schema() -> "pa.Schema":
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("member_id", pa.string()),
+            ("provider_id", pa.string()),
+            ("diagnosis_code", pa.string()),
+            ("procedure_code", pa.string()),
+            ("claim_amount", pa.float64()),
+            ("service_date", pa.date32()),
+            ("fingerprint", pa.string()),
+            ("status", pa.string()),
+            ("fraud_flag", pa.bool_()),
+            ("approved_amount", pa.float64()),
+            ("rejection_reasons", pa.list_(pa.string())),
+            ("created_at", timestamp),
+            ("updated_at", timestamp),
+        ]
+    )
+
+
+def month_file(directory: Path, start: datetime, part: int = 0) -> Path:
+    suffix = f".{part}" if part else ""
+    return directory / f"claims-{start:%Y-%m}{suffix}.parquet"
+
+
+def file_month(path: Path) -> datetime:
+    """The month a ``claims-YYYY-MM[.N].parquet[.tmp]`` file holds."""
+    return datetime.strptime(path.name[7:14], "%Y-%m").replace(tzinfo=timezone.utc)
+
+
+def _file_order(path: Path) -> tuple[datetime, int]:
+    part = path.name[14:].removesuffix(".parquet").lstrip(".")
+    return file_month(path), int(part or 0)
+
+
+class ArchiveWriter:
+    """Writes one month's rows to ``<file>.tmp``.
+
+    ``close`` makes the temporary file durable; ``publish`` renames it
+    into place once the rows are deleted from the table, and ``discard``
+    removes it if they are not. A ``.tmp`` left by a crash is settled by
+    ``app.archive.recover``.
+    """
+
+    def __init__(self, directory: Path, start: datetime) -> None:
+        part = 0
+        while month_file(directory, start, part).exists():
+            part += 1
+        self.path = month_file(directory, start, part)
+        self.tmp = self.path.with_name(self.path.name + ".tmp")
+        self.rows = 0
+        self._schema = archive_schema()
+        self._pending: list[dict] = []
+        self._file = open(self.tmp, "wb")
+        self._writer = pq.ParquetWriter(
+            self._file, self._schema, compression=COMPRESSION
+        )
+
+    def write(self, rows: Sequence[dict]) -> None:
+        # Buffered so each row group is full-sized, whatever the batches.
+        self._pending.extend(rows)
+        self.rows += len(rows)
+        while len(self._pending) >= ROW_GROUP_SIZE:
+            self._flush(self._pending[:ROW_GROUP_SIZE])
+            del self._pending[:ROW_GROUP_SIZE]
+
+    def _flush(self, rows: list[dict]) -> None:
+        self._writer.write_table(
+            pa.Table.from_pylist(rows, schema=self._schema),
+            row_group_size=ROW_GROUP_SIZE,
+        )
+
+    def close(self) -> None:
+        if self._pending:
+            self._flush(self._pending)
+            self._pending = []
+        self._writer.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def publish(self) -> Path:
+        os.replace(self.tmp, self.path)
+        return self.path
+
+    def discard(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        self.tmp.unlink(missing_ok=True)
+
+
+class ClaimArchive:
+    def __init__(self, directory: str = settings.archive_dir) -> None:
+        self.directory = Path(directory) if directory else None
+        # Random ids not found, valid while the files are _miss_files.
+        self._misses: OrderedDict[str, None] = OrderedDict()
+        self._miss_files: list[Path] = []
+        self._miss_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and pq is not None
+
+    def require(self) -> Path:
+        """The archive directory, created if missing; raises
+        ``ArchiveUnavailable`` if archiving is not possible."""
+        if self.directory is None:
+            raise ArchiveUnavailable("ARCHIVE_DIR is not set")
+        if pq is None:
+            raise ArchiveUnavailable("Archiving needs pyarrow: pip install pyarrow")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self.directory
+
+    def writer(self, start: datetime) -> ArchiveWriter:
+        return ArchiveWriter(self.require(), start)
+
+    def files(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> list[Path]:
+        """Archive files, oldest month first, for months overlapping
+        ``[since, until)``."""
+        if not self.enabled or not self.directory.is_dir():
+            return []
+        first = month_start(since) if since is not None else None
+        if until is not None and until.tzinfo is None:
+            until = until.replace(tzinfo=timezone.utc)
+        paths = []
+        for path in self.directory.glob("claims-????-??*.parquet"):
+            month = file_month(path)
+            if first is not None and month < first:
+                continue
+            if until is not None and month >= until:
+                continue
+            paths.append(path)
+        return sorted(paths, key=_file_order)
+
+    def pending(self) -> list[Path]:
+        """Temporary files left by an interrupted run."""
+        if self.directory is None or not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("claims-*.parquet.tmp"))
+
+    def first_id(self, path: Path) -> str | None:
+        """The first claim id in ``path``; ``None`` if it is unreadable, as
+        a file cut short by a crash is."""
+        try:
+            ids = pq.ParquetFile(path).read_row_group(0, columns=["id"])
+        except (OSError, IndexError, pa.ArrowException):
+            return None
+        return ids.column("id")[0].as_py() if ids.num_rows else None
+
+    def _read(self, paths: list[Path], claim_id: str) -> dict | None:
+        for path in paths:
+            table = pq.read_table(path, filters=[("id", "==", claim_id)])
+            if table.num_rows:
+                return table.slice(0, 1).to_pylist()[0]
+        return None
+
+    def _find(self, claim_id: str) -> dict | None:
+        created = claim_id_time(claim_id)
+        if created is not None:
+            return self._read(
+                self.files(created, add_months(month_start(created), 1)), claim_id
+            )
+        paths = self.files()
+        with self._miss_lock:
+            if paths != self._miss_files:
+                self._misses.clear()
+                self._miss_files = paths
+            if claim_id in self._misses:
+                self._misses.move_to_end(claim_id)
+                return None
+        row = self._read(paths, claim_id)
+        if row is None:
+            with self._miss_lock:
+                if paths == self._miss_files:
+                    self._misses[claim_id] = None
+                    while len(self._misses) > MISS_CACHE_SIZE:
+                        self._misses.popitem(last=False)
+        return row
+
+    async def find(self, claim_id: str, now: datetime | None = None) -> dict | None:
+        """The archived claim's column values, or ``None``."""
+        if not self.enabled:
+            return None
+        claim_id = str(uuid.UUID(claim_id))
+        created = claim_id_time(claim_id)
+        cutoff = archive_cutoff(
+            now or datetime.now(timezone.utc), settings.archive_after_months
+        )
+        if created is not None and created >= cutoff:
+            # Too recent to have been archived.
+            return None
+        row = await asyncio.to_thread(self._find, claim_id)
+        ARCHIVE_LOOKUPS.inc("hit" if row is not None else "miss")
+        return row
+
+    async def scan(
+        self,
+        columns: Sequence[str],
+        batch_size: int,
+        member_id: str | None = None,
+        status: str | None = None,
+        fraud_flag: bool | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield batches of matching archived rows, oldest month first."""
+        paths = self.files(created_from, created_to)
+        if not paths:
+            return
+        timestamp = pa.timestamp("us", tz="UTC")
+        conditions = []
+        if member_id:
+            conditions.append(ds.field("member_id") == member_id)
+        if status:
+            conditions.append(ds.field("status") == status)
+        if fraud_flag is not None:
+            conditions.append(ds.field("fraud_flag") == fraud_flag)
+        if created_from is not None:
+            conditions.append(
+                ds.field("created_at") >= pa.scalar(created_from, timestamp)
+            )
+        if created_to is not None:
+            conditions.append(ds.field("created_at") < pa.scalar(created_to, timestamp))
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        for path in paths:
+            # Sequential, so batches come out in file order.
+            batches = iter(
+                ds.dataset(path, format="parquet").to_batches(
+                    columns=list(columns),
+                    filter=expression,
+                    batch_size=batch_size,
+                    use_threads=False,
+                )
+            )
+            while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                if batch.num_rows:
+                    yield batch.to_pylist()
+
+
+claim_archive = ClaimArchive()
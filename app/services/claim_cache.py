@@ -0,0 +1,157 @@
+"""Read-through cache of serialized ``GET /claims/{claim_id}`` bodies.
+
+Entries are evicted least-recently-used beyond ``max_entries`` and expire
+after ``ttl`` seconds. Entries are keyed by the id's canonical form, so
+``/claims/{ID}`` and ``/claims/{id}`` share one. ORM updates and deletes
+of a ``Claim`` invalidate its entry in this process once the transaction
+commits; the TTL bounds staleness for changes made by other processes or
+through Core ``UPDATE`` statements.
+
+A reader that took its snapshot before such a commit could still put the
+old row back after the invalidation. So readers take the id's
+``version`` before reading and pass it to ``put``, which stores nothing
+if the id was invalidated since. Rows read from a replica are not cached
+at all (see ``GET /claims/{claim_id}``): the replica may not have seen a
+change yet.
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction, object_session
+
+from app.config import settings
+from app.metrics import registry
+from app.models.claim import Claim
+
+_PENDING_KEY = "claim_cache_invalidations"
+
+
+@dataclass(frozen=True)
+class CachedClaim:
+    etag: str
+    body: bytes
+    expires_at: float
+
+
+def claim_etag(updated_at: datetime) -> str:
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    micros = int(updated_at.timestamp() * 1_000_000)
+    return f'"{micros:x}"'
+
+
+def _key(claim_id: str | uuid.UUID) -> str:
+    """Canonical form of a claim id; raises ``ValueError`` if it is not one."""
+    return str(uuid.UUID(str(claim_id)))
+
+
+class ClaimCache:
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CachedClaim] = OrderedDict()
+        # Recently invalidated ids and when, on a clock ``invalidate`` bumps.
+        # Ids pushed out past ``max_entries`` count as invalidated at
+        # ``_forgotten``, which only makes ``put`` skip more.
+        self._clock = 0
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._forgotten = 0
+
+    def get(self, claim_id: str) -> CachedClaim | None:
+        key = _key(claim_id)
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def version(self, claim_id: str) -> int:
+        """Changes whenever ``claim_id`` is invalidated; take it before
+        reading the row to ``put``."""
+        return self._invalidated.get(_key(claim_id), self._forgotten)
+
+    def put(self, claim_id: str, etag: str, body: bytes, version: int) -> None:
+        """Cache a body read after ``version`` was taken, unless the id has
+        been invalidated since."""
+        if self.max_entries <= 0 or self.version(claim_id) != version:
+            return
+        key = _key(claim_id)
+        self._entries[key] = CachedClaim(etag, body, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, claim_id: str) -> None:
+        key = _key(claim_id)
+        self._entries.pop(key, None)
+        self._clock += 1
+        self._invalidated[key] = self._clock
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > max(self.max_entries, 1):
+            _, self._forgotten = self._invalidated.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._invalidated.clear()
+        self._clock = self._forgotten = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+claim_cache = ClaimCache(settings.claim_cache_size, settings.claim_cache_ttl)
+
+
+@event.listens_for(Claim, "after_update")
+@event.listens_for(Claim, "after_delete")
+def _queue_invalidation(mapper, connection, target: Claim) -> None:
+    object_session(target).info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for claim_id in session.info.pop(_PENDING_KEY, ()):
+        claim_cache.invalidate(claim_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_invalidations(session: Session, transaction: SessionTransaction) -> None:
+    # Fires after after_commit too, so only rolled back changes are left here.
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _cache_metrics() -> list[str]:
+    stats = claim_cache.stats()
+    return [
+        "# HELP claim_cache_hits_total GET /claims/{claim_id} cache hits.",
+        "# TYPE claim_cache_hits_total counter",
+        f"claim_cache_hits_total {stats['hits']}",
+        "# HELP claim_cache_misses_total GET /claims/{claim_id} cache misses.",
+        "# TYPE claim_cache_misses_total counter",
+        f"claim_cache_misses_total {stats['misses']}",
+        "# HELP claim_cache_entries Claim bodies currently cached.",
+        "# TYPE claim_cache_entries gauge",
+        f"claim_cache_entries {stats['size']}",
+    ]
+
+
+registry.add_collector(_cache_metrics)
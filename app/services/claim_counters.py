@@ -0,0 +1,114 @@
+"""Incrementally maintained claim counts.
+
+``claim_counters`` is updated in the same transaction as every claim
+insert, so ``GET /claims`` can answer ``total`` by summing a handful of
+counter rows instead of running ``count(*)`` over the claims table.
+``rebuild_counters`` recomputes it from scratch (see ``app.reconcile``).
+"""
+
+import random
+from collections import Counter
+from collections.abc import Iterable
+
+from sqlalchemy import String, delete, func, insert, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import dialect_insert
+from app.models.claim import Claim
+from app.models.claim_counter import ClaimCounter
+
+ALL_MEMBERS = ""
+
+CounterKey = tuple[str, str, bool]
+
+
+async def increment_counters(db: AsyncSession, keys: Iterable[CounterKey]) -> None:
+    """Count one claim per ``(member_id, status, fraud_flag)`` key."""
+    await apply_counter_deltas(db, Counter(keys))
+
+
+async def apply_counter_deltas(db: AsyncSession, deltas: Counter) -> None:
+    """Add ``deltas`` (key -> signed change) to the member and global rows."""
+    shard = random.randrange(settings.claim_counter_shards)
+    rows: Counter = Counter()
+    for (member_id, status, fraud_flag), delta in deltas.items():
+        rows[(member_id, status, fraud_flag, 0)] += delta
+        rows[(ALL_MEMBERS, status, fraud_flag, shard)] += delta
+    if not rows:
+        return
+
+    insert_ = dialect_insert(db)
+    stmt = insert_(ClaimCounter)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["member_id", "status", "fraud_flag", "shard"],
+        set_={"count": ClaimCounter.count + stmt.excluded.count},
+    )
+    # Sorted so concurrent transactions lock counter rows in the same order.
+    await db.execute(
+        stmt,
+        [
+            {
+                "member_id": member_id,
+                "status": status,
+                "fraud_flag": fraud_flag,
+                "shard": shard_id,
+                "count": delta,
+            }
+            for (member_id, status, fraud_flag, shard_id), delta in sorted(
+                rows.items()
+            )
+            if delta
+        ],
+    )
+
+
+async def count_claims(
+    db: AsyncSession,
+    member_id: str | None,
+    status: str | None,
+    fraud_flag: bool | None,
+) -> int:
+    query = select(func.coalesce(func.sum(ClaimCounter.count), 0)).where(
+        ClaimCounter.member_id == (member_id or ALL_MEMBERS)
+    )
+    if status:
+        query = query.where(ClaimCounter.status == status)
+    if fraud_flag is not None:
+        query = query.where(ClaimCounter.fraud_flag == fraud_flag)
+    return (await db.execute(query)).scalar_one()
+
+
+async def rebuild_counters(db: AsyncSession) -> int:
+    """Recompute every counter row from ``claims``. The caller commits.
+
+    Returns the number of counter rows written.
+    """
+    if db.bind.dialect.name == "postgresql":
+        # Blocks claim inserts (and so counter increments) until commit.
+        await db.execute(text("LOCK TABLE claims IN SHARE MODE"))
+    await db.execute(delete(ClaimCounter))
+
+    columns = ["member_id", "status", "fraud_flag", "shard", "count"]
+    per_member = select(
+        Claim.member_id,
+        Claim.status,
+        Claim.fraud_flag,
+        literal(0),
+        func.count(),
+    ).group_by(Claim.member_id, Claim.status, Claim.fraud_flag)
+    all_members = select(
+        literal(ALL_MEMBERS, String),
+        Claim.status,
+        Claim.fraud_flag,
+        literal(0),
+        func.count(),
+    ).group_by(Claim.status, Claim.fraud_flag)
+
+    written = 0
+    for query in (per_member, all_members):
+        result = await db.execute(
+            insert(ClaimCounter).from_select(columns, query)
+        )
+        written += result.rowcount
+    return written
@@ -0,0 +1,138 @@
+"""Monthly range partitions of ``claims`` on PostgreSQL.
+
+Migration ``c6d2a8f4e157`` turns ``claims`` into a table partitioned by
+``created_at``: one partition per calendar month (UTC) named
+``claims_YYYY_MM``, and ``claims_default`` for rows outside all of them.
+Queries bounded on ``created_at`` (list pages, cursor seeks, export
+ranges) only read the partitions in range, and each month's indexes
+stay the size of one month. ``app.archive`` creates the coming months
+with ``create_partition`` and drops a month with ``drop_partition`` once
+it is archived.
+
+PostgreSQL requires a unique index on a partitioned table to include the
+partition key, so the primary key is ``(id, created_at)`` and
+``fingerprint`` is unique per partition only: two identical claims
+submitted at the same moment in different months are both stored. Claims
+submitted one after the other are still caught by
+``app.services.duplicates``, which looks fingerprints up across all
+partitions. SQLite tables are never partitioned; there the helpers below
+that take a session report no partitions.
+"""
+
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PARTITION = "claims_default"
+MONTHLY_PARTITION = re.compile(r"claims_\d{4}_\d{2}")
+DETACH_LOCK_TIMEOUT = "5s"
+
+
+def month_start(at: datetime) -> datetime:
+    """Midnight UTC on the first day of ``at``'s month (naive means UTC)."""
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc)
+    return datetime(at.year, at.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(start: datetime, months: int) -> datetime:
+    index = start.year * 12 + start.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(start: datetime) -> str:
+    return f"claims_{start:%Y_%m}"
+
+
+def is_partition(table_name: str) -> bool:
+    """Whether ``table_name`` is a partition of ``claims``; migrations
+    leave these alone."""
+    return table_name == DEFAULT_PARTITION or bool(
+        MONTHLY_PARTITION.fullmatch(table_name)
+    )
+
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    if db.bind.dialect.name != "postgresql":
+        return False
+    return await db.scalar(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = 'claims'::regclass)"
+        )
+    )
+
+
+async def list_partitions(db: AsyncSession) -> list[datetime]:
+    """Month starts of the existing monthly partitions, oldest first."""
+    if not await is_partitioned(db):
+        return []
+    names = await db.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'claims'::regclass"
+        )
+    )
+    return sorted(
+        datetime.strptime(name, "claims_%Y_%m").replace(tzinfo=timezone.utc)
+        for name in names
+        if name != DEFAULT_PARTITION
+    )
+
+
+async def create_partition(db: AsyncSession, start: datetime) -> None:
+    """Add the partition for ``start``'s month. The caller commits.
+
+    Rows for that month already in ``claims_default`` (written while the
+    partition was missing) are moved into it first; attaching fails
+    otherwise.
+    """
+    name = partition_name(start)
+    # Generated values only, rendered inline: DDL takes no bind parameters.
+    lo = f"'{start.isoformat()}'"
+    hi = f"'{add_months(start, 1).isoformat()}'"
+    in_range = f"created_at >= {lo} AND created_at < {hi}"
+    for statement in (
+        f"CREATE TABLE {name} (LIKE claims INCLUDING DEFAULTS)",
+        f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}",
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}",
+        # Creates the parent's indexes on the new partition.
+        f"ALTER TABLE claims ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ({lo}) TO ({hi})",
+        f"CREATE UNIQUE INDEX {name}_fingerprint_key ON {name} (fingerprint)",
+    ):
+        await db.execute(text(statement))
+
+
+async def ensure_partitions(
+    db: AsyncSession, now: datetime, ahead: int
+) -> list[datetime]:
+    """Create any missing partitions from ``now``'s month to ``ahead``
+    months later. The caller commits. Returns the months created."""
+    if not await is_partitioned(db):
+        return []
+    existing = set(await list_partitions(db))
+    first = month_start(now)
+    created = []
+    for offset in range(ahead + 1):
+        start = add_months(first, offset)
+        if start not in existing:
+            await create_partition(db, start)
+            created.append(start)
+    return created
+
+
+async def drop_partition(db: AsyncSession, start: datetime) -> None:
+    """Detach and drop ``start``'s partition with its rows. The caller commits.
+
+    Detaching locks all of ``claims`` until the commit; rather than queue
+    traffic behind a long-running query, it gives up (raises) after
+    ``DETACH_LOCK_TIMEOUT``.
+    """
+    name = partition_name(start)
+    await db.execute(text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'"))
+    await db.execute(text(f"ALTER TABLE claims DETACH PARTITION {name}"))
+    await db.execute(text(f"DROP TABLE {name}"))
@@ -1,22 +1,36 @@
 """Core claim adjudication logic.
 
-Each validation step is a separate method so individual rules
-can be tested and extended independently.
+The checks themselves are declared in the rule config and compiled by
+``app.services.rules``; this module runs the compiled pipeline and
+resolves the final status.
 """
 
 import logging
+import random
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 
-from app.services.mock_data import (
-    BENEFIT_LIMITS,
-    MEMBERS,
-    PROCEDURE_AVG_COSTS,
-    PROVIDERS,
+import numpy as np
+
+from app.config import settings
+from app.models.types import round_cents
+from app.services.columnar import (
+    STATUS_NAMES,
+    AdjudicationColumns,
+    adjudicate_columns,
+)
+from app.services.cost_stats import CostStatsTracker, cost_stats, fraud_threshold
+from app.services.reference_data import (
+    ReferenceDataCache,
+    ReferenceSnapshot,
+    reference_data,
 )
+from app.services.rules import ClaimFacts, Pipeline, RuleSet, compile_rules, rule_set
 
 logger = logging.getLogger(__name__)
 
-FRAUD_COST_MULTIPLIER = 2.0
+# Share of routine (approved / partial, not flagged) adjudications logged.
+LOG_SAMPLE_RATE = settings.log_adjudication_sample_rate
 
 
 @dataclass
@@ -28,7 +42,36 @@ class AdjudicationResult:
 
 
 class ClaimProcessor:
-    """Runs a claim through eligibility, benefit, and fraud checks."""
+    """Runs a claim through the compiled adjudication rules.
+
+    Reference data, fraud thresholds and the rule config come from the
+    current snapshots, read once per call so a concurrent swap never
+    mixes two versions within one claim. The pipeline is recompiled when
+    the reference snapshot or the rule config changes.
+    """
+
+    def __init__(
+        self,
+        reference: ReferenceDataCache | None = None,
+        costs: CostStatsTracker | None = None,
+        rules: RuleSet | None = None,
+    ) -> None:
+        self._reference = reference or reference_data
+        self._costs = costs or cost_stats
+        self._rules = rules or rule_set
+        self._compiled: tuple[ReferenceSnapshot, dict, Pipeline] | None = None
+
+    def pipeline(self) -> Pipeline:
+        ref = self._reference.snapshot
+        config = self._rules.config
+        compiled = self._compiled
+        if compiled is None or compiled[0] is not ref or compiled[1] is not config:
+            compiled = self._compiled = (
+                ref,
+                config,
+                compile_rules(config, ref, self._costs),
+            )
+        return compiled[2]
 
     def adjudicate(
         self,
@@ -37,69 +80,130 @@ class ClaimProcessor:
         diagnosis_code: str,
         procedure_code: str,
         claim_amount: float,
+        ytd_used: float = 0.0,
     ) -> AdjudicationResult:
-        result = AdjudicationResult(approved_amount=claim_amount)
+        """Adjudicate one claim.
 
-        self._check_member_eligibility(member_id, result)
-        self._check_provider(provider_id, result)
-        self._check_benefit_limit(diagnosis_code, claim_amount, result)
-        self._check_fraud(procedure_code, claim_amount, result)
+        ``ytd_used`` is what the member has already been approved for this
+        diagnosis in the current benefit year; see
+        ``app.services.benefit_accumulators``.
+        """
+        result = AdjudicationResult(approved_amount=claim_amount)
+        self.pipeline().run(
+            ClaimFacts(
+                member_id,
+                provider_id,
+                diagnosis_code,
+                procedure_code,
+                claim_amount,
+                ytd_used,
+            ),
+            result,
+        )
 
         self._resolve_status(claim_amount, result)
 
-        logger.info(
-            "Adjudicated claim: member=%s status=%s approved=%.2f fraud=%s",
-            member_id,
-            result.status,
-            result.approved_amount,
-            result.fraud_flag,
-        )
+        if logger.isEnabledFor(logging.INFO) and (
+            result.status == "REJECTED"
+            or result.fraud_flag
+            or random.random() < LOG_SAMPLE_RATE
+        ):
+            logger.info(
+                "Adjudicated claim: member=%s status=%s approved=%.2f fraud=%s",
+                member_id,
+                result.status,
+                result.approved_amount,
+                result.fraud_flag,
+                extra={
+                    "member_id": member_id,
+                    "status": result.status,
+                    "approved_amount": result.approved_amount,
+                    "fraud_flag": result.fraud_flag,
+                    "rejection_reasons": result.rejection_reasons,
+                },
+            )
         return result
 
-    def _check_member_eligibility(
-        self, member_id: str, result: AdjudicationResult
-    ) -> None:
-        member = MEMBERS.get(member_id)
-        if member is None:
-            result.rejection_reasons.append(f"Unknown member: {member_id}")
-            result.approved_amount = 0.0
-            return
-        if member["status"] != "active":
-            result.rejection_reasons.append(
-                f"Member {member_id} is not eligible (status: {member['status']})"
+    def adjudicate_many(
+        self,
+        member_ids: Sequence[str],
+        provider_ids: Sequence[str],
+        diagnosis_codes: Sequence[str],
+        procedure_codes: Sequence[str],
+        claim_amounts: Sequence[float],
+    ) -> AdjudicationColumns:
+        """Adjudicate many claims at once.
+
+        Gives the same answers as calling ``adjudicate`` per row with no
+        year-to-date usage, but returns result columns instead of one
+        ``AdjudicationResult`` each; apply annual limits afterwards with
+        ``BenefitLedger.apply_limits``. Uses the columnar engine when the
+        rule config matches it, else runs the pipeline row by row.
+        """
+        pipeline = self.pipeline()
+        if pipeline.columnar_multiplier is None:
+            columns = self._adjudicate_rows(
+                pipeline,
+                member_ids,
+                provider_ids,
+                diagnosis_codes,
+                procedure_codes,
+                claim_amounts,
             )
-            result.approved_amount = 0.0
-
-    def _check_provider(self, provider_id: str, result: AdjudicationResult) -> None:
-        if provider_id not in PROVIDERS:
-            result.rejection_reasons.append(f"Unknown provider: {provider_id}")
-            result.approved_amount = 0.0
-
-    def _check_benefit_limit(
-        self, diagnosis_code: str, claim_amount: float, result: AdjudicationResult
-    ) -> None:
-        limit = BENEFIT_LIMITS.get(diagnosis_code)
-        if limit is None:
-            result.rejection_reasons.append(
-                f"No benefit coverage for diagnosis: {diagnosis_code}"
+        else:
+            thresholds = self._costs.thresholds
+            fraud_thresholds = None
+            if thresholds:
+                fraud_thresholds = [
+                    fraud_threshold(thresholds, provider_id, procedure_code)
+                    for provider_id, procedure_code in zip(
+                        provider_ids, procedure_codes
+                    )
+                ]
+            columns = adjudicate_columns(
+                self._reference.snapshot.columnar,
+                member_ids,
+                provider_ids,
+                diagnosis_codes,
+                procedure_codes,
+                claim_amounts,
+                pipeline.columnar_multiplier,
+                fraud_thresholds,
             )
-            result.approved_amount = 0.0
-            return
-        if claim_amount > limit:
-            result.approved_amount = min(result.approved_amount, limit)
+        logger.info(
+            "Adjudicated %d claims: rejected=%d fraud=%d",
+            len(columns),
+            int((columns.status == "REJECTED").sum()),
+            int(columns.fraud_flag.sum()),
+        )
+        return columns
 
-    def _check_fraud(
-        self, procedure_code: str, claim_amount: float, result: AdjudicationResult
-    ) -> None:
-        avg_cost = PROCEDURE_AVG_COSTS.get(procedure_code)
-        if avg_cost is None:
-            result.rejection_reasons.append(
-                f"Unknown procedure code: {procedure_code}"
-            )
-            result.approved_amount = 0.0
-            return
-        if claim_amount > avg_cost * FRAUD_COST_MULTIPLIER:
-            result.fraud_flag = True
+    def _adjudicate_rows(
+        self,
+        pipeline: Pipeline,
+        *columns: Sequence,
+    ) -> AdjudicationColumns:
+        statuses = []
+        approved = []
+        fraud = []
+        reasons = {}
+        run = pipeline.run
+        for i, row in enumerate(zip(*columns)):
+            claim_amount = row[-1]
+            result = AdjudicationResult(approved_amount=claim_amount)
+            run(ClaimFacts(*row), result)
+            self._resolve_status(claim_amount, result)
+            statuses.append(result.status)
+            approved.append(result.approved_amount)
+            fraud.append(result.fraud_flag)
+            if result.rejection_reasons:
+                reasons[i] = result.rejection_reasons
+        return AdjudicationColumns(
+            status=np.array(statuses, dtype=STATUS_NAMES.dtype),
+            approved_amount=np.array(approved, dtype=np.float64),
+            fraud_flag=np.array(fraud, dtype=bool),
+            rejection_reasons=reasons,
+        )
 
     def _resolve_status(
         self, claim_amount: float, result: AdjudicationResult
@@ -109,3 +213,5 @@ class ClaimProcessor:
             result.approved_amount = 0.0
         elif result.approved_amount < claim_amount:
             result.status = "PARTIAL"
+            # Caps subtract year-to-date usage; return what will be stored.
+            result.approved_amount = round_cents(result.approved_amount)
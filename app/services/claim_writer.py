@@ -0,0 +1,175 @@
+"""Persistence helpers for adjudicated claims.
+
+Rows are built entirely client-side (id and timestamps included) so a
+whole batch can be written with a single INSERT and returned to the
+caller without reading anything back.
+"""
+
+import json
+from collections import Counter
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.claim import Claim
+from app.models.types import STATUS_CODES, new_claim_id, to_cents
+from app.schemas.claim import ClaimRequest
+from app.services.benefit_accumulators import record_usage
+from app.services.claim_counters import apply_counter_deltas, increment_counters
+from app.services.claim_processor import AdjudicationResult
+from app.services.columnar import AdjudicationColumns
+from app.services.duplicates import claim_fingerprint
+
+CLAIM_COLUMNS = tuple(column.name for column in Claim.__table__.columns)
+
+# Stored by POST /claims?async=true until a queue worker adjudicates it.
+PENDING = "PENDING"
+ADJUDICATED_COLUMNS = (
+    "status",
+    "fraud_flag",
+    "approved_amount",
+    "rejection_reasons",
+    "updated_at",
+)
+
+
+def build_claim_row(
+    payload: ClaimRequest,
+    result: AdjudicationResult,
+    now: datetime | None = None,
+) -> dict:
+    """Return the column values for a new claim, ready for ``insert(Claim)``."""
+    now = now or datetime.now(timezone.utc)
+    return {
+        "id": new_claim_id(now),
+        "member_id": payload.member_id,
+        "provider_id": payload.provider_id,
+        "diagnosis_code": payload.diagnosis_code,
+        "procedure_code": payload.procedure_code,
+        "claim_amount": payload.claim_amount,
+        "service_date": payload.service_date,
+        "fingerprint": claim_fingerprint(payload),
+        "status": result.status,
+        "fraud_flag": result.fraud_flag,
+        "approved_amount": result.approved_amount,
+        "rejection_reasons": result.rejection_reasons or None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def build_claim_rows(
+    payloads: Sequence[ClaimRequest],
+    columns: AdjudicationColumns,
+    now: datetime | None = None,
+) -> list[dict]:
+    """Like ``build_claim_row`` for the output of ``adjudicate_many``."""
+    now = now or datetime.now(timezone.utc)
+    statuses = columns.status.tolist()
+    approved = columns.approved_amount.tolist()
+    fraud = columns.fraud_flag.tolist()
+    reasons = columns.rejection_reasons
+    return [
+        {
+            "id": new_claim_id(now),
+            "member_id": payload.member_id,
+            "provider_id": payload.provider_id,
+            "diagnosis_code": payload.diagnosis_code,
+            "procedure_code": payload.procedure_code,
+            "claim_amount": payload.claim_amount,
+            "service_date": payload.service_date,
+            "fingerprint": claim_fingerprint(payload),
+            "status": statuses[i],
+            "fraud_flag": fraud[i],
+            "approved_amount": approved[i],
+            "rejection_reasons": reasons.get(i),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i, payload in enumerate(payloads)
+    ]
+
+
+async def insert_claims(
+    db: AsyncSession, rows: list[dict], check_limits: bool = True
+) -> None:
+    """Insert ``rows`` with one executemany INSERT, count them and add
+    their approved amounts to the benefit accumulators.
+
+    Batches of ``settings.pg_copy_threshold`` rows or more go through
+    ``copy_claims`` on asyncpg. The caller commits, so claims, counters
+    and accumulators land in one transaction. Raises
+    ``BenefitLimitExceeded`` (see ``record_usage``) unless
+    ``check_limits`` is false, as for historical or synthetic loads.
+    """
+    if not rows:
+        return
+    if len(rows) >= settings.pg_copy_threshold and supports_copy(db):
+        await copy_claims(db, rows, check_limits)
+        return
+    await db.execute(insert(Claim), rows)
+    await increment_counters(
+        db, ((r["member_id"], r["status"], r["fraud_flag"]) for r in rows)
+    )
+    await record_usage(db, rows, check_limits)
+
+
+async def complete_claims(
+    db: AsyncSession, claims: Sequence[Claim], rows: list[dict]
+) -> None:
+    """Write the adjudicated ``rows`` onto the ``PENDING`` ``claims`` they
+    were built from (same order) and move their counts and benefit usage
+    along. The caller commits; raises like ``insert_claims``.
+    """
+    deltas: Counter = Counter()
+    for claim, row in zip(claims, rows, strict=True):
+        deltas[(claim.member_id, claim.status, claim.fraud_flag)] -= 1
+        for column in ADJUDICATED_COLUMNS:
+            setattr(claim, column, row[column])
+        deltas[(claim.member_id, claim.status, claim.fraud_flag)] += 1
+    await db.flush()
+    await apply_counter_deltas(db, deltas)
+    await record_usage(db, rows)
+
+
+def supports_copy(db: AsyncSession) -> bool:
+    dialect = db.bind.dialect
+    return dialect.name == "postgresql" and dialect.driver == "asyncpg"
+
+
+async def copy_claims(
+    db: AsyncSession, rows: list[dict], check_limits: bool = True
+) -> None:
+    """Write ``rows`` with PostgreSQL ``COPY`` (asyncpg only). The caller commits.
+
+    Counters and accumulators are upserted first: those statements open
+    the transaction on the underlying asyncpg connection, so the COPY
+    joins it rather than autocommitting on its own.
+    """
+    if not rows:
+        return
+    await increment_counters(
+        db, ((r["member_id"], r["status"], r["fraud_flag"]) for r in rows)
+    )
+    await record_usage(db, rows, check_limits)
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        Claim.__tablename__,
+        columns=CLAIM_COLUMNS,
+        records=[_copy_record(row) for row in rows],
+    )
+
+
+def _copy_record(row: dict) -> tuple:
+    """``row`` as stored; COPY bypasses the column types' conversions."""
+    record = dict(row)
+    record["claim_amount"] = to_cents(row["claim_amount"])
+    record["approved_amount"] = to_cents(row["approved_amount"])
+    record["status"] = STATUS_CODES[row["status"]]
+    if row["rejection_reasons"] is not None:
+        record["rejection_reasons"] = json.dumps(row["rejection_reasons"])
+    return tuple(record[c] for c in CLAIM_COLUMNS)
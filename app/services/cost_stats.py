@@ -0,0 +1,271 @@
+"""Streaming claim amount statistics for the fraud rule.
+
+``cost_stats`` keeps a count, Welford mean/variance and a log-bucket
+quantile sketch per ``(provider_id, procedure_code)`` and per procedure
+(``provider_id=""``). ``record`` is O(1) per claim and only touches
+memory. Every ``COST_STATS_INTERVAL`` seconds ``poll`` merges what this
+process saw into the ``cost_stats`` table, so several processes add up,
+and reads the merged table back into an immutable map of fraud
+thresholds. The ``procedure_cost`` rule does one lookup in that map;
+nothing ever scans claim history.
+"""
+
+import asyncio
+import logging
+import math
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session, dialect_insert
+from app.models.cost_stat import CostStat
+from app.services.reference_data import reference_data
+
+logger = logging.getLogger(__name__)
+
+CostKey = tuple[str, str]
+
+ALL_PROVIDERS = ""
+
+# Quantiles are within 1% of the true value (relative).
+SKETCH_ACCURACY = 0.01
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+FRAUD_RULES = ("static", "zscore", "quantile")
+
+
+class CostStats:
+    """Count, mean and variance (Welford) plus a DDSketch-style histogram.
+
+    Bucket ``i`` counts values in ``(gamma**(i-1), gamma**i]``, so the
+    sketch size grows with the log of the value range, not the count.
+    """
+
+    __slots__ = ("count", "mean", "m2", "buckets")
+
+    def __init__(
+        self,
+        count: int = 0,
+        mean: float = 0.0,
+        m2: float = 0.0,
+        buckets: dict[int, int] | None = None,
+    ) -> None:
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.buckets = buckets if buckets is not None else {}
+
+    def add(self, value: float) -> None:
+        """Add one (positive) amount."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        index = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: "CostStats") -> None:
+        """Fold ``other`` in, as if its values had been added here."""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                break
+        return 2 * _GAMMA**index / (_GAMMA + 1)
+
+    @classmethod
+    def from_row(cls, row: CostStat) -> "CostStats":
+        # JSON object keys come back as strings.
+        buckets = {int(index): n for index, n in row.sketch.items()}
+        return cls(row.count, row.mean, row.m2, buckets)
+
+
+def fraud_threshold(
+    thresholds: Mapping[CostKey, float], provider_id: str, procedure_code: str
+) -> float | None:
+    """The provider's threshold, else the procedure's; ``None`` if neither."""
+    threshold = thresholds.get((provider_id, procedure_code))
+    if threshold is None:
+        threshold = thresholds.get((ALL_PROVIDERS, procedure_code))
+    return threshold
+
+
+def build_thresholds(
+    stats: Mapping[CostKey, CostStats],
+    rule: str,
+    zscore: float,
+    quantile: float,
+    min_samples: int,
+) -> dict[CostKey, float]:
+    """Amount above which a claim is flagged, for keys with enough samples."""
+    if rule == "static":
+        return {}
+    if rule not in FRAUD_RULES:
+        raise ValueError(f"Unknown fraud rule: {rule}")
+    thresholds = {}
+    for key, s in stats.items():
+        if s.count < min_samples:
+            continue
+        if rule == "zscore":
+            thresholds[key] = s.mean + zscore * s.std
+        else:
+            thresholds[key] = s.quantile(quantile)
+    return thresholds
+
+
+class CostStatsTracker:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        rule: str,
+        zscore: float,
+        quantile: float,
+        min_samples: int,
+    ) -> None:
+        self._session_factory = session_factory
+        self.rule = rule
+        self.zscore = zscore
+        self.quantile = quantile
+        self.min_samples = min_samples
+        # Amounts recorded since the last flush.
+        self._delta: dict[CostKey, CostStats] = {}
+        self.thresholds: Mapping[CostKey, float] = MappingProxyType({})
+
+    def record(self, provider_id: str, procedure_code: str, amount: float) -> None:
+        """Count one stored claim. Unknown codes are ignored so junk input
+        cannot grow the key space."""
+        ref = reference_data.snapshot
+        if procedure_code not in ref.procedure_avg_costs:
+            return
+        keys = [(ALL_PROVIDERS, procedure_code)]
+        if provider_id in ref.providers:
+            keys.append((provider_id, procedure_code))
+        for key in keys:
+            stats = self._delta.get(key)
+            if stats is None:
+                stats = self._delta[key] = CostStats()
+            stats.add(amount)
+
+    def record_rows(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            self.record(row["provider_id"], row["procedure_code"], row["claim_amount"])
+
+    async def flush(self) -> int:
+        """Merge the amounts recorded since the last flush into the table.
+
+        Returns the number of keys written. On failure they are kept for
+        the next attempt.
+        """
+        delta, self._delta = self._delta, {}
+        if not delta:
+            return 0
+        try:
+            async with self._session_factory() as db:
+                await _merge(db, delta)
+                await db.commit()
+        except Exception:
+            for key, stats in delta.items():
+                self._delta.setdefault(key, CostStats()).merge(stats)
+            raise
+        return len(delta)
+
+    async def load(self) -> None:
+        """Rebuild the fraud thresholds from the table."""
+        async with self._session_factory() as db:
+            rows = (await db.execute(select(CostStat))).scalars().all()
+        stats = {
+            (row.provider_id, row.procedure_code): CostStats.from_row(row)
+            for row in rows
+        }
+        self.thresholds = MappingProxyType(
+            build_thresholds(
+                stats, self.rule, self.zscore, self.quantile, self.min_samples
+            )
+        )
+
+    async def poll(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+                await self.load()
+            except Exception:
+                logger.exception("Cost statistics snapshot failed")
+
+    def clear(self) -> None:
+        self._delta = {}
+        self.thresholds = MappingProxyType({})
+
+
+async def _merge(db: AsyncSession, delta: dict[CostKey, CostStats]) -> None:
+    keys = sorted(delta)
+    now = datetime.now(timezone.utc)
+    insert_ = dialect_insert(db)
+    # Make sure every row exists, then lock them (in key order) so
+    # concurrent flushes from other processes merge one after another.
+    await db.execute(
+        insert_(CostStat).on_conflict_do_nothing(),
+        [
+            {
+                "provider_id": provider_id,
+                "procedure_code": procedure_code,
+                "count": 0,
+                "mean": 0.0,
+                "m2": 0.0,
+                "sketch": {},
+                "updated_at": now,
+            }
+            for provider_id, procedure_code in keys
+        ],
+    )
+    rows = (
+        await db.execute(
+            select(CostStat)
+            .where(tuple_(CostStat.provider_id, CostStat.procedure_code).in_(keys))
+            .order_by(CostStat.provider_id, CostStat.procedure_code)
+            .with_for_update()
+        )
+    ).scalars()
+    for row in rows:
+        merged = CostStats.from_row(row)
+        merged.merge(delta[(row.provider_id, row.procedure_code)])
+        row.count = merged.count
+        row.mean = merged.mean
+        row.m2 = merged.m2
+        row.sketch = {str(index): n for index, n in merged.buckets.items()}
+
+
+cost_stats = CostStatsTracker(
+    async_session,
+    rule=settings.fraud_rule,
+    zscore=settings.fraud_zscore,
+    quantile=settings.fraud_quantile,
+    min_samples=settings.fraud_min_samples,
+)
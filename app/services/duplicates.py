@@ -0,0 +1,192 @@
+"""Duplicate claim detection.
+
+A claim submitted with a ``service_date`` gets a fingerprint: a 128-bit
+BLAKE2b hash of the member, provider, diagnosis, procedure, amount and
+service date. ``claims.fingerprint`` has a unique index, which is the
+source of truth. ``duplicate_filter``, a Bloom filter over every stored
+fingerprint rebuilt at startup, sits in front of it: a fingerprint the
+filter has never seen cannot be in the table, so most new claims skip
+the index probe. Fingerprints inserted by other processes are missing
+from the filter; the unique index rejects those and the caller falls
+back to looking the original up.
+"""
+
+import hashlib
+import logging
+import math
+from collections.abc import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.models.claim import Claim
+from app.schemas.claim import ClaimRequest
+
+logger = logging.getLogger(__name__)
+
+
+def claim_fingerprint(payload: ClaimRequest) -> str | None:
+    """Hex fingerprint of ``payload``, or ``None`` without a service date."""
+    if payload.service_date is None:
+        return None
+    key = "\x1f".join(
+        (
+            payload.member_id,
+            payload.provider_id,
+            payload.diagnosis_code,
+            payload.procedure_code,
+            f"{payload.claim_amount:.2f}",
+            payload.service_date.isoformat(),
+        )
+    )
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class BloomFilter:
+    """Bit array probed at ``hashes`` positions per item.
+
+    Fingerprints are already uniform hashes, so the positions come from
+    splitting one into two 64-bit halves (double hashing) instead of
+    hashing again.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, fingerprint: str) -> list[int]:
+        digest = int(fingerprint, 16)
+        h1 = digest >> 64
+        h2 = (digest & 0xFFFF_FFFF_FFFF_FFFF) | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, fingerprint: str) -> None:
+        for position in self._positions(fingerprint):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(fingerprint)
+        )
+
+
+class DuplicateFilter:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        capacity: int,
+        error_rate: float,
+    ) -> None:
+        self._session_factory = session_factory
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self.skipped = 0
+        self.probes = 0
+        self.false_positives = 0
+
+    def might_exist(self, fingerprint: str) -> bool:
+        if fingerprint in self._bloom:
+            self.probes += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def add(self, fingerprints: Iterable[str | None]) -> None:
+        for fingerprint in fingerprints:
+            if fingerprint is not None:
+                self._bloom.add(fingerprint)
+
+    async def rebuild(self) -> int:
+        """Load every stored fingerprint into a fresh filter.
+
+        The filter is sized for ``capacity`` or twice the stored count,
+        whichever is larger. Returns the number of fingerprints loaded.
+        """
+        stored = Claim.fingerprint.is_not(None)
+        async with self._session_factory() as db:
+            count = (
+                await db.execute(select(func.count(Claim.fingerprint)).where(stored))
+            ).scalar_one()
+            bloom = BloomFilter(max(self.capacity, 2 * count), self.error_rate)
+            fingerprints = await db.stream_scalars(
+                select(Claim.fingerprint)
+                .where(stored)
+                .execution_options(yield_per=settings.export_chunk_size)
+            )
+            async for fingerprint in fingerprints:
+                bloom.add(fingerprint)
+        self._bloom = bloom
+        logger.info("Loaded %d claim fingerprints", bloom.count)
+        return bloom.count
+
+    async def find(
+        self,
+        db: AsyncSession,
+        fingerprints: Iterable[str | None],
+        probe_all: bool = False,
+    ) -> dict[str, Claim]:
+        """Stored claims for the fingerprints that exist, keyed by fingerprint.
+
+        Only fingerprints the filter might contain are looked up, unless
+        ``probe_all`` (after the unique index caught one it had missed).
+        """
+        candidates = {
+            fingerprint
+            for fingerprint in fingerprints
+            if fingerprint is not None
+            and (probe_all or self.might_exist(fingerprint))
+        }
+        if not candidates:
+            return {}
+        result = await db.execute(
+            select(Claim).where(Claim.fingerprint.in_(candidates))
+        )
+        found = {claim.fingerprint: claim for claim in result.scalars()}
+        if not probe_all:
+            self.false_positives += len(candidates) - len(found)
+        return found
+
+    async def drop_stored(self, db: AsyncSession, rows: list[dict]) -> list[dict]:
+        """``rows`` minus claims already stored or repeated earlier in ``rows``."""
+        stored = set(await self.find(db, (row["fingerprint"] for row in rows)))
+        kept = []
+        for row in rows:
+            fingerprint = row["fingerprint"]
+            if fingerprint is not None:
+                if fingerprint in stored:
+                    continue
+                stored.add(fingerprint)
+            kept.append(row)
+        return kept
+
+    def clear(self) -> None:
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        self.skipped = self.probes = self.false_positives = 0
+
+    def stats(self) -> dict:
+        return {
+            "fingerprints": self._bloom.count,
+            "capacity": self._bloom.capacity,
+            "skipped": self.skipped,
+            "probes": self.probes,
+            "false_positives": self.false_positives,
+        }
+
+
+duplicate_filter = DuplicateFilter(
+    async_session,
+    capacity=settings.duplicate_filter_capacity,
+    error_rate=settings.duplicate_filter_error_rate,
+)
@@ -1,7 +1,8 @@
-"""Mock reference data for claim validation.
+"""Seed reference data for claim validation.
 
-In production these would come from database tables or external services.
-Kept as module-level constants so they're easy to locate and replace.
+Loaded into the reference tables on first start (and by the migration
+that creates them); adjudication reads the tables via
+``app.services.reference_data``, not these constants.
 """
 
 # Members: member_id -> eligibility status
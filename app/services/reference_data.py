@@ -0,0 +1,187 @@
+"""In-memory snapshot of the reference tables used by adjudication.
+
+``ClaimProcessor`` only ever reads ``reference_data.snapshot``, an
+immutable object swapped atomically when ``reference_data_version``
+changes. A background task polls that single row, so adjudication
+never queries the database for reference lookups.
+"""
+
+import asyncio
+import logging
+import sys
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import Mapping
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.models.reference import (
+    BenefitLimit,
+    Member,
+    ProcedureCost,
+    Provider,
+    ReferenceDataVersion,
+)
+from app.services import mock_data
+from app.services.columnar import ColumnarReference
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """Only the fields adjudication needs; member statuses are interned."""
+
+    version: int
+    member_status: Mapping[str, str]
+    providers: frozenset[str]
+    benefit_limits: Mapping[str, float]
+    procedure_avg_costs: Mapping[str, float]
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        member_status: dict[str, str],
+        providers: frozenset[str],
+        benefit_limits: dict[str, float],
+        procedure_avg_costs: dict[str, float],
+    ) -> "ReferenceSnapshot":
+        return cls(
+            version=version,
+            member_status=MappingProxyType(
+                {m: sys.intern(status) for m, status in member_status.items()}
+            ),
+            providers=providers,
+            benefit_limits=MappingProxyType(benefit_limits),
+            procedure_avg_costs=MappingProxyType(procedure_avg_costs),
+        )
+
+    @classmethod
+    def from_mock_data(cls) -> "ReferenceSnapshot":
+        """Snapshot of the seed data, used until the database is loaded."""
+        return cls.build(
+            version=0,
+            member_status={m: info["status"] for m, info in mock_data.MEMBERS.items()},
+            providers=frozenset(mock_data.PROVIDERS),
+            benefit_limits=dict(mock_data.BENEFIT_LIMITS),
+            procedure_avg_costs=dict(mock_data.PROCEDURE_AVG_COSTS),
+        )
+
+    def __reduce__(self):
+        # MappingProxyType does not pickle; rebuild from plain dicts so the
+        # snapshot can be shipped to worker processes.
+        return (
+            ReferenceSnapshot.build,
+            (
+                self.version,
+                dict(self.member_status),
+                self.providers,
+                dict(self.benefit_limits),
+                dict(self.procedure_avg_costs),
+            ),
+        )
+
+    @cached_property
+    def columnar(self) -> ColumnarReference:
+        return ColumnarReference.build(
+            self.member_status,
+            self.providers,
+            self.benefit_limits,
+            self.procedure_avg_costs,
+        )
+
+
+class ReferenceDataCache:
+    def __init__(self, snapshot: ReferenceSnapshot) -> None:
+        self.snapshot = snapshot
+
+    async def load(self, db: AsyncSession) -> ReferenceSnapshot:
+        """Read every reference table and swap in a new snapshot."""
+        version = await _current_version(db)
+        members = await db.execute(select(Member.member_id, Member.status))
+        providers = await db.execute(select(Provider.provider_id))
+        limits = await db.execute(
+            select(BenefitLimit.diagnosis_code, BenefitLimit.limit_amount)
+        )
+        costs = await db.execute(
+            select(ProcedureCost.procedure_code, ProcedureCost.avg_cost)
+        )
+        snapshot = ReferenceSnapshot.build(
+            version=version or 0,
+            member_status=dict(members.tuples().all()),
+            providers=frozenset(providers.scalars().all()),
+            benefit_limits=dict(limits.tuples().all()),
+            procedure_avg_costs=dict(costs.tuples().all()),
+        )
+        self.snapshot = snapshot
+        logger.info(
+            "Loaded reference data version %d (%d members)",
+            snapshot.version,
+            len(snapshot.member_status),
+        )
+        return snapshot
+
+    async def refresh_if_changed(self, db: AsyncSession) -> bool:
+        """Reload only if the version row moved; one indexed read otherwise."""
+        version = await _current_version(db)
+        if version is None or version == self.snapshot.version:
+            return False
+        await self.load(db)
+        return True
+
+    async def poll(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with async_session() as db:
+                    await self.refresh_if_changed(db)
+            except Exception:
+                logger.exception("Reference data refresh failed")
+
+
+async def _current_version(db: AsyncSession) -> int | None:
+    return (
+        await db.execute(
+            select(ReferenceDataVersion.version).where(ReferenceDataVersion.id == 1)
+        )
+    ).scalar_one_or_none()
+
+
+async def seed_reference_data(db: AsyncSession) -> bool:
+    """Load ``mock_data`` into empty reference tables. The caller commits."""
+    if await _current_version(db) is not None:
+        return False
+    db.add_all(
+        Member(member_id=m, name=info["name"], status=info["status"])
+        for m, info in mock_data.MEMBERS.items()
+    )
+    db.add_all(
+        Provider(provider_id=p, name=info["name"], type=info["type"])
+        for p, info in mock_data.PROVIDERS.items()
+    )
+    db.add_all(
+        BenefitLimit(diagnosis_code=d, limit_amount=limit)
+        for d, limit in mock_data.BENEFIT_LIMITS.items()
+    )
+    db.add_all(
+        ProcedureCost(procedure_code=p, avg_cost=cost)
+        for p, cost in mock_data.PROCEDURE_AVG_COSTS.items()
+    )
+    db.add(ReferenceDataVersion(id=1, version=1))
+    return True
+
+
+async def bump_reference_version(db: AsyncSession) -> None:
+    """Call in the same transaction as any reference table change."""
+    await db.execute(
+        update(ReferenceDataVersion)
+        .where(ReferenceDataVersion.id == 1)
+        .values(version=ReferenceDataVersion.version + 1)
+    )
+
+
+reference_data = ReferenceDataCache(ReferenceSnapshot.from_mock_data())
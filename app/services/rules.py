@@ -0,0 +1,435 @@
+"""Declarative adjudication rules.
+
+The rule set is a JSON document (YAML too, if PyYAML is installed)::
+
+    {
+      "short_circuit": false,
+      "rules": [
+        {"name": "member_eligibility", "type": "member_status",
+         "allowed": ["active"], "cost": 1, "selectivity": 0.05},
+        ...
+      ]
+    }
+
+``compile_rules`` turns it into a ``Pipeline``: a flat tuple of closures
+with their reference lookups (bound ``dict.get``, frozensets, limits)
+resolved up front, so adjudicating a claim interprets no config. Each
+rule is timed under its ``name`` in ``adjudication_rule_duration_seconds``.
+
+Without ``short_circuit`` rules run in file order and every rejection
+reason is reported. With it, rules run cheapest-per-rejection first
+(``cost / selectivity``, where ``selectivity`` is the share of claims
+the rule rejects) and evaluation stops at the first rejection, so a
+rejected claim carries only that reason and skips the fraud check.
+
+``rule_set`` holds the parsed file and re-reads it when its modification
+time changes (``poll``); processors recompile on the next claim.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.metrics import ADJUDICATION_RULE_SECONDS
+from app.services.cost_stats import CostStatsTracker, fraud_threshold
+from app.services.reference_data import ReferenceSnapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("default_rules.json")
+
+FRAUD_COST_MULTIPLIER = 2.0
+
+CLAIM_FIELDS = (
+    "member_id",
+    "provider_id",
+    "diagnosis_code",
+    "procedure_code",
+    "claim_amount",
+)
+
+
+class RuleConfigError(ValueError):
+    pass
+
+
+class ClaimFacts:
+    """The inputs every rule sees."""
+
+    __slots__ = (*CLAIM_FIELDS, "ytd_used")
+
+    def __init__(
+        self,
+        member_id: str,
+        provider_id: str,
+        diagnosis_code: str,
+        procedure_code: str,
+        claim_amount: float,
+        ytd_used: float = 0.0,
+    ) -> None:
+        self.member_id = member_id
+        self.provider_id = provider_id
+        self.diagnosis_code = diagnosis_code
+        self.procedure_code = procedure_code
+        self.claim_amount = claim_amount
+        self.ytd_used = ytd_used
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# Renders reason templates once at compile time, so a bad one fails the
+# load instead of every claim the rule matches.
+_SAMPLE_CLAIM = ClaimFacts("M000", "H000", "D000", "P000", 1.0)
+
+
+# check(claim, result) appends rejection reasons to, or adjusts, an
+# ``AdjudicationResult``.
+Check = Callable[[ClaimFacts, Any], None]
+RuleCompiler = Callable[[dict, ReferenceSnapshot, CostStatsTracker], Check]
+
+RULE_TYPES: dict[str, RuleCompiler] = {}
+
+
+def rule_type(name: str):
+    """Register a compiler for rules of type ``name``."""
+
+    def decorator(compiler: RuleCompiler) -> RuleCompiler:
+        RULE_TYPES[name] = compiler
+        return compiler
+
+    return decorator
+
+
+def benefit_exhausted_reason(diagnosis_code: str) -> str:
+    return f"Annual benefit limit for {diagnosis_code} exhausted"
+
+
+@rule_type("member_status")
+def _member_status(
+    spec: dict, ref: ReferenceSnapshot, costs: CostStatsTracker
+) -> Check:
+    allowed = frozenset(spec.get("allowed", ["active"]))
+    status_of = ref.member_status.get
+
+    def check(claim: ClaimFacts, result) -> None:
+        status = status_of(claim.member_id)
+        if status is None:
+            result.rejection_reasons.append(f"Unknown member: {claim.member_id}")
+            result.approved_amount = 0.0
+        elif status not in allowed:
+            result.rejection_reasons.append(
+                f"Member {claim.member_id} is not eligible (status: {status})"
+            )
+            result.approved_amount = 0.0
+
+    return check
+
+
+@rule_type("known_provider")
+def _known_provider(
+    spec: dict, ref: ReferenceSnapshot, costs: CostStatsTracker
+) -> Check:
+    providers = ref.providers
+
+    def check(claim: ClaimFacts, result) -> None:
+        if claim.provider_id not in providers:
+            result.rejection_reasons.append(f"Unknown provider: {claim.provider_id}")
+            result.approved_amount = 0.0
+
+    return check
+
+
+@rule_type("benefit_limit")
+def _benefit_limit(
+    spec: dict, ref: ReferenceSnapshot, costs: CostStatsTracker
+) -> Check:
+    limit_of = ref.benefit_limits.get
+
+    def check(claim: ClaimFacts, result) -> None:
+        limit = limit_of(claim.diagnosis_code)
+        if limit is None:
+            result.rejection_reasons.append(
+                f"No benefit coverage for diagnosis: {claim.diagnosis_code}"
+            )
+            result.approved_amount = 0.0
+            return
+        remaining = limit - claim.ytd_used
+        if remaining <= 0:
+            result.rejection_reasons.append(
+                benefit_exhausted_reason(claim.diagnosis_code)
+            )
+            result.approved_amount = 0.0
+        elif claim.claim_amount > remaining:
+            result.approved_amount = min(result.approved_amount, remaining)
+
+    return check
+
+
+@rule_type("procedure_cost")
+def _procedure_cost(
+    spec: dict, ref: ReferenceSnapshot, costs: CostStatsTracker
+) -> Check:
+    """Rejects unknown procedures and flags claims above the fraud
+    threshold: the adaptive one from ``costs`` if there is one, else the
+    procedure's average cost times ``multiplier``."""
+    multiplier = float(spec.get("multiplier", FRAUD_COST_MULTIPLIER))
+    static = {code: avg * multiplier for code, avg in ref.procedure_avg_costs.items()}
+    static_threshold = static.get
+
+    def check(claim: ClaimFacts, result) -> None:
+        threshold = static_threshold(claim.procedure_code)
+        if threshold is None:
+            result.rejection_reasons.append(
+                f"Unknown procedure code: {claim.procedure_code}"
+            )
+            result.approved_amount = 0.0
+            return
+        # Read once per claim: ``poll`` swaps the whole map.
+        thresholds = costs.thresholds
+        if thresholds:
+            adaptive = fraud_threshold(
+                thresholds, claim.provider_id, claim.procedure_code
+            )
+            if adaptive is not None:
+                threshold = adaptive
+        if claim.claim_amount > threshold:
+            result.fraud_flag = True
+
+    return check
+
+
+@rule_type("max_amount")
+def _max_amount(spec: dict, ref: ReferenceSnapshot, costs: CostStatsTracker) -> Check:
+    configured = _required(spec, "limit")
+    limit = float(configured)
+    reason = _reason(
+        spec, "Claim amount {claim_amount} exceeds {limit}", limit=configured
+    )
+
+    def check(claim: ClaimFacts, result) -> None:
+        if claim.claim_amount > limit:
+            result.rejection_reasons.append(
+                reason.format(**claim.as_dict(), limit=configured)
+            )
+            result.approved_amount = 0.0
+
+    return check
+
+
+@rule_type("deny")
+def _deny(spec: dict, ref: ReferenceSnapshot, costs: CostStatsTracker) -> Check:
+    field = _required(spec, "field")
+    if field not in CLAIM_FIELDS:
+        raise RuleConfigError(f"Rule {spec['name']}: unknown field {field!r}")
+    values = frozenset(_required(spec, "values"))
+    reason = _reason(spec, f"{field} {{{field}}} is not covered")
+
+    def check(claim: ClaimFacts, result) -> None:
+        if getattr(claim, field) in values:
+            result.rejection_reasons.append(reason.format(**claim.as_dict()))
+            result.approved_amount = 0.0
+
+    return check
+
+
+def _required(spec: dict, key: str) -> Any:
+    if key not in spec:
+        raise RuleConfigError(f"Rule {spec['name']}: missing {key!r}")
+    return spec[key]
+
+
+def _reason(spec: dict, default: str, **extra: Any) -> str:
+    reason = spec.get("reason", default)
+    try:
+        reason.format(**_SAMPLE_CLAIM.as_dict(), **extra)
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError) as exc:
+        raise RuleConfigError(
+            f"Rule {spec['name']}: bad reason {reason!r} ({exc!r})"
+        ) from None
+    return reason
+
+
+# ``adjudicate_many`` only uses the columnar engine for rule sets that
+# match it exactly: these types, in this order, reporting every reason.
+_COLUMNAR_TYPES = ("member_status", "known_provider", "benefit_limit", "procedure_cost")
+
+
+class Pipeline:
+    """A compiled rule set; ``run(claim, result)`` applies every rule."""
+
+    __slots__ = ("names", "short_circuit", "run", "columnar_multiplier")
+
+    def __init__(
+        self,
+        names: tuple[str, ...],
+        checks: tuple[Check, ...],
+        short_circuit: bool,
+        columnar_multiplier: float | None,
+    ) -> None:
+        self.names = names
+        self.short_circuit = short_circuit
+        # Set when ``adjudicate_columns`` gives the same answers, with
+        # the procedure_cost rule's multiplier.
+        self.columnar_multiplier = columnar_multiplier
+        # Timing is inlined rather than wrapping each check, which would
+        # cost an extra call per rule.
+        steps = tuple(
+            (check, ADJUDICATION_RULE_SECONDS.labels(name).observe)
+            for name, check in zip(names, checks)
+        )
+        perf_counter = time.perf_counter
+        if short_circuit:
+
+            def run(claim: ClaimFacts, result) -> None:
+                reasons = result.rejection_reasons
+                for check, observe in steps:
+                    start = perf_counter()
+                    check(claim, result)
+                    observe(perf_counter() - start)
+                    if reasons:
+                        return
+
+        else:
+
+            def run(claim: ClaimFacts, result) -> None:
+                for check, observe in steps:
+                    start = perf_counter()
+                    check(claim, result)
+                    observe(perf_counter() - start)
+
+        self.run = run
+
+
+def validate_rules(config: Any) -> dict:
+    """Check the shape of a parsed rule file and fill in defaults."""
+    if not isinstance(config, Mapping) or not isinstance(config.get("rules"), list):
+        raise RuleConfigError("Rule config must be an object with a 'rules' list")
+    rules = []
+    names = set()
+    for position, rule in enumerate(config["rules"]):
+        if not isinstance(rule, Mapping):
+            raise RuleConfigError(f"Rule #{position} is not an object")
+        rule = {"cost": 1.0, "selectivity": 1.0, **rule}
+        name = rule.get("name")
+        if not name or name in names:
+            raise RuleConfigError(f"Rule #{position} needs a unique 'name'")
+        names.add(name)
+        if rule.get("type") not in RULE_TYPES:
+            raise RuleConfigError(f"Rule {name}: unknown type {rule.get('type')!r}")
+        if float(rule["cost"]) <= 0 or not 0 < float(rule["selectivity"]) <= 1:
+            raise RuleConfigError(
+                f"Rule {name}: cost must be > 0 and selectivity in (0, 1]"
+            )
+        rules.append(rule)
+    return {"short_circuit": bool(config.get("short_circuit", False)), "rules": rules}
+
+
+def evaluation_order(config: dict) -> list[dict]:
+    """Rules in the order they run: cheapest per rejection first when
+    short-circuiting (ties keep file order), else file order."""
+    rules = config["rules"]
+    if not config["short_circuit"]:
+        return list(rules)
+    return sorted(rules, key=lambda rule: rule["cost"] / rule["selectivity"])
+
+
+def compile_rules(
+    config: dict, ref: ReferenceSnapshot, costs: CostStatsTracker
+) -> Pipeline:
+    rules = evaluation_order(config)
+    checks = tuple(RULE_TYPES[rule["type"]](rule, ref, costs) for rule in rules)
+    columnar_multiplier = None
+    if (
+        not config["short_circuit"]
+        and tuple(rule["type"] for rule in rules) == _COLUMNAR_TYPES
+        and set(rules[0].get("allowed", ["active"])) == {"active"}
+    ):
+        columnar_multiplier = float(rules[3].get("multiplier", FRAUD_COST_MULTIPLIER))
+    return Pipeline(
+        tuple(rule["name"] for rule in rules),
+        checks,
+        config["short_circuit"],
+        columnar_multiplier,
+    )
+
+
+def read_rules(path: Path) -> dict:
+    text = path.read_text()
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as exc:
+            raise RuleConfigError("YAML rule files need PyYAML installed") from exc
+        config = yaml.safe_load(text)
+    else:
+        try:
+            config = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise RuleConfigError(f"{path}: {exc}") from exc
+    return validate_rules(config)
+
+
+class RuleSet:
+    """The current rule config, reloaded when its file changes.
+
+    ``config`` is replaced, never mutated, so ``ClaimProcessor`` can
+    tell by identity that it needs to recompile.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self._config: dict | None = None
+        self._mtime_ns: int | None = None
+
+    @property
+    def config(self) -> dict:
+        if self._config is None:
+            self.load()
+        return self._config
+
+    def load(self) -> dict:
+        """Read and validate the file; on error the old config stays."""
+        mtime_ns = self.path.stat().st_mtime_ns
+        config = read_rules(self.path)
+        # Compile once against the seed data to surface bad parameters.
+        compile_rules(config, ReferenceSnapshot.from_mock_data(), _NoCosts)
+        self._config = config
+        self._mtime_ns = mtime_ns
+        logger.info(
+            "Loaded %d adjudication rules from %s", len(config["rules"]), self.path
+        )
+        return config
+
+    def reload_if_changed(self) -> bool:
+        mtime_ns = self.path.stat().st_mtime_ns
+        if mtime_ns == self._mtime_ns:
+            return False
+        try:
+            self.load()
+        except Exception:
+            # Raise once per bad edit, not on every poll until it is fixed.
+            self._mtime_ns = mtime_ns
+            raise
+        return True
+
+    async def poll(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.reload_if_changed()
+            except Exception:
+                logger.exception("Adjudication rules reload failed")
+
+
+class _NoCosts:
+    thresholds: Mapping = {}
+
+
+rule_set = RuleSet(settings.rules_path or DEFAULT_RULES_PATH)
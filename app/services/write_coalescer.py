@@ -0,0 +1,109 @@
+"""Group commit for single-claim submissions.
+
+When enabled, ``submit_claim`` hands its row to ``write_coalescer``
+instead of committing on its own. A single background task collects
+rows arriving within ``window`` seconds (or until ``max_batch`` rows are
+queued), writes them in one transaction and resolves each caller's
+future. Rows that queue up while a flush is in progress form the next
+batch, so under load the batch size grows with the commit latency.
+"""
+
+import asyncio
+import logging
+from contextlib import suppress
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.services.claim_writer import insert_claims
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ClaimWriteCoalescer:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        window: float,
+        max_batch: int,
+    ) -> None:
+        self._session_factory = session_factory
+        self._window = window
+        self._max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def submit(self, row: dict) -> dict:
+        """Queue ``row`` for insertion and wait until it is committed."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        if self._queue.qsize() >= self._max_batch:
+            self._full.set()
+        return await future
+
+    async def stop(self) -> None:
+        """Flush whatever is queued, then stop the background task."""
+        task, self._task = self._task, None
+        # A task that already ended would leave the marker to stop the
+        # next one right after its first batch.
+        if task is None or task.done():
+            return
+        self._queue.put_nowait(_STOP)
+        self._full.set()
+        await task
+
+    async def _run(self) -> None:
+        stopping = False
+        while not (stopping and self._queue.empty()):
+            first = await self._queue.get()
+            if self._window > 0 and self._queue.qsize() + 1 < self._max_batch:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._full.wait(), self._window)
+            self._full.clear()
+            batch = []
+            for item in (first, *self._take(self._max_batch - 1)):
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            if batch:
+                await self._flush(batch)
+
+    def _take(self, limit: int) -> list:
+        items = []
+        while len(items) < limit and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        return items
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        try:
+            async with self._session_factory() as db:
+                await insert_claims(db, [row for row, _ in batch])
+                await db.commit()
+        except Exception as exc:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(exc)
+                return
+            # Retry one by one so a single bad row only fails its own caller.
+            logger.warning("Coalesced insert of %d rows failed: %s", len(batch), exc)
+            for item in batch:
+                await self._flush([item])
+            return
+        for row, future in batch:
+            if not future.done():
+                future.set_result(row)
+
+
+write_coalescer = ClaimWriteCoalescer(
+    async_session,
+    window=settings.write_coalesce_window_ms / 1000,
+    max_batch=settings.write_coalesce_max_batch,
+)
@@ -0,0 +1,102 @@
+"""Micro-benchmark of ``ClaimProcessor.adjudicate`` per outcome mix.
+
+Times ``adjudicate`` on synthetic claims of each kind (and the default
+mix), plus ``adjudicate_many`` on the mix in one call. Latencies are
+per claim, measured over batches of ``--batch`` calls to keep timer
+overhead out of the numbers::
+
+    python -m benchmarks.bench_adjudicate --claims 200000 --json adjudicate.json
+
+``--rules`` benchmarks another rule config (e.g. with ``short_circuit``)
+instead of the bundled one; compare runs with ``benchmarks.compare``.
+"""
+
+import argparse
+import logging
+import time
+
+from app.services.claim_processor import ClaimProcessor
+from app.services.rules import RuleSet
+from benchmarks.common import print_results, summarize, write_results
+from benchmarks.generator import DEFAULT_MIX, generate_claims
+
+
+def _bench_scalar(
+    processor: ClaimProcessor, name: str, claims: list[dict], batch: int
+) -> dict:
+    adjudicate = processor.adjudicate
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, len(claims), batch):
+        chunk = claims[offset : offset + batch]
+        t0 = time.perf_counter()
+        for claim in chunk:
+            adjudicate(**claim)
+        latencies.extend([(time.perf_counter() - t0) / len(chunk)] * len(chunk))
+    return summarize(name, latencies, time.perf_counter() - start)
+
+
+def _bench_columnar(
+    processor: ClaimProcessor, claims: list[dict], batch: int
+) -> dict:
+    columns = [
+        [c[field] for c in claims]
+        for field in (
+            "member_id",
+            "provider_id",
+            "diagnosis_code",
+            "procedure_code",
+            "claim_amount",
+        )
+    ]
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, len(claims), batch):
+        chunk = [column[offset : offset + batch] for column in columns]
+        t0 = time.perf_counter()
+        processor.adjudicate_many(*chunk)
+        latencies.extend(
+            [(time.perf_counter() - t0) / len(chunk[0])] * len(chunk[0])
+        )
+    return summarize(
+        "adjudicate_many/mixed", latencies, time.perf_counter() - start
+    )
+
+
+def main(args: argparse.Namespace) -> list[dict]:
+    processor = ClaimProcessor(rules=RuleSet(args.rules) if args.rules else None)
+    generated = list(generate_claims(args.claims, args.seed))
+    by_kind = {kind: [c for k, c in generated if k == kind] for kind in DEFAULT_MIX}
+    mixed = [c for _, c in generated]
+
+    # Warm up caches (e.g. the columnar reference build).
+    _bench_scalar(processor, "warmup", mixed[:1000], args.batch)
+    _bench_columnar(processor, mixed[:1000], 1000)
+
+    results = [
+        _bench_scalar(processor, f"adjudicate/{kind}", claims, args.batch)
+        for kind, claims in by_kind.items()
+        if claims
+    ]
+    results.append(_bench_scalar(processor, "adjudicate/mixed", mixed, args.batch))
+    results.append(_bench_columnar(processor, mixed, args.many_batch))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--claims", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument(
+        "--many-batch", type=int, default=10_000,
+        help="claims per adjudicate_many call",
+    )
+    parser.add_argument("--rules", help="rule config file (default: RULES_PATH)")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = main(args)
+    print_results(results)
+    write_results(args.json, "adjudicate", vars(args), results)
@@ -0,0 +1,249 @@
+"""In-process load test of the claims API against a large SQLite database.
+
+Seeds ``--rows`` synthetic claims (1M by default) into ``BENCH_DB``
+once; later runs with the same rows, seed and schema reuse the file.
+Then it drives each scenario through httpx ``ASGITransport`` with
+``--concurrency`` clients::
+
+    python -m benchmarks.bench_api --json api.json
+    python -m benchmarks.bench_api --rows 100000 --scenarios get_claim_cached
+
+Scenarios: list pages (first, deep OFFSET, deep cursor, filtered by
+member / status / fraud flag), ``GET /claims/{id}`` with and without
+the detail cache, and ``POST /claims`` (run last; its rows are deleted
+afterwards so the seeded data stays identical between runs).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+BENCH_DB = os.getenv(
+    "BENCH_DB", os.path.join(tempfile.gettempdir(), "claims-bench.db")
+)
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{BENCH_DB}")
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import delete, func, select  # noqa: E402
+from sqlalchemy.schema import CreateTable  # noqa: E402
+
+from app.api.claims import _encode_cursor  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import Base, async_session, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.claim import Claim  # noqa: E402
+from app.services.claim_cache import claim_cache  # noqa: E402
+from app.services.claim_counters import rebuild_counters  # noqa: E402
+from app.services.claim_processor import ClaimProcessor  # noqa: E402
+from app.services.claim_writer import build_claim_rows, insert_claims  # noqa: E402
+from app.schemas.claim import ClaimRequest  # noqa: E402
+from benchmarks.common import print_results, summarize, write_results  # noqa: E402
+from benchmarks.generator import generate_claims  # noqa: E402
+
+HEADERS = {"X-API-Key": settings.api_key}
+SEED_START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+SEED_CHUNK = 10_000
+
+
+def _schema_fingerprint() -> str:
+    ddl = "".join(
+        str(CreateTable(table).compile(engine.sync_engine))
+        for table in Base.metadata.sorted_tables
+    )
+    return hashlib.sha256(ddl.encode()).hexdigest()[:16]
+
+
+async def seed(rows: int, seed_value: int) -> None:
+    """(Re)create ``BENCH_DB`` with ``rows`` claims unless it already matches."""
+    meta_path = f"{BENCH_DB}.meta.json"
+    meta = {"rows": rows, "seed": seed_value, "schema": _schema_fingerprint()}
+    if os.path.exists(BENCH_DB) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f) == meta:
+                return
+
+    print(f"Seeding {rows} claims into {BENCH_DB} ...")
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    processor = ClaimProcessor()
+    rng = random.Random(seed_value)
+    claims = generate_claims(rows, seed_value)
+    for offset in range(0, rows, SEED_CHUNK):
+        chunk = [claim for _, claim in islice(claims, SEED_CHUNK)]
+        payloads = [ClaimRequest(**claim) for claim in chunk]
+        columns = processor.adjudicate_many(
+            [p.member_id for p in payloads],
+            [p.provider_id for p in payloads],
+            [p.diagnosis_code for p in payloads],
+            [p.procedure_code for p in payloads],
+            [p.claim_amount for p in payloads],
+        )
+        batch = build_claim_rows(payloads, columns)
+        for i, row in enumerate(batch, offset):
+            # One claim a minute, deterministic ids: same data every seed.
+            row["id"] = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            row["created_at"] = row["updated_at"] = SEED_START + timedelta(minutes=i)
+        async with async_session() as db:
+            # Synthetic history: amounts are not capped at annual limits.
+            await insert_claims(db, batch, check_limits=False)
+            await db.commit()
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    print(f"Seeded in {time.perf_counter() - started:.0f}s")
+
+
+async def _drive(
+    client: AsyncClient,
+    name: str,
+    make_request: Callable[[int], tuple[str, str, dict]],
+    requests: int,
+    concurrency: int,
+    expected: int,
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in remaining:
+            method, url, kwargs = make_request(i)
+            start = time.perf_counter()
+            resp = await client.request(method, url, headers=HEADERS, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            errors += resp.status_code != expected
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(name, latencies, time.perf_counter() - start, errors=errors)
+
+
+async def run_scenarios(args: argparse.Namespace) -> list[dict]:
+    page_size = 20
+    deep_page = max(1, args.rows // page_size // 2)
+    async with async_session() as db:
+        sample_ids = (
+            await db.execute(
+                select(Claim.id).order_by(func.random()).limit(args.requests)
+            )
+        ).scalars().all()
+        deep_row = (
+            await db.execute(
+                select(Claim)
+                .order_by(Claim.created_at.desc(), Claim.id.desc())
+                .offset((deep_page - 1) * page_size - 1)
+                .limit(1)
+            )
+        ).scalar_one()
+    deep_cursor = _encode_cursor(deep_row)
+    new_claims = [claim for _, claim in generate_claims(args.requests, args.seed + 1)]
+
+    def get(url: str, **params) -> Callable[[int], tuple[str, str, dict]]:
+        return lambda i: ("GET", url, {"params": params})
+
+    def get_claim(i: int) -> tuple[str, str, dict]:
+        return "GET", f"/claims/{sample_ids[i % len(sample_ids)]}", {}
+
+    def post_claim(i: int) -> tuple[str, str, dict]:
+        return "POST", "/claims", {"json": new_claims[i]}
+
+    scenarios: list[tuple[str, Callable, int, Callable | None]] = [
+        ("list_first_page", get("/claims"), 200, None),
+        ("list_deep_offset", get("/claims", page=deep_page), 200, None),
+        ("list_deep_cursor", get("/claims", cursor=deep_cursor), 200, None),
+        ("list_member", get("/claims", member_id="M124"), 200, None),
+        ("list_status", get("/claims", status="PARTIAL"), 200, None),
+        ("list_fraud", get("/claims", fraud_flag="true"), 200, None),
+        (
+            "list_member_cursor",
+            get("/claims", member_id="M124", cursor=deep_cursor),
+            200,
+            None,
+        ),
+        ("get_claim_uncached", get_claim, 200, lambda: _set_cache(0)),
+        ("get_claim_cached", get_claim, 200, _restore_cache),
+        ("post_claim", post_claim, 201, None),
+    ]
+    selected = set(args.scenarios or [s[0] for s in scenarios])
+
+    results = []
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, make_request, expected, setup in scenarios:
+            if name not in selected:
+                continue
+            if setup:
+                setup()
+            if name == "get_claim_cached":
+                # Prime the cache so the run measures hits only.
+                for claim_id in sample_ids:
+                    await client.get(f"/claims/{claim_id}", headers=HEADERS)
+            result = await _drive(
+                client,
+                name,
+                make_request,
+                args.requests,
+                args.concurrency,
+                expected,
+            )
+            results.append(result)
+            print_results([result])
+    _restore_cache()
+
+    if "post_claim" in selected:
+        last_seeded = SEED_START + timedelta(minutes=args.rows - 1)
+        async with async_session() as db:
+            await db.execute(delete(Claim).where(Claim.created_at > last_seeded))
+            await rebuild_counters(db)
+            await db.commit()
+    return results
+
+
+def _set_cache(size: int) -> None:
+    claim_cache.clear()
+    claim_cache.max_entries = size
+
+
+def _restore_cache() -> None:
+    _set_cache(settings.claim_cache_size)
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    await seed(args.rows, args.seed)
+    return await run_scenarios(args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenarios", nargs="*", help="run only these scenarios")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = asyncio.run(main(args))
+    write_results(
+        args.json,
+        "api",
+        {**vars(args), "database_url": settings.database_url},
+        results,
+    )
@@ -0,0 +1,157 @@
+"""Size and read speed of the Parquet claim archive.
+
+Writes ``--months`` months of ``--rows`` synthetic claims each with
+``ArchiveWriter``, twice: once with version 7 ids (as claims get now)
+and once with random version 4 ids (as older claims have). Reports the
+archive's bytes per row and times, ``--lookups`` times each:
+
+- ``find_v7``: ``claim_archive.find`` of a version 7 id, which opens
+  only its month's file
+- ``find_v4``: the same for a random id, which tries every file
+- ``scan_month``: one whole month through ``claim_archive.scan``, as
+  ``GET /claims/export`` reads it (ops are rows)
+
+Needs pyarrow. ::
+
+    python -m benchmarks.bench_archive --months 12 --rows 50000 --json archive.json
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+
+from app.schemas.claim import ClaimRequest
+from app.services.claim_archive import ClaimArchive
+from app.services.claim_export import ExportRow
+from app.services.claim_partitions import add_months
+from app.services.claim_processor import ClaimProcessor
+from app.services.claim_writer import build_claim_rows
+from benchmarks.common import print_results, summarize, write_results
+from benchmarks.generator import generate_claims
+
+FIRST_MONTH = datetime(2022, 1, 1, tzinfo=timezone.utc)
+CHUNK = 10_000
+
+
+def _month_rows(processor, claims, start, rows: int) -> list[dict]:
+    """``rows`` adjudicated claims spread over ``start``'s month."""
+    out = []
+    span = add_months(start, 1) - start
+    while len(out) < rows:
+        payloads = [
+            ClaimRequest(**c) for _, c in islice(claims, min(CHUNK, rows - len(out)))
+        ]
+        columns = processor.adjudicate_many(
+            [p.member_id for p in payloads],
+            [p.provider_id for p in payloads],
+            [p.diagnosis_code for p in payloads],
+            [p.procedure_code for p in payloads],
+            [p.claim_amount for p in payloads],
+        )
+        at = start + span * (len(out) / rows)
+        out.extend(build_claim_rows(payloads, columns, at))
+    # The writer expects (created_at, id) order, as the job reads it.
+    for i, row in enumerate(out):
+        row["created_at"] = row["updated_at"] = row["created_at"] + timedelta(
+            microseconds=i
+        )
+    return out
+
+
+def _seed(directory: Path, months: int, rows: int, seed: int) -> dict[str, list[str]]:
+    processor = ClaimProcessor()
+    claims = generate_claims(months * rows, seed)
+    ids: dict[str, list[str]] = {"v7": [], "v4": []}
+    for month in range(months):
+        start = add_months(FIRST_MONTH, month)
+        batch = _month_rows(processor, claims, start, rows)
+        for layout in ("v7", "v4"):
+            if layout == "v4":
+                batch = [{**row, "id": str(uuid.uuid4())} for row in batch]
+            archive = ClaimArchive(str(directory / layout))
+            writer = archive.writer(start)
+            writer.write(batch)
+            writer.close()
+            writer.publish()
+            ids[layout].extend(row["id"] for row in batch)
+    return ids
+
+
+async def _time_lookups(archive: ClaimArchive, ids: list[str], name: str, n: int):
+    latencies = []
+    for claim_id in ids[:n]:
+        started = time.perf_counter()
+        assert await archive.find(claim_id) is not None
+        latencies.append(time.perf_counter() - started)
+    return summarize(name, latencies, sum(latencies))
+
+
+async def _time_scan(archive: ClaimArchive, months: int, repeat: int) -> dict:
+    start = add_months(FIRST_MONTH, months // 2)
+    latencies, rows = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        async for batch in archive.scan(
+            ExportRow._fields,
+            1000,
+            created_from=start,
+            created_to=add_months(start, 1),
+        ):
+            rows += len(batch)
+        latencies.append(time.perf_counter() - started)
+    result = summarize("scan_month", latencies, sum(latencies))
+    result["ops"] = rows
+    result["ops_per_sec"] = rows / sum(latencies)
+    return result
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    directory = Path(tempfile.mkdtemp(prefix="claims-archive-"))
+    try:
+        ids = _seed(directory, args.months, args.rows, args.seed)
+        v7 = ClaimArchive(str(directory / "v7"))
+        size = sum(p.stat().st_size for p in v7.files())
+        rng = random.Random(args.seed)
+        sample = rng.sample(range(len(ids["v7"])), args.lookups)
+        results = [
+            await _time_lookups(
+                v7, [ids["v7"][i] for i in sample], "find_v7", args.lookups
+            ),
+            await _time_lookups(
+                ClaimArchive(str(directory / "v4")),
+                [ids["v4"][i] for i in sample],
+                "find_v4",
+                args.lookups,
+            ),
+            await _time_scan(v7, args.months, args.repeat),
+        ]
+        rows = args.months * args.rows
+        print(
+            f"archive: {rows} rows in {args.months} files, "
+            f"{size / 2**20:.1f} MiB, {size / rows:.1f} bytes/row"
+        )
+        return results
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=50_000, help="claims per month")
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_results(results)
+    write_results(args.json, "archive", vars(args), results)
@@ -0,0 +1,142 @@
+"""Request latency of adjudication under each logging setup.
+
+Runs ``--requests`` simulated requests (``ClaimProcessor.adjudicate`` on
+the default claim mix, then a yield to the event loop) from
+``--concurrency`` tasks, with the root logger writing to a sink that
+takes ``--write-delay-ms`` per line (a stand-in for a slow or
+backpressured stdout)::
+
+    python -m benchmarks.bench_logging --json logging.json
+    python -m benchmarks.bench_logging --write-delay-ms 0 --format text
+
+Scenarios: no adjudication logs (``WARNING``), a blocking
+``StreamHandler`` as ``logging.basicConfig`` sets up, and the queue
+handler from ``app.logging_config``, each at ``--sample-rates``.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueListener
+
+from app.logging_config import _QueueHandler, make_formatter
+from app.services import claim_processor
+from app.services.claim_processor import ClaimProcessor
+from benchmarks.common import print_results, summarize, write_results
+from benchmarks.generator import generate_claims
+
+
+class SlowSink:
+    """A write-only stream that takes ``delay`` seconds per write."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.lines = 0
+        self._devnull = open(os.devnull, "w")
+
+    def write(self, text: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        self.lines += 1
+        return self._devnull.write(text)
+
+    def flush(self) -> None:
+        pass
+
+
+async def _drive(
+    processor: ClaimProcessor, claims: list[dict], concurrency: int
+) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    remaining = iter(claims)
+
+    async def worker() -> None:
+        for claim in remaining:
+            start = time.perf_counter()
+            processor.adjudicate(**claim)
+            await asyncio.sleep(0)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+def _run(
+    name: str,
+    handler: str,
+    sample_rate: float,
+    args: argparse.Namespace,
+    claims: list[dict],
+) -> dict:
+    sink = SlowSink(args.write_delay_ms / 1000)
+    output = logging.StreamHandler(sink)
+    output.setFormatter(make_formatter(args.format))
+    listener = None
+    if handler == "queue":
+        records = queue.SimpleQueue()
+        listener = QueueListener(records, output)
+        listener.start()
+        output = _QueueHandler(records)
+
+    root = logging.getLogger()
+    root.handlers = [output]
+    root.setLevel(logging.WARNING if handler == "off" else logging.INFO)
+    claim_processor.LOG_SAMPLE_RATE = sample_rate
+    started = time.perf_counter()
+    try:
+        latencies, elapsed = asyncio.run(
+            _drive(ClaimProcessor(), claims, args.concurrency)
+        )
+    finally:
+        root.handlers = []
+        if listener is not None:
+            listener.stop()
+    total = time.perf_counter() - started
+    return summarize(
+        name,
+        latencies,
+        elapsed,
+        lines=sink.lines,
+        # Until the last line is written, including the queue backlog.
+        total_s=total,
+    )
+
+
+def main(args: argparse.Namespace) -> list[dict]:
+    claims = [claim for _, claim in generate_claims(args.requests, args.seed)]
+    scenarios = [("off", "off", 0.0)]
+    for handler in ("sync", "queue"):
+        for rate in args.sample_rates:
+            scenarios.append((f"{handler}/sample={rate:g}", handler, rate))
+
+    _run("warmup", "off", 0.0, args, claims[:1000])
+    return [
+        _run(name, handler, rate, args, claims)
+        for name, handler, rate in scenarios
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=("text", "json"), default="json")
+    parser.add_argument(
+        "--write-delay-ms", type=float, default=0.05,
+        help="time the sink takes per log line",
+    )
+    parser.add_argument(
+        "--sample-rates", type=float, nargs="+", default=[1.0, 0.1],
+        help="LOG_ADJUDICATION_SAMPLE_RATE values to run",
+    )
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = main(args)
+    print_results(results)
+    write_results(args.json, "logging", vars(args), results)
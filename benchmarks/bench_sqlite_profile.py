@@ -0,0 +1,170 @@
+"""Concurrent read/write throughput of SQLite under each ``DATABASE_PROFILE``.
+
+Each profile runs in its own subprocess (the engine is configured at
+import time) against a fresh database seeded with ``--rows`` claims,
+then drives the app in-process through httpx ``ASGITransport``:
+
+- ``write``: ``--concurrency`` clients posting claims
+- ``read``: the same number of clients fetching claims by id (detail
+  cache disabled) and member-filtered list pages
+- ``mixed/*``: readers and writers at the same time
+
+::
+
+    python -m benchmarks.bench_sqlite_profile --json sqlite_profile.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+async def _child(args: argparse.Namespace) -> list[dict]:
+    import logging
+
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy import func, select
+
+    from app.config import settings
+    from app.database import Base, async_session, engine
+    from app.main import app
+    from app.models.claim import Claim
+    from app.schemas.claim import ClaimRequest
+    from app.services.claim_cache import claim_cache
+    from app.services.claim_processor import ClaimProcessor
+    from app.services.claim_writer import build_claim_row, insert_claims
+    from benchmarks.common import summarize
+    from benchmarks.generator import generate_claims
+
+    logging.getLogger().setLevel(logging.WARNING)
+    claim_cache.max_entries = 0
+    headers = {"X-API-Key": settings.api_key}
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    processor = ClaimProcessor()
+    rows = [
+        build_claim_row(ClaimRequest(**c), processor.adjudicate(**c))
+        for _, c in generate_claims(args.rows, args.seed)
+    ]
+    async with async_session() as db:
+        await insert_claims(db, rows, check_limits=False)
+        await db.commit()
+        ids = (
+            await db.execute(select(Claim.id).order_by(func.random()).limit(1000))
+        ).scalars().all()
+    new_claims = [
+        c for _, c in generate_claims(args.requests * 2, args.seed + 1)
+    ]
+    posted = iter(new_claims)
+
+    async def writer(client, latencies, errors, remaining):
+        for _ in remaining:
+            start = time.perf_counter()
+            resp = await client.post("/claims", json=next(posted), headers=headers)
+            latencies.append(time.perf_counter() - start)
+            errors[0] += resp.status_code != 201
+
+    async def reader(client, latencies, errors, remaining):
+        for i in remaining:
+            if i % 2:
+                url, params = f"/claims/{ids[i % len(ids)]}", None
+            else:
+                url, params = "/claims", {"member_id": "M124"}
+            start = time.perf_counter()
+            resp = await client.get(url, params=params, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            errors[0] += resp.status_code != 200
+
+    async def run(groups):
+        """groups: (name, worker, clients); all groups run concurrently."""
+
+        async def group(name, worker, clients):
+            latencies, errors = [], [0]
+            remaining = iter(range(args.requests))
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(worker(client, latencies, errors, remaining) for _ in range(clients))
+            )
+            elapsed = time.perf_counter() - start
+            return summarize(name, latencies, elapsed, errors=errors[0])
+
+        return list(await asyncio.gather(*(group(*g) for g in groups)))
+
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        half = max(1, args.concurrency // 2)
+        results = await run([("write", writer, args.concurrency)])
+        results += await run([("read", reader, args.concurrency)])
+        results += await run(
+            [("mixed/write", writer, half), ("mixed/read", reader, half)]
+        )
+    await engine.dispose()
+    return results
+
+
+def _run_profile(profile: str, args: argparse.Namespace) -> list[dict]:
+    with tempfile.TemporaryDirectory(prefix="bench-sqlite-") as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/bench.db",
+            "DATABASE_PROFILE": profile,
+        }
+        out = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_sqlite_profile",
+                "--child",
+                *sys.argv[1:],
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    results = json.loads(out.splitlines()[-1])
+    for result in results:
+        result["name"] = f"{profile}/{result['name']}"
+    return results
+
+
+def main(args: argparse.Namespace) -> list[dict]:
+    from benchmarks.common import print_results
+
+    results = []
+    for profile in args.profiles:
+        profile_results = _run_profile(profile, args)
+        print_results(profile_results)
+        print("  errors:", {r["name"]: r["errors"] for r in profile_results})
+        results += profile_results
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--profiles", nargs="*", default=["default", "tuned"],
+        help="DATABASE_PROFILE values to compare",
+    )
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child(args))))
+    else:
+        from benchmarks.common import write_results
+
+        results = main(args)
+        params = {k: v for k, v in vars(args).items() if k != "child"}
+        write_results(args.json, "sqlite_profile", params, results)
@@ -0,0 +1,214 @@
+"""Size and scan speed of the claims table, legacy vs compact layout.
+
+Builds two SQLite files with the same ``--rows`` synthetic claims: one
+with the layout before the compact storage migration (string ids and
+statuses, float amounts, JSON text reasons) and one with the current
+``Claim`` model. Then reports table and index sizes (from ``dbstat``)
+and times, ``--repeat`` times each:
+
+- ``scan_rows``: read every row and decode it the way the API does
+  (``json.loads`` of the reasons for the legacy layout; the column
+  types' conversions for the compact one)
+- ``count_status``: ``count(*)`` for one status, from its index
+- ``sum_approved``: ``sum(approved_amount)`` over the table
+
+::
+
+    python -m benchmarks.bench_storage --rows 200000 --json storage.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+from itertools import islice
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    Index,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    func,
+    select,
+    text,
+)
+
+from app.models.claim import Claim
+from app.schemas.claim import ClaimRequest
+from app.services.claim_processor import ClaimProcessor
+from app.services.claim_writer import build_claim_rows
+from benchmarks.common import print_results, summarize, write_results
+from benchmarks.generator import generate_claims
+
+CHUNK = 10_000
+
+legacy_metadata = MetaData()
+legacy_claims = Table(
+    "claims",
+    legacy_metadata,
+    Column("id", String(36), primary_key=True),
+    Column("member_id", String(50), nullable=False),
+    Column("provider_id", String(50), nullable=False, index=True),
+    Column("diagnosis_code", String(20), nullable=False),
+    Column("procedure_code", String(20), nullable=False),
+    Column("claim_amount", Float, nullable=False),
+    Column("service_date", Date),
+    Column("fingerprint", String(32)),
+    Column("status", String(20), nullable=False),
+    Column("fraud_flag", Boolean),
+    Column("approved_amount", Float),
+    Column("rejection_reasons", Text),
+    Column("created_at", DateTime(timezone=True)),
+    Column("updated_at", DateTime(timezone=True)),
+    # Same indexes as the model (provider_id's comes from index=True).
+    *[
+        Index(
+            index.name,
+            *[column.name for column in index.columns],
+            unique=index.unique,
+            **index.kwargs,
+        )
+        for index in sorted(Claim.__table__.indexes, key=lambda i: i.name)
+        if index.name != "ix_claims_provider_id"
+    ],
+)
+
+
+def _legacy_row(row: dict) -> dict:
+    reasons = row["rejection_reasons"]
+    return {**row, "rejection_reasons": json.dumps(reasons) if reasons else None}
+
+
+def _seed(rows: int, seed: int) -> dict[str, str]:
+    directory = tempfile.mkdtemp(prefix="claims-storage-")
+    paths = {
+        layout: os.path.join(directory, f"{layout}.db")
+        for layout in ("legacy", "compact")
+    }
+    engines = {
+        layout: create_engine(f"sqlite:///{path}") for layout, path in paths.items()
+    }
+    legacy_metadata.create_all(engines["legacy"])
+    Claim.metadata.create_all(engines["compact"], tables=[Claim.__table__])
+
+    processor = ClaimProcessor()
+    claims = generate_claims(rows, seed)
+    for offset in range(0, rows, CHUNK):
+        payloads = [ClaimRequest(**c) for _, c in islice(claims, CHUNK)]
+        columns = processor.adjudicate_many(
+            [p.member_id for p in payloads],
+            [p.provider_id for p in payloads],
+            [p.diagnosis_code for p in payloads],
+            [p.procedure_code for p in payloads],
+            [p.claim_amount for p in payloads],
+        )
+        batch = build_claim_rows(payloads, columns)
+        for i, row in enumerate(batch, offset):
+            row["id"] = str(uuid.UUID(int=i + 1, version=4))
+        with engines["compact"].begin() as conn:
+            conn.execute(Claim.__table__.insert(), batch)
+        with engines["legacy"].begin() as conn:
+            conn.execute(legacy_claims.insert(), [_legacy_row(r) for r in batch])
+
+    for engine in engines.values():
+        with engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+            conn.exec_driver_sql("ANALYZE")
+        engine.dispose()
+    return paths
+
+
+def _sizes(path: str) -> dict:
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as conn:
+        pages = dict(
+            conn.execute(
+                text("SELECT name, sum(pgsize) FROM dbstat GROUP BY name")
+            ).all()
+        )
+    engine.dispose()
+    table = pages.pop("claims", 0)
+    indexes = sum(size for name, size in pages.items() if "claims" in name)
+    return {
+        "table_bytes": table,
+        "index_bytes": indexes,
+        "file_bytes": os.path.getsize(path),
+    }
+
+
+def _time(name: str, run, repeat: int, **extra) -> dict:
+    run()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+    return summarize(name, latencies, sum(latencies), **extra)
+
+
+def _bench(layout: str, path: str, repeat: int) -> list[dict]:
+    engine = create_engine(f"sqlite:///{path}")
+    table = legacy_claims if layout == "legacy" else Claim.__table__
+
+    def scan_rows():
+        with engine.connect() as conn:
+            for row in conn.execute(select(table)):
+                if layout == "legacy" and row.rejection_reasons:
+                    json.loads(row.rejection_reasons)
+
+    def count_status():
+        with engine.connect() as conn:
+            conn.execute(
+                select(func.count()).where(table.c.status == "REJECTED")
+            ).scalar_one()
+
+    def sum_approved():
+        with engine.connect() as conn:
+            conn.execute(select(func.sum(table.c.approved_amount))).scalar_one()
+
+    sizes = _sizes(path)
+    results = [
+        _time(f"{layout}/scan_rows", scan_rows, repeat, **sizes),
+        _time(f"{layout}/count_status", count_status, repeat),
+        _time(f"{layout}/sum_approved", sum_approved, repeat),
+    ]
+    engine.dispose()
+    return results
+
+
+def main(args: argparse.Namespace) -> list[dict]:
+    paths = _seed(args.rows, args.seed)
+    results = []
+    for layout, path in paths.items():
+        results.extend(_bench(layout, path, args.repeat))
+    for layout, path in paths.items():
+        sizes = _sizes(path)
+        print(
+            f"{layout:>8}: table {sizes['table_bytes'] / 2**20:7.1f} MiB  "
+            f"indexes {sizes['index_bytes'] / 2**20:7.1f} MiB  "
+            f"file {sizes['file_bytes'] / 2**20:7.1f} MiB"
+        )
+        os.remove(path)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = main(args)
+    print_results(results)
+    write_results(args.json, "storage", vars(args), results)
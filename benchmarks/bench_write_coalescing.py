@@ -0,0 +1,126 @@
+"""Latency and throughput of POST /claims with and without write coalescing.
+
+Runs the app in-process (httpx ASGITransport) against a fresh SQLite file,
+with ``--concurrency`` submitters posting claims back to back, once with
+coalescing off and once per ``--windows`` value::
+
+    python -m benchmarks.bench_write_coalescing --concurrency 200 --requests 4000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench-coalesce-")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{_tmpdir}/bench.db"
+)
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import app.api.claims as claims_api  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import Base, async_session, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.write_coalescer import ClaimWriteCoalescer  # noqa: E402
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 30000,
+}
+HEADERS = {"X-API-Key": settings.api_key}
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+async def _run(concurrency: int, requests: int) -> dict:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    commits = 0
+
+    def on_commit(conn):
+        nonlocal commits
+        commits += 1
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def submitter(client: AsyncClient) -> None:
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            resp = await client.post("/claims", json=CLAIM, headers=HEADERS)
+            latencies.append(time.perf_counter() - start)
+            # Without coalescing, SQLite lock timeouts surface as 500s.
+            errors += resp.status_code != 201
+
+    event.listen(engine.sync_engine, "commit", on_commit)
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(submitter(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    event.remove(engine.sync_engine, "commit", on_commit)
+    await claims_api.write_coalescer.stop()
+
+    return {
+        "requests": requests,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "commits": commits,
+        "errors": errors,
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    results = []
+    configs = [("off", None)] + [(f"window={w}ms", w) for w in args.windows]
+    for name, window_ms in configs:
+        settings.write_coalesce_enabled = window_ms is not None
+        claims_api.write_coalescer = ClaimWriteCoalescer(
+            async_session,
+            window=(window_ms or 0) / 1000,
+            max_batch=args.max_batch,
+        )
+        result = {"config": name, **await _run(args.concurrency, args.requests)}
+        results.append(result)
+        print(
+            f"{name:>14}  {result['throughput_rps']:8.0f} req/s  "
+            f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+            f"commits {result['commits']:5d}  errors {result['errors']}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument(
+        "--windows", type=float, nargs="*", default=[0, 1, 2, 5],
+        help="coalescing windows to try, in milliseconds",
+    )
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = asyncio.run(main(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,79 @@
+"""Result format shared by the benchmark scripts.
+
+Every script writes one JSON document::
+
+    {"benchmark": "api", "environment": {...}, "params": {...},
+     "results": [{"name": "...", "ops_per_sec": ..., "p50_ms": ..., ...}]}
+
+so ``benchmarks.compare`` can diff any two runs of the same benchmark.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+
+def summarize(name: str, latencies: list[float], elapsed: float, **extra) -> dict:
+    """Throughput and latency percentiles for ``latencies`` (seconds)."""
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "name": name,
+        "ops": len(latencies),
+        "ops_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": p50 * 1000,
+        "p95_ms": p95 * 1000,
+        "p99_ms": p99 * 1000,
+        **extra,
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def print_results(results: list[dict]) -> None:
+    for r in results:
+        print(
+            f"{r['name']:>28}  {r['ops_per_sec']:10.0f} ops/s  "
+            f"p50 {r['p50_ms']:8.3f} ms  p95 {r['p95_ms']:8.3f} ms  "
+            f"p99 {r['p99_ms']:8.3f} ms"
+        )
+
+
+def write_results(
+    path: str | None, benchmark: str, params: dict, results: list[dict]
+) -> dict:
+    document = {
+        "benchmark": benchmark,
+        "environment": environment(),
+        "params": params,
+        "results": results,
+    }
+    if path:
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2)
+    return document
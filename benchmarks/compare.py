@@ -0,0 +1,72 @@
+"""Compare two benchmark result files and flag regressions.
+
+::
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+A scenario regresses when its throughput drops, or its p50/p99 latency
+rises, by more than ``--threshold`` percent. Exits with status 1 if any
+scenario regressed, so it can gate CI.
+"""
+
+import argparse
+import json
+import sys
+
+# metric -> True if higher is better
+METRICS = {"ops_per_sec": True, "p50_ms": False, "p99_ms": False}
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list[dict]:
+    """Return one row per (scenario, metric) present in both runs."""
+    if baseline["benchmark"] != candidate["benchmark"]:
+        raise ValueError(
+            f"Cannot compare {baseline['benchmark']!r} with "
+            f"{candidate['benchmark']!r} results"
+        )
+    before = {r["name"]: r for r in baseline["results"]}
+    rows = []
+    for result in candidate["results"]:
+        old = before.get(result["name"])
+        if old is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if not old.get(metric):
+                continue
+            change = (result[metric] - old[metric]) / old[metric] * 100
+            worse = -change if higher_is_better else change
+            rows.append(
+                {
+                    "name": result["name"],
+                    "metric": metric,
+                    "baseline": old[metric],
+                    "candidate": result[metric],
+                    "change_pct": change,
+                    "regressed": worse > threshold,
+                }
+            )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0,
+        help="allowed slowdown in percent",
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    rows = compare(baseline, candidate, args.threshold)
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else ""
+        print(
+            f"{row['name']:>28} {row['metric']:>12}  {row['baseline']:12.3f} -> "
+            f"{row['candidate']:12.3f}  {row['change_pct']:+7.1f}%  {flag}"
+        )
+    sys.exit(1 if any(row["regressed"] for row in rows) else 0)
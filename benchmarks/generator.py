@@ -0,0 +1,101 @@
+"""Deterministic synthetic claims covering every adjudication outcome.
+
+Amount ranges are derived from ``mock_data`` so each kind really lands on
+its outcome:
+
+- ``approved``: active member, amount within the benefit limit and under
+  the fraud threshold
+- ``partial``: amount above the benefit limit but under the fraud threshold
+- ``fraud``: amount above the fraud threshold but within the limit
+  (approved and flagged)
+- ``rejected``: inactive or unknown member, provider, diagnosis or
+  procedure
+
+Can also write a JSONL file for ``python -m app.ingest``::
+
+    python -m benchmarks.generator claims.jsonl --count 1000000
+"""
+
+import argparse
+import json
+import random
+from collections.abc import Iterator, Mapping
+
+from app.services import mock_data
+from app.services.rules import FRAUD_COST_MULTIPLIER
+
+DEFAULT_MIX = {"approved": 0.6, "partial": 0.15, "fraud": 0.1, "rejected": 0.15}
+
+ACTIVE_MEMBERS = sorted(
+    m for m, info in mock_data.MEMBERS.items() if info["status"] == "active"
+)
+INACTIVE_MEMBERS = sorted(
+    m for m, info in mock_data.MEMBERS.items() if info["status"] != "active"
+)
+PROVIDERS = sorted(mock_data.PROVIDERS)
+
+
+def _ranges() -> dict[str, list[tuple[str, str, float, float]]]:
+    """(diagnosis, procedure, low, high) amount ranges for each valid kind."""
+    ranges: dict[str, list] = {"approved": [], "partial": [], "fraud": []}
+    for diagnosis, limit in mock_data.BENEFIT_LIMITS.items():
+        for procedure, avg_cost in mock_data.PROCEDURE_AVG_COSTS.items():
+            threshold = avg_cost * FRAUD_COST_MULTIPLIER
+            ranges["approved"].append((diagnosis, procedure, 1, min(limit, threshold)))
+            if limit < threshold:
+                ranges["partial"].append((diagnosis, procedure, limit + 1, threshold))
+            if threshold < limit:
+                ranges["fraud"].append((diagnosis, procedure, threshold + 1, limit))
+    return ranges
+
+
+RANGES = _ranges()
+
+
+def _rejected(rng: random.Random) -> dict:
+    claim = _valid(rng, "approved")
+    reason = rng.randrange(5)
+    if reason == 0 and INACTIVE_MEMBERS:
+        claim["member_id"] = rng.choice(INACTIVE_MEMBERS)
+    elif reason <= 1:
+        claim["member_id"] = f"M9{rng.randrange(1000):03d}"
+    elif reason == 2:
+        claim["provider_id"] = f"H9{rng.randrange(1000):03d}"
+    elif reason == 3:
+        claim["diagnosis_code"] = f"D9{rng.randrange(100):02d}"
+    else:
+        claim["procedure_code"] = f"P9{rng.randrange(100):02d}"
+    return claim
+
+
+def _valid(rng: random.Random, kind: str) -> dict:
+    diagnosis, procedure, low, high = rng.choice(RANGES[kind])
+    return {
+        "member_id": rng.choice(ACTIVE_MEMBERS),
+        "provider_id": rng.choice(PROVIDERS),
+        "diagnosis_code": diagnosis,
+        "procedure_code": procedure,
+        "claim_amount": round(rng.uniform(low, high), 2),
+    }
+
+
+def generate_claims(
+    count: int, seed: int = 0, mix: Mapping[str, float] = DEFAULT_MIX
+) -> Iterator[tuple[str, dict]]:
+    """Yield ``count`` (kind, claim payload) pairs; same seed, same claims."""
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    for kind in rng.choices(kinds, weights, k=count):
+        yield kind, _rejected(rng) if kind == "rejected" else _valid(rng, kind)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic claims as JSONL.")
+    parser.add_argument("path")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    with open(args.path, "w") as f:
+        for _, claim in generate_claims(args.count, args.seed):
+            f.write(json.dumps(claim) + "\n")
@@ -1,16 +1,55 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.config import settings
 from app.database import Base, engine
 from app.main import app
+from app.services.benefit_accumulators import benefit_ledger
+from app.services.claim_cache import claim_cache
+from app.services.cost_stats import cost_stats
+from app.services.duplicates import duplicate_filter
 
 API_KEY = settings.api_key
 AUTH_HEADERS = {"X-API-Key": API_KEY}
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_module(module: str, database_url: str, *args: str, **env: str):
+    """``python -m <module> <args>`` against ``database_url``, in a
+    subprocess as in deployment, so its logging setup stays out of the
+    test run."""
+    return subprocess.run(
+        [sys.executable, "-m", module, *args],
+        cwd=ROOT,
+        env={**os.environ, "DATABASE_URL": database_url, **env},
+        capture_output=True,
+        text=True,
+    )
+
+
+async def reset_postgres(url: str) -> None:
+    """Empty the PostgreSQL database at ``url``, alembic_version included."""
+    pg_engine = create_async_engine(url)
+    try:
+        async with pg_engine.begin() as conn:
+            await conn.exec_driver_sql("DROP SCHEMA public CASCADE")
+            await conn.exec_driver_sql("CREATE SCHEMA public")
+    finally:
+        await pg_engine.dispose()
 
 
 @pytest_asyncio.fixture(autouse=True, loop_scope="session")
 async def reset_db():
+    claim_cache.clear()
+    benefit_ledger.clear()
+    cost_stats.clear()
+    duplicate_filter.clear()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,139 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.database import async_session
+from app.models.claim import Claim
+from app.schemas.claim import ClaimRequest
+from app.services.adjudication_queue import (
+    AdjudicationQueue,
+    DurableQueueStore,
+    QueueFull,
+    adjudication_queue,
+)
+from app.services.claim_processor import AdjudicationResult
+from app.services.claim_writer import PENDING, build_claim_row, insert_claims
+from tests.conftest import AUTH_HEADERS
+
+pytestmark = pytest.mark.asyncio
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 30000,
+}
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def stop_queue():
+    # Workers run on the test's event loop; stop them before it closes.
+    yield
+    await adjudication_queue.stop()
+
+
+async def _store_pending(claim: dict) -> str:
+    row = build_claim_row(ClaimRequest(**claim), AdjudicationResult(status=PENDING))
+    async with async_session() as db:
+        await insert_claims(db, [row])
+        await db.commit()
+    return row["id"]
+
+
+async def test_async_submit_returns_202_then_adjudicates(client):
+    resp = await client.post("/claims?async=true", json=CLAIM, headers=AUTH_HEADERS)
+    assert resp.status_code == 202
+    body = resp.json()
+    assert body["status"] == "PENDING"
+    assert resp.headers["Location"] == f"/claims/{body['claim_id']}"
+
+    await adjudication_queue.join()
+
+    resp = await client.get(f"/claims/{body['claim_id']}", headers=AUTH_HEADERS)
+    assert resp.json()["status"] == "APPROVED"
+    assert resp.json()["approved_amount"] == 30000
+
+    resp = await client.get("/claims?status=PENDING", headers=AUTH_HEADERS)
+    assert resp.json()["total"] == 0
+    resp = await client.get("/claims?status=APPROVED", headers=AUTH_HEADERS)
+    assert resp.json()["total"] == 1
+
+
+async def test_async_claims_share_the_annual_limit(client):
+    ids = []
+    for _ in range(2):
+        resp = await client.post(
+            "/claims?async=true", json=CLAIM, headers=AUTH_HEADERS
+        )
+        ids.append(resp.json()["claim_id"])
+    await adjudication_queue.join()
+
+    claims = [
+        (await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)).json()
+        for claim_id in ids
+    ]
+    # D001 allows 40000 a year; workers may finish in either order.
+    assert sorted(c["approved_amount"] for c in claims) == [10000, 30000]
+    assert sorted(c["status"] for c in claims) == ["APPROVED", "PARTIAL"]
+
+
+async def test_async_duplicate_returns_original(client):
+    claim = {**CLAIM, "service_date": "2026-03-14"}
+    first = await client.post("/claims?async=true", json=claim, headers=AUTH_HEADERS)
+    again = await client.post("/claims?async=true", json=claim, headers=AUTH_HEADERS)
+    assert again.status_code == 200
+    assert again.json()["claim_id"] == first.json()["claim_id"]
+
+
+async def test_full_queue_returns_503_without_storing(client, monkeypatch):
+    monkeypatch.setattr(adjudication_queue, "max_size", 0)
+    resp = await client.post("/claims?async=true", json=CLAIM, headers=AUTH_HEADERS)
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+    async with async_session() as db:
+        assert (await db.execute(select(Claim))).first() is None
+
+    metrics = (await client.get("/metrics")).text
+    assert "adjudication_queue_rejected_total 1" in metrics
+    assert "adjudication_queue_depth 0" in metrics
+
+
+async def test_reservations_count_towards_the_bound():
+    queue = AdjudicationQueue(async_session, max_size=2, workers=1, batch_size=10)
+    queue.reserve("a")
+    queue.reserve("b")
+    with pytest.raises(QueueFull):
+        queue.reserve("c")
+    queue.cancel("b")
+    queue.reserve("c")
+    assert queue.depth == 2
+
+
+async def test_durable_store_requeues_after_restart(client, tmp_path):
+    path = str(tmp_path / "queue.db")
+    claim_id = await _store_pending(CLAIM)
+    store = DurableQueueStore(path)
+    store.add(claim_id, 0.0)
+    store.close()
+
+    # A new process finds the claim the previous one never adjudicated.
+    store = DurableQueueStore(path)
+    queue = AdjudicationQueue(
+        async_session, max_size=10, workers=2, batch_size=10, store=store
+    )
+    assert await queue.start() == 1
+    await queue.stop()
+
+    assert store.pending() == []
+    resp = await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)
+    assert resp.json()["status"] == "APPROVED"
+    assert queue.stats()["completed"] == 1
+
+
+async def test_lag_is_recorded(client):
+    await client.post("/claims?async=true", json=CLAIM, headers=AUTH_HEADERS)
+    await adjudication_queue.join()
+    metrics = (await client.get("/metrics")).text
+    assert "adjudication_queue_lag_seconds_count" in metrics
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionMiddleware, LoadMonitor, load_monitor
+from app.auth import TokenBucket, api_clients, parse_api_keys
+from app.config import Settings
+from tests.conftest import AUTH_HEADERS
+
+pytestmark = pytest.mark.asyncio
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 1000,
+}
+
+
+@pytest.fixture
+def partner_keys():
+    clients = parse_api_keys(
+        Settings(api_key="", api_keys="fast:fast-key,slow:slow-key:1:2")
+    )
+    api_clients.update(clients)
+    yield
+    for key in clients:
+        del api_clients[key]
+
+
+@pytest.fixture
+def overloaded():
+    load_monitor.observe_pool_wait(10.0)
+    load_monitor.update(loop_lag=0.0)
+    yield
+    load_monitor.reset()
+
+
+async def test_parse_api_keys_applies_defaults():
+    clients = parse_api_keys(
+        Settings(
+            api_key="main",
+            api_keys="a:key-a, b:key-b:5:10:3",
+            rate_limit_per_second=2,
+            api_key_max_concurrency=4,
+        )
+    )
+    assert {key: c.name for key, c in clients.items()} == {
+        "main": "default",
+        "key-a": "a",
+        "key-b": "b",
+    }
+    assert clients["key-a"].bucket.rate == 2
+    assert clients["key-a"].bucket.capacity == 2
+    assert clients["key-a"].max_concurrency == 4
+    assert (clients["key-b"].bucket.rate, clients["key-b"].bucket.capacity) == (5, 10)
+    assert clients["key-b"].max_concurrency == 3
+
+    with pytest.raises(ValueError):
+        parse_api_keys(Settings(api_keys="no-key"))
+
+
+async def test_token_bucket_refills():
+    bucket = TokenBucket(rate=2, capacity=2)
+    now = bucket.updated
+    assert bucket.take(now) == 0
+    assert bucket.take(now) == 0
+    assert bucket.take(now) == pytest.approx(0.5)
+    assert bucket.take(now + 0.5) == 0
+
+
+async def test_each_key_has_its_own_rate_limit(client, partner_keys):
+    slow = {"X-API-Key": "slow-key"}
+    codes = [
+        (await client.get("/claims", headers=slow)).status_code for _ in range(3)
+    ]
+    assert codes == [200, 200, 429]
+
+    resp = await client.get("/claims", headers=slow)
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "1"
+    assert resp.json() == {"detail": "Rate limit exceeded"}
+
+    for headers in ({"X-API-Key": "fast-key"}, AUTH_HEADERS):
+        assert (await client.get("/claims", headers=headers)).status_code == 200
+
+    metrics = (await client.get("/metrics")).text
+    assert 'admission_rejected_total{client="slow",reason="rate"} 2' in metrics
+
+
+async def test_unknown_key_still_gets_401(client, partner_keys):
+    resp = await client.get("/claims", headers={"X-API-Key": "nope"})
+    assert resp.status_code == 401
+
+
+async def test_concurrency_limit():
+    release = asyncio.Event()
+    sent = []
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            sent.append(message["status"])
+
+    clients = parse_api_keys(Settings(api_key="", api_keys="p:key:0:0:1"))
+    app = AdmissionMiddleware(slow_app, clients, LoadMonitor(0, 0))
+    scope = {"type": "http", "headers": [(b"x-api-key", b"key")]}
+
+    first = asyncio.create_task(app(scope, None, send))
+    await asyncio.sleep(0)
+    await app(scope, None, send)
+    assert sent == [429]
+
+    release.set()
+    await first
+    await app(scope, None, send)
+    assert sent == [429, 200, 200]
+    assert clients["key"].in_flight == 0
+
+
+async def test_overload_sheds_api_requests_only(client, overloaded):
+    assert load_monitor.shed_probability == 1.0
+
+    resp = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert (await client.get("/health")).status_code == 200
+    assert (await client.get("/metrics")).status_code == 200
+
+
+async def test_shed_probability_follows_overshoot():
+    monitor = LoadMonitor(pool_wait_threshold=0.1, loop_lag_threshold=0.2)
+    monitor.update(loop_lag=0.05)
+    assert monitor.shed_probability == 0.0
+
+    # Smoothed lag 0.025, then 0.3: 1.5x the threshold.
+    monitor.update(loop_lag=0.575)
+    assert monitor.shed_probability == pytest.approx(0.5)
+
+    monitor.observe_pool_wait(0.5)
+    monitor.update(loop_lag=0.0)
+    assert monitor.shed_probability == 1.0
+
+    # Signals decay once the pressure is gone.
+    for _ in range(10):
+        monitor.update(loop_lag=0.0)
+    assert monitor.shed_probability == 0.0
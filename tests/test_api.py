@@ -1,5 +1,15 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import event
 
+from app.config import settings
+from app.database import async_session, engine
+from app.models.claim import Claim
+from app.services.claim_cache import claim_cache
 from tests.conftest import AUTH_HEADERS
 
 pytestmark = pytest.mark.asyncio
@@ -11,6 +21,8 @@ VALID_CLAIM = {
     "procedure_code": "P001",
     "claim_amount": 30000,
 }
+# Three of these fit within M123's annual D001 limit.
+SMALL_CLAIM = {**VALID_CLAIM, "claim_amount": 10000}
 
 
 async def test_health(client):
@@ -53,6 +65,32 @@ async def test_submit_and_retrieve_approved_claim(client):
     assert detail["member_id"] == "M123"
 
 
+async def test_submit_claim_issues_no_read_back(client):
+    # The first claim for a member loads their benefit accumulator.
+    await client.post(
+        "/claims", json={**VALID_CLAIM, "claim_amount": 100}, headers=AUTH_HEADERS
+    )
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()[:3]))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        resp = await client.post("/claims", json=VALID_CLAIM, headers=AUTH_HEADERS)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert resp.status_code == 201
+    # One INSERT for the claim, one upsert each for the list counters and
+    # the benefit accumulator, no SELECT.
+    assert statements == [
+        "INSERT INTO claims",
+        "INSERT INTO claim_counters",
+        "INSERT INTO benefit_accumulators",
+    ]
+
+
 async def test_submit_partial_claim(client):
     resp = await client.post(
         "/claims",
@@ -83,6 +121,83 @@ async def test_get_nonexistent_claim(client):
     assert resp.status_code == 404
 
 
+async def test_get_claim_is_cached_with_etag(client):
+    resp = await client.post("/claims", json=VALID_CLAIM, headers=AUTH_HEADERS)
+    claim_id = resp.json()["claim_id"]
+
+    first = await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)
+    etag = first.headers["etag"]
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        # Any spelling of the id shares the entry.
+        second = await client.get(f"/claims/{claim_id.upper()}", headers=AUTH_HEADERS)
+        not_modified = await client.get(
+            f"/claims/{claim_id}",
+            headers={**AUTH_HEADERS, "If-None-Match": etag},
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert statements == []
+    assert second.json() == first.json()
+    assert second.headers["etag"] == etag
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    stats = (await client.get("/stats/cache")).json()["claims"]
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+
+
+async def test_get_claim_cache_invalidated_on_update(client):
+    resp = await client.post("/claims", json=VALID_CLAIM, headers=AUTH_HEADERS)
+    claim_id = resp.json()["claim_id"]
+    first = await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)
+    etag = first.headers["etag"]
+
+    async with async_session() as db:
+        claim = await db.get(Claim, claim_id)
+        claim.status = "REJECTED"
+        await db.flush()
+        # Until the commit, readers still see (and may cache) the old row.
+        assert claim_cache.stats()["size"] == 1
+        await db.commit()
+    assert claim_cache.stats()["size"] == 0
+
+    resp = await client.get(
+        f"/claims/{claim_id}", headers={**AUTH_HEADERS, "If-None-Match": etag}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "REJECTED"
+    assert resp.headers["etag"] != etag
+
+
+async def test_get_claim_does_not_recache_a_row_invalidated_mid_read(client):
+    resp = await client.post("/claims", json=VALID_CLAIM, headers=AUTH_HEADERS)
+    claim_id = resp.json()["claim_id"]
+
+    def commit_elsewhere(conn, cursor, statement, parameters, context, executemany):
+        # Another request's update commits after this read's snapshot.
+        claim_cache.invalidate(claim_id)
+
+    event.listen(engine.sync_engine, "after_cursor_execute", commit_elsewhere)
+    try:
+        resp = await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", commit_elsewhere)
+    assert resp.status_code == 200
+    assert claim_cache.stats()["size"] == 0
+
+    # The next read caches again.
+    await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)
+    assert claim_cache.stats()["size"] == 1
+
+
 async def test_invalid_payload(client):
     resp = await client.post(
         "/claims", json={"member_id": "M123"}, headers=AUTH_HEADERS
@@ -99,6 +214,30 @@ async def test_negative_amount(client):
     assert resp.status_code == 422
 
 
+@pytest.mark.parametrize("amount", [1e20, 12.345, 0.001])
+async def test_amounts_must_fit_cents(client, amount):
+    resp = await client.post(
+        "/claims",
+        json={**VALID_CLAIM, "claim_amount": amount},
+        headers=AUTH_HEADERS,
+    )
+    assert resp.status_code == 422
+
+
+async def test_submitted_amounts_read_back_unchanged(client):
+    resp = await client.post(
+        "/claims",
+        json={**VALID_CLAIM, "claim_amount": 1234.56},
+        headers=AUTH_HEADERS,
+    )
+    assert resp.status_code == 201
+    submitted = resp.json()
+    resp = await client.get(f"/claims/{submitted['claim_id']}", headers=AUTH_HEADERS)
+    stored = resp.json()
+    assert stored["claim_amount"] == 1234.56
+    assert stored["approved_amount"] == submitted["approved_amount"] == 1234.56
+
+
 # --- GET /claims (list + pagination) ---
 
 
@@ -188,3 +327,201 @@ async def test_list_claims_filter_by_fraud(client):
     data = resp.json()
     assert data["total"] == 1
     assert data["items"][0]["fraud_flag"] is True
+
+
+# --- POST /claims/batch ---
+
+
+async def test_batch_submit_returns_results_in_order(client):
+    batch = [
+        VALID_CLAIM,
+        {**VALID_CLAIM, "claim_amount": -5},
+        {**VALID_CLAIM, "member_id": "M125"},
+        {"member_id": "M123"},
+        {**VALID_CLAIM, "claim_amount": 50000},
+    ]
+    resp = await client.post("/claims/batch", json=batch, headers=AUTH_HEADERS)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["created"] == 3
+    assert data["failed"] == 2
+
+    results = data["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert results[0]["claim"]["status"] == "APPROVED"
+    assert results[1]["claim"] is None
+    assert results[1]["errors"][0]["loc"] == ["claim_amount"]
+    assert results[2]["claim"]["status"] == "REJECTED"
+    assert {e["loc"][0] for e in results[3]["errors"]} == {
+        "provider_id",
+        "diagnosis_code",
+        "procedure_code",
+        "claim_amount",
+    }
+    assert results[4]["claim"]["status"] == "PARTIAL"
+    assert results[4]["claim"]["fraud_flag"] is True
+
+    claim_id = results[2]["claim"]["claim_id"]
+    detail = await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)
+    assert detail.status_code == 200
+    assert detail.json()["rejection_reasons"] == [
+        "Member M125 is not eligible (status: inactive)"
+    ]
+
+    listing = await client.get("/claims", headers=AUTH_HEADERS)
+    assert listing.json()["total"] == 3
+
+
+async def test_batch_submit_rejects_empty_and_oversized(client):
+    resp = await client.post("/claims/batch", json=[], headers=AUTH_HEADERS)
+    assert resp.status_code == 422
+
+    too_many = [VALID_CLAIM] * (settings.batch_max_size + 1)
+    resp = await client.post("/claims/batch", json=too_many, headers=AUTH_HEADERS)
+    assert resp.status_code == 422
+
+
+async def test_batch_submit_requires_api_key(client):
+    resp = await client.post("/claims/batch", json=[VALID_CLAIM])
+    assert resp.status_code == 401
+
+
+# --- GET /claims (cursor pagination) ---
+
+
+async def test_list_claims_cursor_walks_all_rows(client):
+    batch = [{**VALID_CLAIM, "claim_amount": 1000 + i} for i in range(7)]
+    await client.post("/claims/batch", json=batch, headers=AUTH_HEADERS)
+
+    first = await client.get(
+        "/claims", params={"page_size": 3}, headers=AUTH_HEADERS
+    )
+    data = first.json()
+    assert data["total"] == 7
+    assert data["next_cursor"] is not None
+
+    seen = [item["claim_id"] for item in data["items"]]
+    cursor = data["next_cursor"]
+    while cursor:
+        resp = await client.get(
+            "/claims",
+            params={"page_size": 3, "cursor": cursor},
+            headers=AUTH_HEADERS,
+        )
+        assert resp.status_code == 200
+        page = resp.json()
+        assert page["total"] is None
+        assert page["pages"] is None
+        assert page["page"] is None
+        seen.extend(item["claim_id"] for item in page["items"])
+        cursor = page["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == 7
+
+    offset_ids = []
+    for page_number in (1, 2, 3):
+        resp = await client.get(
+            "/claims",
+            params={"page": page_number, "page_size": 3},
+            headers=AUTH_HEADERS,
+        )
+        offset_ids.extend(item["claim_id"] for item in resp.json()["items"])
+    assert seen == offset_ids
+
+
+async def test_list_claims_cursor_with_filter_and_total(client):
+    await client.post(
+        "/claims/batch",
+        json=[SMALL_CLAIM, {**SMALL_CLAIM, "member_id": "M125"}] * 3,
+        headers=AUTH_HEADERS,
+    )
+    first = (
+        await client.get(
+            "/claims",
+            params={"status": "REJECTED", "page_size": 2},
+            headers=AUTH_HEADERS,
+        )
+    ).json()
+    resp = await client.get(
+        "/claims",
+        params={
+            "status": "REJECTED",
+            "page_size": 2,
+            "cursor": first["next_cursor"],
+            "include_total": True,
+        },
+        headers=AUTH_HEADERS,
+    )
+    data = resp.json()
+    assert data["total"] == 3
+    assert data["pages"] == 2
+    assert data["next_cursor"] is None
+    assert [item["status"] for item in data["items"]] == ["REJECTED"]
+
+
+async def test_list_claims_invalid_cursor(client):
+    resp = await client.get(
+        "/claims", params={"cursor": "not-a-cursor"}, headers=AUTH_HEADERS
+    )
+    assert resp.status_code == 400
+
+
+# --- GET /claims/export ---
+
+
+async def test_export_ndjson_streams_filtered_rows(client, monkeypatch):
+    monkeypatch.setattr(settings, "export_chunk_size", 2)
+    batch = [SMALL_CLAIM, {**SMALL_CLAIM, "member_id": "M125"}] * 3
+    await client.post("/claims/batch", json=batch, headers=AUTH_HEADERS)
+
+    resp = await client.get("/claims/export", headers=AUTH_HEADERS)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(lines) == 6
+
+    listed = (
+        await client.get("/claims", params={"page_size": 10}, headers=AUTH_HEADERS)
+    ).json()["items"]
+    assert sorted(lines, key=lambda c: c["claim_id"]) == sorted(
+        listed, key=lambda c: c["claim_id"]
+    )
+
+    resp = await client.get(
+        "/claims/export", params={"status": "rejected"}, headers=AUTH_HEADERS
+    )
+    rejected = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(rejected) == 3
+    assert rejected[0]["rejection_reasons"] == [
+        "Member M125 is not eligible (status: inactive)"
+    ]
+
+
+async def test_export_csv_with_date_range(client):
+    await client.post("/claims", json=VALID_CLAIM, headers=AUTH_HEADERS)
+
+    resp = await client.get(
+        "/claims/export", params={"format": "csv"}, headers=AUTH_HEADERS
+    )
+    assert resp.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert len(rows) == 1
+    assert rows[0]["member_id"] == "M123"
+    assert rows[0]["status"] == "APPROVED"
+    assert rows[0]["rejection_reasons"] == ""
+
+    created_at = datetime.fromisoformat(rows[0]["created_at"])
+    before = (created_at - timedelta(seconds=1)).isoformat()
+    after = (created_at + timedelta(seconds=1)).isoformat()
+    in_range = await client.get(
+        "/claims/export",
+        params={"format": "csv", "created_from": before, "created_to": after},
+        headers=AUTH_HEADERS,
+    )
+    assert len(list(csv.DictReader(io.StringIO(in_range.text)))) == 1
+    out_of_range = await client.get(
+        "/claims/export",
+        params={"format": "csv", "created_from": after},
+        headers=AUTH_HEADERS,
+    )
+    assert list(csv.DictReader(io.StringIO(out_of_range.text))) == []
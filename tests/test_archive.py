@@ -0,0 +1,198 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.archive import archive, archive_cutoff
+from app.database import async_session
+from app.models.claim import Claim
+from app.models.types import claim_id_time, new_claim_id
+from app.schemas.claim import ClaimRequest
+from app.services import claim_archive as archive_module
+from app.services.claim_archive import ARCHIVE_LOOKUPS, ArchiveWriter, claim_archive
+from app.services.claim_cache import claim_cache
+from app.services.claim_processor import ClaimProcessor
+from app.services.claim_writer import build_claim_row, insert_claims
+from tests.conftest import AUTH_HEADERS
+
+pytest.importorskip("pyarrow")
+pytestmark = pytest.mark.asyncio
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 1000,
+}
+NOW = datetime(2026, 10, 17, tzinfo=timezone.utc)
+OLD = datetime(2023, 3, 9, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(claim_archive, "directory", tmp_path)
+    return tmp_path
+
+
+async def _store_old_claims(members: list[str], at: datetime = OLD) -> list[dict]:
+    processor = ClaimProcessor()
+    rows = []
+    for member_id in members:
+        claim = {**CLAIM, "member_id": member_id}
+        rows.append(
+            build_claim_row(ClaimRequest(**claim), processor.adjudicate(**claim), at)
+        )
+    async with async_session() as db:
+        await insert_claims(db, rows, check_limits=False)
+        await db.commit()
+    return rows
+
+
+async def _stored() -> int:
+    async with async_session() as db:
+        return await db.scalar(select(func.count()).select_from(Claim))
+
+
+async def test_claim_ids_carry_their_creation_time():
+    claim_id = new_claim_id(OLD)
+    assert claim_id_time(claim_id) == OLD
+    assert claim_id_time("00000000-0000-4000-8000-000000000000") is None
+    # Never archive months whose benefit usage is still rebuilt from claims.
+    assert archive_cutoff(NOW, 24) == datetime(2024, 10, 1, tzinfo=timezone.utc)
+    assert archive_cutoff(NOW, 3) == datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+async def test_old_months_move_to_the_archive(client, archive_dir):
+    old = await _store_old_claims(["M123", "M125", "M123"])
+    resp = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    recent_id = resp.json()["claim_id"]
+    detail = (
+        await client.get(f"/claims/{old[1]['id']}", headers=AUTH_HEADERS)
+    ).json()
+
+    assert await archive(now=NOW) == {"2023-03": 3}
+    assert await _stored() == 1
+    assert [p.name for p in archive_dir.iterdir()] == ["claims-2023-03.parquet"]
+
+    # Totals and pages cover the table only.
+    listed = (await client.get("/claims", headers=AUTH_HEADERS)).json()
+    assert listed["total"] == 1
+    assert [c["claim_id"] for c in listed["items"]] == [recent_id]
+
+    claim_cache.clear()
+    hits = ARCHIVE_LOOKUPS.value("hit")
+    resp = await client.get(f"/claims/{old[1]['id']}", headers=AUTH_HEADERS)
+    assert resp.status_code == 200
+    archived = resp.json()
+    for field in ("created_at", "updated_at"):
+        assert datetime.fromisoformat(archived.pop(field)).replace(
+            tzinfo=None
+        ) == datetime.fromisoformat(detail.pop(field)).replace(tzinfo=None)
+    assert archived == detail
+    assert ARCHIVE_LOOKUPS.value("hit") == hits + 1
+
+    resp = await client.get(f"/claims/{new_claim_id(OLD)}", headers=AUTH_HEADERS)
+    assert resp.status_code == 404
+
+    resp = await client.get("/claims/export", headers=AUTH_HEADERS)
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    # Same created_at, so in id order.
+    assert [line["claim_id"] for line in lines] == sorted(r["id"] for r in old) + [
+        recent_id
+    ]
+    rejected = next(line for line in lines if line["claim_id"] == old[1]["id"])
+    assert rejected["status"] == "REJECTED"
+    assert rejected["rejection_reasons"] == old[1]["rejection_reasons"]
+
+    resp = await client.get(
+        "/claims/export?format=csv&status=rejected&created_to=2024-01-01T00:00:00Z",
+        headers=AUTH_HEADERS,
+    )
+    rows = resp.text.splitlines()
+    assert len(rows) == 2
+    assert rows[1].startswith(old[1]["id"])
+
+    # A second run has nothing left to do; late rows get their own file.
+    assert await archive(now=NOW) == {}
+    late = await _store_old_claims(["M123"])
+    assert await archive(now=NOW) == {"2023-03": 1}
+    assert (archive_dir / "claims-2023-03.1.parquet").exists()
+    resp = await client.get(f"/claims/{late[0]['id']}", headers=AUTH_HEADERS)
+    assert resp.status_code == 200
+
+
+async def test_archive_lookups_are_bounded(client, archive_dir, monkeypatch):
+    old = await _store_old_claims(["M123"])
+    assert await archive(now=NOW) == {"2023-03": 1}
+    reads = []
+    read_table = archive_module.pq.read_table
+
+    def counted(path, **kwargs):
+        reads.append(path)
+        return read_table(path, **kwargs)
+
+    monkeypatch.setattr(archive_module.pq, "read_table", counted)
+    lookups = ARCHIVE_LOOKUPS.value("hit") + ARCHIVE_LOOKUPS.value("miss")
+
+    # Too recent to have been archived: not looked for.
+    resp = await client.get(f"/claims/{new_claim_id()}", headers=AUTH_HEADERS)
+    assert resp.status_code == 404
+    assert ARCHIVE_LOOKUPS.value("hit") + ARCHIVE_LOOKUPS.value("miss") == lookups
+    assert reads == []
+
+    # Any spelling of an archived id.
+    resp = await client.get(f"/claims/{old[0]['id'].upper()}", headers=AUTH_HEADERS)
+    assert resp.status_code == 200
+    assert len(reads) == 1
+
+    # A random id is looked for in every file, once until they change.
+    random_id = str(uuid.uuid4())
+    for _ in range(3):
+        assert await claim_archive.find(random_id) is None
+    assert len(reads) == 2
+    await _store_old_claims(["M123"], at=datetime(2023, 4, 2, tzinfo=timezone.utc))
+    assert await archive(now=NOW) == {"2023-04": 1}
+    assert await claim_archive.find(random_id) is None
+    assert len(reads) == 4
+
+
+async def test_interrupted_runs_are_settled(client, archive_dir, monkeypatch):
+    old = await _store_old_claims(["M123", "M123"])
+
+    # Killed after the delete committed, before the rename.
+    def crash(self):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(ArchiveWriter, "publish", crash)
+    with pytest.raises(KeyboardInterrupt):
+        await archive(now=NOW)
+    monkeypatch.undo()
+    monkeypatch.setattr(claim_archive, "directory", archive_dir)
+    assert await _stored() == 0
+
+    # Killed while writing: the rows are still in the table.
+    await _store_old_claims(["M123"], at=datetime(2023, 4, 2, tzinfo=timezone.utc))
+    (archive_dir / "claims-2023-04.parquet.tmp").write_bytes(b"PAR1")
+
+    assert await archive(now=NOW) == {"2023-04": 1}
+    assert sorted(p.name for p in archive_dir.iterdir()) == [
+        "claims-2023-03.parquet",
+        "claims-2023-04.parquet",
+    ]
+    resp = await client.get(f"/claims/{old[0]['id']}", headers=AUTH_HEADERS)
+    assert resp.status_code == 200
+
+
+async def test_archiving_needs_a_directory_and_pyarrow(monkeypatch, tmp_path):
+    monkeypatch.setattr(claim_archive, "directory", None)
+    with pytest.raises(archive_module.ArchiveUnavailable, match="ARCHIVE_DIR"):
+        await archive(now=NOW)
+    assert await claim_archive.find(new_claim_id(OLD)) is None
+
+    monkeypatch.setattr(claim_archive, "directory", tmp_path)
+    monkeypatch.setattr(archive_module, "pq", None)
+    with pytest.raises(archive_module.ArchiveUnavailable, match="pyarrow"):
+        await archive(now=NOW)
@@ -0,0 +1,44 @@
+import pytest
+
+from app.services.claim_processor import ClaimProcessor
+from benchmarks.compare import compare
+from benchmarks.generator import DEFAULT_MIX, generate_claims
+
+pytestmark = pytest.mark.asyncio
+
+
+def _outcome(result) -> str:
+    if result.status == "REJECTED":
+        return "rejected"
+    if result.fraud_flag:
+        return "fraud"
+    return result.status.lower()
+
+
+async def test_generator_kinds_match_adjudication():
+    processor = ClaimProcessor()
+    generated = list(generate_claims(2000, seed=1))
+
+    assert {kind for kind, _ in generated} == set(DEFAULT_MIX)
+    for kind, claim in generated:
+        assert _outcome(processor.adjudicate(**claim)) == kind, claim
+    assert generated == list(generate_claims(2000, seed=1))
+
+
+async def test_compare_flags_regressions():
+    def run(ops, p99):
+        return {
+            "benchmark": "api",
+            "results": [
+                {"name": "get", "ops_per_sec": ops, "p50_ms": 1.0, "p99_ms": p99}
+            ],
+        }
+
+    rows = compare(run(100, 10), run(95, 10), threshold=10)
+    assert not any(r["regressed"] for r in rows)
+
+    rows = compare(run(100, 10), run(100, 12), threshold=10)
+    assert [r["metric"] for r in rows if r["regressed"]] == ["p99_ms"]
+
+    with pytest.raises(ValueError):
+        compare(run(1, 1), {**run(1, 1), "benchmark": "adjudicate"}, 10)
@@ -0,0 +1,151 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import async_session
+from app.ingest import ingest
+from app.models.benefit_accumulator import BenefitAccumulator
+from app.models.claim import Claim
+from app.services.benefit_accumulators import benefit_ledger, rebuild_accumulators
+from tests.conftest import AUTH_HEADERS
+
+pytestmark = pytest.mark.asyncio
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 30000,
+}
+D001_LIMIT = 40000
+
+
+async def _accumulators():
+    async with async_session() as db:
+        result = await db.execute(
+            select(
+                BenefitAccumulator.member_id,
+                BenefitAccumulator.diagnosis_code,
+                BenefitAccumulator.used_amount,
+            ).order_by(BenefitAccumulator.member_id, BenefitAccumulator.diagnosis_code)
+        )
+        return result.tuples().all()
+
+
+async def _approved_total():
+    async with async_session() as db:
+        amounts = await db.execute(select(Claim.approved_amount))
+        return sum(amounts.scalars())
+
+
+async def test_usage_accumulates_across_claims(client):
+    statuses = []
+    for amount in (30000, 30000, 100):
+        resp = await client.post(
+            "/claims", json={**CLAIM, "claim_amount": amount}, headers=AUTH_HEADERS
+        )
+        body = resp.json()
+        statuses.append((body["status"], body["approved_amount"]))
+
+    assert statuses == [
+        ("APPROVED", 30000),
+        ("PARTIAL", 10000),
+        ("REJECTED", 0),
+    ]
+    assert await _accumulators() == [("M123", "D001", D001_LIMIT)]
+
+
+async def test_batch_items_see_earlier_usage(client):
+    resp = await client.post(
+        "/claims/batch",
+        json=[CLAIM, CLAIM, {**CLAIM, "diagnosis_code": "D002"}],
+        headers=AUTH_HEADERS,
+    )
+    claims = [item["claim"] for item in resp.json()["results"]]
+    assert [c["approved_amount"] for c in claims] == [30000, 10000, 30000]
+    assert await _accumulators() == [
+        ("M123", "D001", D001_LIMIT),
+        ("M123", "D002", 30000),
+    ]
+
+
+async def test_concurrent_submissions_do_not_double_spend(client):
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/claims",
+                json={**CLAIM, "claim_amount": 7000},
+                headers=AUTH_HEADERS,
+            )
+            for _ in range(10)
+        )
+    )
+    assert all(resp.status_code == 201 for resp in responses)
+    assert sum(resp.json()["approved_amount"] for resp in responses) == D001_LIMIT
+    assert await _approved_total() == D001_LIMIT
+    assert benefit_ledger.stats()["reserved"] == 0
+
+
+async def test_limit_spent_elsewhere_is_retried(client):
+    await client.post(
+        "/claims", json={**CLAIM, "claim_amount": 100}, headers=AUTH_HEADERS
+    )
+    # Another process approved more since this one cached the total.
+    async with async_session() as db:
+        await db.execute(update(BenefitAccumulator).values(used_amount=39000))
+        await db.commit()
+
+    resp = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+
+    assert resp.status_code == 201
+    assert resp.json()["status"] == "PARTIAL"
+    assert resp.json()["approved_amount"] == 1000
+    assert await _accumulators() == [("M123", "D001", D001_LIMIT)]
+
+
+async def test_ingest_applies_annual_limits(tmp_path):
+    path = tmp_path / "claims.jsonl"
+    path.write_text("".join(json.dumps(CLAIM) + "\n" for _ in range(3)))
+
+    await ingest(path, chunk_size=2)
+
+    async with async_session() as db:
+        rows = await db.execute(
+            select(Claim.status, Claim.approved_amount, Claim.rejection_reasons)
+        )
+        assert sorted(rows.tuples().all()) == [
+            ("APPROVED", 30000, None),
+            ("PARTIAL", 10000, None),
+            ("REJECTED", 0, ["Annual benefit limit for D001 exhausted"]),
+        ]
+    assert await _accumulators() == [("M123", "D001", D001_LIMIT)]
+
+
+async def test_rebuild_reproduces_accumulators(client):
+    await client.post(
+        "/claims/batch",
+        json=[CLAIM, {**CLAIM, "member_id": "M124", "diagnosis_code": "D003"}],
+        headers=AUTH_HEADERS,
+    )
+    before = await _accumulators()
+    async with async_session() as db:
+        assert await rebuild_accumulators(db) == 2
+        await db.commit()
+    assert await _accumulators() == before
+
+
+async def test_diagnoses_without_a_limit_are_not_capped():
+    row = {
+        "id": "uncovered",
+        "member_id": "M123",
+        "diagnosis_code": "D999",
+        "created_at": datetime.now(timezone.utc),
+        "status": "APPROVED",
+        "approved_amount": 30000.0,
+    }
+    benefit_ledger.apply_limits([row])
+    assert (row["status"], row["approved_amount"]) == ("APPROVED", 30000.0)
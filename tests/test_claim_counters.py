@@ -0,0 +1,82 @@
+import itertools
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import async_session
+from app.models.claim import Claim
+from app.services.claim_counters import count_claims, rebuild_counters
+from tests.conftest import AUTH_HEADERS
+
+pytestmark = pytest.mark.asyncio
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 30000,
+}
+
+FILTERS = list(
+    itertools.product(
+        [None, "M123", "M125"],
+        [None, "APPROVED", "PARTIAL", "REJECTED"],
+        [None, True, False],
+    )
+)
+
+
+async def _seed(client):
+    await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    await client.post(
+        "/claims", json={**CLAIM, "claim_amount": 50000}, headers=AUTH_HEADERS
+    )
+    await client.post(
+        "/claims/batch",
+        json=[
+            {**CLAIM, "member_id": "M126"},
+            {**CLAIM, "member_id": "M125"},
+            {**CLAIM, "member_id": "M125", "claim_amount": 90000},
+            {**CLAIM, "member_id": "M124"},
+        ],
+        headers=AUTH_HEADERS,
+    )
+
+
+async def _count_star(db, member_id, status, fraud_flag):
+    query = select(func.count(Claim.id))
+    if member_id:
+        query = query.where(Claim.member_id == member_id)
+    if status:
+        query = query.where(Claim.status == status)
+    if fraud_flag is not None:
+        query = query.where(Claim.fraud_flag == fraud_flag)
+    return (await db.execute(query)).scalar_one()
+
+
+async def test_counters_match_count_star(client):
+    await _seed(client)
+    async with async_session() as db:
+        for filters in FILTERS:
+            assert await count_claims(db, *filters) == await _count_star(
+                db, *filters
+            ), filters
+
+
+async def test_rebuild_counters_reproduces_totals(client):
+    await _seed(client)
+    async with async_session() as db:
+        before = [await count_claims(db, *filters) for filters in FILTERS]
+        await rebuild_counters(db)
+        await db.commit()
+        after = [await count_claims(db, *filters) for filters in FILTERS]
+    assert before == after
+
+
+async def test_list_total_comes_from_counters(client):
+    await _seed(client)
+    resp = await client.get(
+        "/claims", params={"status": "rejected"}, headers=AUTH_HEADERS
+    )
+    assert resp.json()["total"] == 2
@@ -1,4 +1,15 @@
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
 from app.services.claim_processor import ClaimProcessor
+from app.services.mock_data import (
+    BENEFIT_LIMITS,
+    MEMBERS,
+    PROCEDURE_AVG_COSTS,
+    PROVIDERS,
+)
+from app.services.reference_data import ReferenceDataCache, ReferenceSnapshot
+from app.services.rules import FRAUD_COST_MULTIPLIER
 
 
 processor = ClaimProcessor()
@@ -62,3 +73,108 @@ def test_no_fraud_at_boundary():
     """Exactly 2x average cost should NOT be flagged."""
     result = processor.adjudicate("M123", "H456", "D001", "P001", 40000)
     assert result.fraud_flag is False
+
+
+def test_year_to_date_usage_caps_approval():
+    """D001 limit 40000 with 35000 already used -> 5000 left."""
+    result = processor.adjudicate(
+        "M123", "H456", "D001", "P001", 10000, ytd_used=35000
+    )
+    assert result.status == "PARTIAL"
+    assert result.approved_amount == 5000
+
+
+def test_capped_approval_is_whole_cents():
+    """40000 - 39990.1 is 9.900000000001455 in floats; 9.90 is stored."""
+    result = processor.adjudicate(
+        "M123", "H456", "D001", "P001", 100, ytd_used=39990.1
+    )
+    assert result.status == "PARTIAL"
+    assert result.approved_amount == 9.9
+
+
+def test_exhausted_annual_limit_rejected():
+    result = processor.adjudicate(
+        "M123", "H456", "D001", "P001", 100, ytd_used=40000
+    )
+    assert result.status == "REJECTED"
+    assert result.rejection_reasons == ["Annual benefit limit for D001 exhausted"]
+
+
+# --- Columnar engine (adjudicate_many) ---
+
+MEMBER_CODES = [*MEMBERS, "UNKNOWN"]
+PROVIDER_CODES = [*PROVIDERS, "UNKNOWN"]
+DIAGNOSIS_CODES = [*BENEFIT_LIMITS, "D999"]
+PROCEDURE_CODES = [*PROCEDURE_AVG_COSTS, "P999"]
+BOUNDARY_AMOUNTS = sorted(
+    {*BENEFIT_LIMITS.values()}
+    | {avg * FRAUD_COST_MULTIPLIER for avg in PROCEDURE_AVG_COSTS.values()}
+)
+
+claim_rows = st.tuples(
+    st.sampled_from(MEMBER_CODES),
+    st.sampled_from(PROVIDER_CODES),
+    st.sampled_from(DIAGNOSIS_CODES),
+    st.sampled_from(PROCEDURE_CODES),
+    st.one_of(
+        st.floats(min_value=0.01, max_value=250_000, allow_nan=False),
+        st.integers(min_value=1, max_value=250_000),
+        st.sampled_from(BOUNDARY_AMOUNTS),
+    ),
+)
+
+
+def _to_columns(rows):
+    if not rows:
+        return [[], [], [], [], []]
+    return [list(column) for column in zip(*rows)]
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(claim_rows, max_size=50))
+def test_adjudicate_many_matches_scalar(rows):
+    columns = processor.adjudicate_many(*_to_columns(rows))
+    assert len(columns) == len(rows)
+    for i, row in enumerate(rows):
+        expected = processor.adjudicate(*row)
+        assert columns.status[i] == expected.status
+        assert columns.approved_amount[i] == expected.approved_amount
+        assert bool(columns.fraud_flag[i]) is expected.fraud_flag
+        assert columns.reasons(i) == expected.rejection_reasons
+
+
+def test_adjudicate_many_reports_all_rejection_reasons():
+    columns = processor.adjudicate_many(
+        ["M125"], ["UNKNOWN"], ["D999"], ["P999"], [10_000]
+    )
+    assert columns.status.tolist() == ["REJECTED"]
+    assert columns.approved_amount.tolist() == [0.0]
+    assert columns.reasons(0) == [
+        "Member M125 is not eligible (status: inactive)",
+        "Unknown provider: UNKNOWN",
+        "No benefit coverage for diagnosis: D999",
+        "Unknown procedure code: P999",
+    ]
+
+
+def test_adjudicate_many_rejects_zero_benefit_limit():
+    seed = ReferenceSnapshot.from_mock_data()
+    snapshot = ReferenceSnapshot.build(
+        1,
+        dict(seed.member_status),
+        seed.providers,
+        {**seed.benefit_limits, "D001": 0.0},
+        dict(seed.procedure_avg_costs),
+    )
+    zero_limit = ClaimProcessor(reference=ReferenceDataCache(snapshot))
+    row = ("M123", "H456", "D001", "P001", 100)
+
+    expected = zero_limit.adjudicate(*row)
+    columns = zero_limit.adjudicate_many(*_to_columns([row]))
+    assert expected.status == "REJECTED"
+    assert columns.status.tolist() == [expected.status]
+    assert columns.approved_amount.tolist() == [expected.approved_amount] == [0.0]
+    assert columns.reasons(0) == expected.rejection_reasons == [
+        "Annual benefit limit for D001 exhausted"
+    ]
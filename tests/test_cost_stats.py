@@ -0,0 +1,132 @@
+import random
+import statistics
+
+import pytest
+from sqlalchemy import select
+
+from app.database import async_session
+from app.models.cost_stat import CostStat
+from app.services.claim_processor import ClaimProcessor
+from app.services.cost_stats import (
+    SKETCH_ACCURACY,
+    CostStats,
+    CostStatsTracker,
+    build_thresholds,
+)
+from tests.conftest import AUTH_HEADERS
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D004",
+    "procedure_code": "P001",
+    "claim_amount": 1000,
+}
+
+
+def _tracker(rule="zscore", min_samples=30):
+    return CostStatsTracker(
+        async_session, rule=rule, zscore=3.0, quantile=0.99, min_samples=min_samples
+    )
+
+
+def test_running_stats_match_exact_values():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(9, 0.5) for _ in range(5000)]
+    stats = CostStats()
+    for value in values:
+        stats.add(value)
+
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+    exact_p99 = sorted(values)[int(0.99 * (len(values) - 1))]
+    assert stats.quantile(0.99) == pytest.approx(exact_p99, rel=SKETCH_ACCURACY)
+
+
+def test_merge_equals_adding_everything():
+    values = [float(v) for v in range(1, 1001)]
+    left, right, both = CostStats(), CostStats(), CostStats()
+    for i, value in enumerate(values):
+        (left if i % 3 else right).add(value)
+        both.add(value)
+    left.merge(right)
+
+    assert left.count == both.count
+    assert left.mean == pytest.approx(both.mean)
+    assert left.m2 == pytest.approx(both.m2)
+    assert left.buckets == both.buckets
+
+
+def test_thresholds_need_enough_samples():
+    stats = {("H456", "P001"): CostStats(), ("", "P001"): CostStats()}
+    for value in (90, 100, 110):
+        stats[("H456", "P001")].add(value)
+    for _ in range(10):
+        stats[("", "P001")].add(100)
+
+    assert build_thresholds(stats, "static", 3, 0.99, 1) == {}
+    thresholds = build_thresholds(stats, "zscore", 3, 0.99, 5)
+    assert thresholds == {("", "P001"): 100}
+
+
+async def test_flushes_from_several_processes_add_up():
+    first, second = _tracker(), _tracker()
+    for value in (100, 200):
+        first.record("H456", "P001", value)
+    second.record("H457", "P001", 300)
+    second.record("H999", "P999", 1)  # unknown codes are not tracked
+
+    assert await first.flush() == 2
+    assert await second.flush() == 2
+    assert await second.flush() == 0
+
+    async with async_session() as db:
+        rows = {
+            (row.provider_id, row.procedure_code): row
+            for row in (await db.execute(select(CostStat))).scalars()
+        }
+    assert set(rows) == {("", "P001"), ("H456", "P001"), ("H457", "P001")}
+    overall = rows[("", "P001")]
+    assert overall.count == 3
+    assert overall.mean == pytest.approx(200)
+    assert CostStats.from_row(overall).variance == pytest.approx(10000)
+
+
+async def test_zscore_rule_flags_outliers_for_the_provider():
+    tracker = _tracker(min_samples=30)
+    rng = random.Random(1)
+    for _ in range(200):
+        tracker.record("H456", "P001", rng.gauss(1000, 50))
+    await tracker.flush()
+    await tracker.load()
+    processor = ClaimProcessor(costs=tracker)
+
+    # The static rule (2x the 20000 average) would not flag 5000.
+    assert processor.adjudicate("M123", "H456", "D004", "P001", 5000).fraud_flag
+    assert not processor.adjudicate("M123", "H456", "D004", "P001", 1050).fraud_flag
+    # Too few samples for P002: static rule.
+    assert not processor.adjudicate("M123", "H456", "D004", "P002", 5000).fraud_flag
+    columns = processor.adjudicate_many(
+        ["M123"] * 3, ["H456"] * 3, ["D004"] * 3, ["P001", "P001", "P002"],
+        [5000, 1050, 5000],
+    )
+    assert columns.fraud_flag.tolist() == [True, False, False]
+
+
+async def test_submitted_claims_are_recorded(client, monkeypatch):
+    tracker = _tracker()
+    monkeypatch.setattr("app.api.claims.cost_stats", tracker)
+    await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    await client.post(
+        "/claims/batch",
+        json=[{**CLAIM, "claim_amount": 3000}, {**CLAIM, "provider_id": "H457"}],
+        headers=AUTH_HEADERS,
+    )
+    await tracker.flush()
+
+    async with async_session() as db:
+        overall = await db.get(CostStat, ("", "P001"))
+        assert overall.count == 3
+        assert overall.mean == pytest.approx(5000 / 3)
+        assert (await db.get(CostStat, ("H456", "P001"))).count == 2
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import Settings
+from app.database import create_engine, engine_options
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_tuned_sqlite_profile_applies_pragmas(tmp_path):
+    config = Settings(
+        database_url=f"sqlite+aiosqlite:///{tmp_path}/tuned.db",
+        database_profile="tuned",
+        sqlite_busy_timeout_ms=1234,
+    )
+    engine = create_engine(config)
+    try:
+        assert isinstance(engine.sync_engine.pool, AsyncAdaptedQueuePool)
+        async with engine.connect() as conn:
+            pragmas = {
+                name: (await conn.exec_driver_sql(f"PRAGMA {name}")).scalar()
+                for name in ("journal_mode", "synchronous", "busy_timeout")
+            }
+    finally:
+        await engine.dispose()
+
+    # synchronous: 1 == NORMAL
+    assert pragmas == {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 1234}
+
+
+async def test_default_profile_keeps_sqlalchemy_defaults(tmp_path):
+    config = Settings(
+        database_url=f"sqlite+aiosqlite:///{tmp_path}/plain.db",
+        database_profile="default",
+    )
+    assert engine_options(config) == {}
+
+    engine = create_engine(config)
+    try:
+        async with engine.connect() as conn:
+            mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+    finally:
+        await engine.dispose()
+    assert mode == "delete"
+
+
+async def test_tuned_postgres_profile_sizes_pool():
+    config = Settings(
+        database_url="postgresql+asyncpg://u:p@localhost/claims",
+        database_profile="tuned",
+        db_pool_size=7,
+    )
+    options = engine_options(config)
+    assert options["pool_size"] == 7
+    assert options["pool_pre_ping"] is True
+    assert "poolclass" not in options
+    connect_args = options["connect_args"]
+    assert connect_args["prepared_statement_cache_size"] == 500
+    assert connect_args["server_settings"]["jit"] == "off"
@@ -0,0 +1,120 @@
+import json
+import uuid
+
+from sqlalchemy import func, select
+
+from app.database import async_session
+from app.ingest import ingest
+from app.models.claim import Claim
+from app.services.duplicates import BloomFilter, duplicate_filter
+from tests.conftest import AUTH_HEADERS
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D004",
+    "procedure_code": "P001",
+    "claim_amount": 1000,
+    "service_date": "2026-03-14",
+}
+
+
+async def _stored_count():
+    async with async_session() as db:
+        return (await db.execute(select(func.count(Claim.id)))).scalar_one()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    added = [uuid.uuid4().hex for _ in range(10_000)]
+    for fingerprint in added:
+        bloom.add(fingerprint)
+
+    assert all(fingerprint in bloom for fingerprint in added)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10_000))
+    assert false_positives < 200
+
+
+async def test_resubmission_returns_the_original(client):
+    first = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    second = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+
+    assert first.status_code == 201
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert await _stored_count() == 1
+
+    detail = await client.get(
+        f"/claims/{first.json()['claim_id']}", headers=AUTH_HEADERS
+    )
+    assert detail.json()["service_date"] == "2026-03-14"
+
+
+async def test_fingerprint_needs_a_service_date(client):
+    other_day = {**CLAIM, "service_date": "2026-03-15"}
+    no_date = {k: v for k, v in CLAIM.items() if k != "service_date"}
+    for payload in (CLAIM, other_day, no_date, no_date):
+        resp = await client.post("/claims", json=payload, headers=AUTH_HEADERS)
+        assert resp.status_code == 201
+    assert await _stored_count() == 4
+
+
+async def test_new_claims_skip_the_index_probe(client):
+    for amount in range(1, 6):
+        await client.post(
+            "/claims", json={**CLAIM, "claim_amount": amount}, headers=AUTH_HEADERS
+        )
+    stats = (await client.get("/stats/cache")).json()["duplicates"]
+    assert stats["skipped"] == 5
+    assert stats["fingerprints"] == 5
+
+
+async def test_duplicate_missing_from_filter_is_caught_by_index(client):
+    first = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    # As if another process had stored it.
+    duplicate_filter.clear()
+
+    resp = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+
+    assert resp.status_code == 200
+    assert resp.json()["claim_id"] == first.json()["claim_id"]
+    assert await _stored_count() == 1
+
+
+async def test_batch_marks_duplicates(client):
+    stored = (await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)).json()
+    new = {**CLAIM, "claim_amount": 2000}
+
+    resp = await client.post(
+        "/claims/batch", json=[CLAIM, new, new], headers=AUTH_HEADERS
+    )
+
+    data = resp.json()
+    assert (data["created"], data["failed"], data["duplicates"]) == (1, 0, 2)
+    results = data["results"]
+    assert [r["duplicate"] for r in results] == [True, False, True]
+    assert results[0]["claim"] == stored
+    assert results[2]["claim"] == results[1]["claim"]
+    assert await _stored_count() == 2
+
+
+async def test_rebuild_loads_stored_fingerprints(client):
+    await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    duplicate_filter.clear()
+
+    assert await duplicate_filter.rebuild() == 1
+    async with async_session() as db:
+        fingerprint = (await db.execute(select(Claim.fingerprint))).scalar_one()
+    assert duplicate_filter.might_exist(fingerprint)
+
+
+async def test_ingest_skips_duplicates(client, tmp_path):
+    await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    new = {**CLAIM, "claim_amount": 2000}
+    path = tmp_path / "claims.jsonl"
+    path.write_text("".join(json.dumps(c) + "\n" for c in (CLAIM, new, new)))
+
+    checkpoint = await ingest(path, chunk_size=2)
+
+    assert checkpoint.inserted == 1
+    assert await _stored_count() == 2
@@ -0,0 +1,120 @@
+import csv
+import json
+import pickle
+
+import pytest
+from sqlalchemy import func, select
+
+from app import ingest as ingest_module
+from app.database import async_session
+from app.ingest import ingest
+from app.models.claim import Claim
+from app.services.claim_counters import count_claims
+from app.services.reference_data import ReferenceSnapshot
+
+pytestmark = pytest.mark.asyncio
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 30000,
+}
+
+
+def _claims(n):
+    return [{**CLAIM, "claim_amount": 1000 + i} for i in range(n)]
+
+
+def _write_jsonl(path, records):
+    path.write_text("".join(f"{json.dumps(r)}\n" for r in records))
+    return path
+
+
+async def _stored_amounts():
+    async with async_session() as db:
+        return (
+            await db.execute(select(Claim.claim_amount).order_by(Claim.claim_amount))
+        ).scalars().all()
+
+
+async def test_ingest_jsonl_skips_invalid_records(tmp_path):
+    path = tmp_path / "claims.jsonl"
+    path.write_text(
+        json.dumps(CLAIM)
+        + "\n\n"
+        + "not json\n"
+        + json.dumps({**CLAIM, "claim_amount": -5})
+        + "\n"
+        + json.dumps({**CLAIM, "member_id": "M999"})
+        + "\n"
+    )
+    rejects = tmp_path / "rejects.jsonl"
+
+    checkpoint = await ingest(path, chunk_size=2, rejects=rejects)
+
+    assert checkpoint.records_done == 4
+    assert checkpoint.inserted == 2
+    assert checkpoint.invalid == 2
+    rejected = [json.loads(line) for line in rejects.read_text().splitlines()]
+    assert [r["record"] for r in rejected] == [2, 3]
+    async with async_session() as db:
+        assert await count_claims(db, None, "REJECTED", None) == 1
+        assert await count_claims(db, None, None, None) == 2
+
+
+async def test_ingest_csv(tmp_path):
+    path = tmp_path / "claims.csv"
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(CLAIM))
+        writer.writeheader()
+        writer.writerows(_claims(5))
+
+    checkpoint = await ingest(path, chunk_size=2)
+
+    assert checkpoint.inserted == 5
+    assert await _stored_amounts() == [1000, 1001, 1002, 1003, 1004]
+
+
+async def test_ingest_resumes_without_duplicates(tmp_path, monkeypatch):
+    path = _write_jsonl(tmp_path / "claims.jsonl", _claims(7))
+    real_insert = ingest_module.insert_claims
+    calls = 0
+
+    async def failing_insert(db, rows):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise RuntimeError("crash")
+        await real_insert(db, rows)
+
+    monkeypatch.setattr(ingest_module, "insert_claims", failing_insert)
+    with pytest.raises(RuntimeError):
+        await ingest(path, chunk_size=2)
+    assert len(await _stored_amounts()) == 4
+
+    monkeypatch.setattr(ingest_module, "insert_claims", real_insert)
+    checkpoint = await ingest(path, chunk_size=2)
+
+    assert checkpoint.records_done == 7
+    assert await _stored_amounts() == [1000 + i for i in range(7)]
+    # A finished job is a no-op when run again.
+    await ingest(path, chunk_size=2)
+    assert len(await _stored_amounts()) == 7
+
+
+async def test_ingest_with_process_pool(tmp_path):
+    path = _write_jsonl(tmp_path / "claims.jsonl", _claims(9))
+
+    checkpoint = await ingest(path, chunk_size=2, workers=2)
+
+    assert checkpoint.inserted == 9
+    async with async_session() as db:
+        assert (await db.execute(select(func.count(Claim.id)))).scalar_one() == 9
+
+
+async def test_snapshot_pickles():
+    snapshot = ReferenceSnapshot.from_mock_data()
+    restored = pickle.loads(pickle.dumps(snapshot))
+    assert restored == snapshot
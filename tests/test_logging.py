@@ -0,0 +1,108 @@
+import io
+import json
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+import pytest
+
+from app.config import Settings
+from app.logging_config import _QueueHandler, configure_logging, make_formatter
+from app.services import claim_processor
+from app.services.claim_processor import ClaimProcessor
+
+
+@pytest.fixture
+def json_logger():
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(make_formatter("json"))
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, output)
+    logger = logging.getLogger("tests.json")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = _QueueHandler(records)
+    logger.addHandler(handler)
+    listener.start()
+
+    def lines() -> list[dict]:
+        listener.stop()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield logger, lines
+    logger.removeHandler(handler)
+
+
+def test_json_lines_through_the_queue(json_logger):
+    logger, lines = json_logger
+    logger.info("Claim %s stored", "C1", extra={"member_id": "M123"})
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Write failed")
+
+    stored, failed = lines()
+    assert stored["message"] == "Claim C1 stored"
+    assert stored["level"] == "INFO"
+    assert stored["logger"] == "tests.json"
+    assert stored["member_id"] == "M123"
+    assert "time" in stored
+    assert failed["level"] == "ERROR"
+    assert "ZeroDivisionError" in failed["exc_info"]
+
+
+def test_tracebacks_are_formatted_off_the_calling_thread(json_logger, monkeypatch):
+    logger, lines = json_logger
+    threads = []
+    format_exception = logging.Formatter.formatException
+
+    def record_thread(self, exc_info):
+        threads.append(threading.current_thread())
+        return format_exception(self, exc_info)
+
+    monkeypatch.setattr(logging.Formatter, "formatException", record_thread)
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Write failed")
+
+    (failed,) = lines()
+    assert "ZeroDivisionError" in failed["exc_info"]
+    assert threads and threading.current_thread() not in threads
+
+
+def test_configure_logging_installs_one_queue_handler():
+    try:
+        configure_logging(Settings(log_format="json", log_level="WARNING"))
+        root = logging.getLogger()
+        assert [type(h) for h in root.handlers] == [_QueueHandler]
+        assert isinstance(root.handlers[0], QueueHandler)
+        assert root.level == logging.WARNING
+
+        with pytest.raises(ValueError):
+            configure_logging(Settings(log_format="xml"))
+    finally:
+        configure_logging()
+
+
+def test_sampling_keeps_rejections_and_fraud(caplog, monkeypatch):
+    monkeypatch.setattr(claim_processor, "LOG_SAMPLE_RATE", 0.0)
+    processor = ClaimProcessor()
+    with caplog.at_level(logging.INFO, logger=claim_processor.__name__):
+        processor.adjudicate("M123", "H456", "D001", "P001", 1000)
+        processor.adjudicate("M125", "H456", "D001", "P001", 1000)
+        processor.adjudicate("M123", "H456", "D002", "P001", 45000)
+
+    # Loading the rules logs too when this runs first.
+    records = [r for r in caplog.records if r.name == claim_processor.__name__]
+    logged = [(r.status, r.fraud_flag) for r in records]
+    assert logged == [("REJECTED", False), ("APPROVED", True)]
+    assert records[0].rejection_reasons
+
+    monkeypatch.setattr(claim_processor, "LOG_SAMPLE_RATE", 1.0)
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger=claim_processor.__name__):
+        processor.adjudicate("M123", "H456", "D001", "P001", 1000)
+    assert [r.status for r in caplog.records] == ["APPROVED"]
@@ -0,0 +1,80 @@
+import pytest
+
+from app.metrics import (
+    ADJUDICATION_RULE_SECONDS,
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_STATEMENT_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    Histogram,
+)
+from tests.conftest import AUTH_HEADERS
+
+pytestmark = pytest.mark.asyncio
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 30000,
+}
+RULES = ("member_eligibility", "provider", "benefit_limit", "fraud")
+
+
+async def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", ("kind",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.1, "a")
+    histogram.observe(3, "a")
+
+    assert histogram.render() == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{kind="a",le="0.1"} 2',
+        'demo_seconds_bucket{kind="a",le="1.0"} 2',
+        'demo_seconds_bucket{kind="a",le="+Inf"} 3',
+        'demo_seconds_sum{kind="a"} 3.15',
+        'demo_seconds_count{kind="a"} 3',
+    ]
+
+
+async def test_requests_rules_and_sql_are_recorded(client):
+    get_before = HTTP_REQUEST_SECONDS.count("GET", "/claims/{claim_id}", 200)
+    rules_before = [ADJUDICATION_RULE_SECONDS.count(rule) for rule in RULES]
+    inserts_before = DB_STATEMENT_SECONDS.count("INSERT")
+    checkouts_before = DB_POOL_CHECKOUT_SECONDS.count()
+
+    resp = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    claim_id = resp.json()["claim_id"]
+    await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)
+    await client.get("/no-such-route")
+
+    assert HTTP_REQUEST_SECONDS.count("GET", "/claims/{claim_id}", 200) == (
+        get_before + 1
+    )
+    assert HTTP_REQUEST_SECONDS.count("GET", "unmatched", 404) >= 1
+    assert [ADJUDICATION_RULE_SECONDS.count(rule) for rule in RULES] == [
+        n + 1 for n in rules_before
+    ]
+    # The claim row, its counter upsert and its accumulator upsert.
+    assert DB_STATEMENT_SECONDS.count("INSERT") == inserts_before + 3
+    assert DB_POOL_CHECKOUT_SECONDS.count() > checkouts_before
+
+
+async def test_metrics_endpoint_exposition(client):
+    await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+
+    resp = await client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = resp.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert (
+        'http_request_duration_seconds_count{method="POST",route="/claims",'
+        'status="201"}'
+    ) in body
+    assert 'adjudication_rule_duration_seconds_count{rule="fraud"}' in body
+    assert 'db_statement_duration_seconds_count{statement="INSERT"}' in body
+    assert "db_pool_checkout_duration_seconds_count" in body
+    assert "claim_cache_hits_total" in body
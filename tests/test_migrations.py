@@ -0,0 +1,90 @@
+"""The migrations build the schema the models declare.
+
+Runs ``alembic upgrade head`` on an empty database, then ``alembic
+check``, which fails if autogenerate would emit anything: a column,
+index or constraint that differs between the models and the migrations.
+PostgreSQL is only checked when ``TEST_POSTGRES_URL`` points at a
+throwaway database; its ``public`` schema is dropped and recreated.
+"""
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from tests.conftest import reset_postgres, run_module
+
+pytestmark = pytest.mark.asyncio
+needs_postgres = pytest.mark.skipif(
+    not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set"
+)
+
+
+def _upgrade_and_check(url: str) -> None:
+    upgrade = run_module("alembic", url, "upgrade", "head")
+    assert upgrade.returncode == 0, upgrade.stderr
+
+    check = run_module("alembic", url, "check")
+    assert check.returncode == 0, check.stderr
+
+
+async def test_sqlite_migrations_match_models(tmp_path):
+    _upgrade_and_check(f"sqlite+aiosqlite:///{tmp_path / 'claims.db'}")
+
+
+@needs_postgres
+async def test_postgres_migrations_match_models():
+    url = os.environ["TEST_POSTGRES_URL"]
+    await reset_postgres(url)
+    _upgrade_and_check(url)
+
+
+@needs_postgres
+async def test_postgres_partitioning_keeps_existing_claims():
+    url = os.environ["TEST_POSTGRES_URL"]
+    await reset_postgres(url)
+    # The last revision before claims is partitioned.
+    upgrade = run_module("alembic", url, "upgrade", "b5e8d3c7a912")
+    assert upgrade.returncode == 0, upgrade.stderr
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    created = {
+        str(uuid.uuid4()): at
+        for at in (
+            datetime(2024, 1, 31, 23, 59, 59),
+            datetime(2024, 2, 1),
+            datetime(2025, 7, 15, 8, 30),
+            now,
+        )
+    }
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "INSERT INTO claims (id, member_id, provider_id, "
+                    "diagnosis_code, procedure_code, claim_amount, status, "
+                    "fraud_flag, approved_amount, created_at, updated_at) "
+                    "VALUES (CAST(:id AS uuid), 'M123', 'H456', 'D001', 'P001', "
+                    "100000, 1, false, 100000, :at, :at)"
+                ),
+                [{"id": claim_id, "at": at} for claim_id, at in created.items()],
+            )
+
+        upgrade = run_module("alembic", url, "upgrade", "head")
+        assert upgrade.returncode == 0, upgrade.stderr
+
+        async with engine.connect() as conn:
+            stored = (
+                await conn.execute(
+                    text("SELECT id::text, tableoid::regclass::text FROM claims")
+                )
+            ).all()
+    finally:
+        await engine.dispose()
+    assert dict(stored) == {
+        claim_id: f"claims_{at:%Y_%m}" for claim_id, at in created.items()
+    }
@@ -0,0 +1,160 @@
+"""PostgreSQL-only behaviour: the tuned engine profile, COPY writes and
+monthly partitions.
+
+Skipped unless ``TEST_POSTGRES_URL`` points at a throwaway database
+(``postgresql+asyncpg://...``); the tables there are dropped and
+recreated.
+"""
+
+import os
+import re
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.claims import _detail_query
+from app.config import Settings
+from app.database import Base, create_engine
+from app.models.claim import Claim
+from app.schemas.claim import ClaimRequest
+from app.services.claim_archive import ClaimArchive
+from app.services.claim_counters import count_claims
+from app.services.claim_partitions import (
+    create_partition,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+from app.services.claim_processor import ClaimProcessor
+from app.services.claim_writer import build_claim_row, insert_claims
+from tests.conftest import reset_postgres, run_module
+
+pytestmark = [
+    pytest.mark.asyncio,
+    pytest.mark.skipif(
+        not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set"
+    ),
+]
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 30000,
+}
+OLD = datetime(2023, 3, 9, 12, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def pg_engine():
+    engine = create_engine(
+        Settings(
+            database_url=os.environ["TEST_POSTGRES_URL"],
+            database_profile="tuned",
+        )
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+def _rows(n, at=None):
+    processor = ClaimProcessor()
+    payload = ClaimRequest(**CLAIM)
+    return [
+        build_claim_row(payload, processor.adjudicate(**CLAIM), at) for _ in range(n)
+    ]
+
+
+async def test_tuned_profile_disables_jit(pg_engine):
+    async with pg_engine.connect() as conn:
+        assert (await conn.exec_driver_sql("SHOW jit")).scalar() == "off"
+
+
+async def test_large_batches_use_copy(pg_engine, monkeypatch):
+    monkeypatch.setattr("app.services.claim_writer.settings.pg_copy_threshold", 100)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[:3])
+
+    event.listen(pg_engine.sync_engine, "before_cursor_execute", record)
+    session = async_sessionmaker(pg_engine, expire_on_commit=False)
+    try:
+        async with session() as db:
+            await insert_claims(db, _rows(150), check_limits=False)
+            await insert_claims(db, _rows(5), check_limits=False)
+            await db.commit()
+    finally:
+        event.remove(pg_engine.sync_engine, "before_cursor_execute", record)
+
+    claim_inserts = [s for s in statements if s[:3] == ["INSERT", "INTO", "claims"]]
+    # Only the small batch went through INSERT; the large one was COPYed.
+    assert len(claim_inserts) == 1
+    async with session() as db:
+        assert (await db.execute(select(func.count(Claim.id)))).scalar_one() == 155
+        assert await count_claims(db, "M123", None, None) == 155
+
+
+async def _count(db, table: str) -> int:
+    return await db.scalar(text(f"SELECT count(*) FROM {table}"))
+
+
+async def test_months_are_partitioned_and_archived(tmp_path):
+    pytest.importorskip("pyarrow")
+    url = os.environ["TEST_POSTGRES_URL"]
+    await reset_postgres(url)
+    migrated = run_module("alembic", url, "upgrade", "head")
+    assert migrated.returncode == 0, migrated.stderr
+
+    engine = create_async_engine(url)
+    session = async_sessionmaker(engine, expire_on_commit=False)
+    old, recent = _rows(3, OLD), _rows(1)
+    try:
+        async with session() as db:
+            await insert_claims(db, old + recent, check_limits=False)
+            await db.commit()
+            # Stored while their month had no partition.
+            assert await _count(db, "claims_default") == 3
+
+            await create_partition(db, month_start(OLD))
+            await db.commit()
+            assert month_start(OLD) in await list_partitions(db)
+            assert await _count(db, partition_name(OLD)) == 3
+            assert await _count(db, "claims_default") == 0
+
+            # A lookup by id reads only the claim's month.
+            query = _detail_query(recent[0]["id"]).compile(
+                dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+            )
+            plan = "\n".join((await db.execute(text(f"EXPLAIN {query}"))).scalars())
+            scanned = set(re.findall(r" on (claims_\w+)", plan))
+            assert scanned == {partition_name(recent[0]["created_at"])}, plan
+
+        archived = run_module("app.archive", url, ARCHIVE_DIR=str(tmp_path))
+        assert archived.returncode == 0, archived.stderr
+
+        async with session() as db:
+            assert month_start(OLD) not in await list_partitions(db)
+            assert await _count(db, "claims") == 1
+            assert await count_claims(db, "M123", None, None) == 1
+    finally:
+        await engine.dispose()
+
+    archive = ClaimArchive(str(tmp_path))
+    assert [p.name for p in archive.files()] == ["claims-2023-03.parquet"]
+    row = await archive.find(old[1]["id"])
+    assert row["id"] == old[1]["id"]
+    assert row["created_at"] == OLD
+    assert (row["status"], row["approved_amount"]) == (
+        old[1]["status"],
+        old[1]["approved_amount"],
+    )
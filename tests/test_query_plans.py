@@ -0,0 +1,86 @@
+"""Query-plan regression tests for the GET /claims filter shapes.
+
+Each shape the endpoint offers must be answered from an index that also
+provides the (created_at, id) ordering, so neither page nor cursor mode
+falls back to a full scan plus sort. PostgreSQL plans are only checked
+when ``TEST_POSTGRES_URL`` points at a throwaway database.
+"""
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.api.claims import _list_query
+from app.database import Base, engine
+
+pytestmark = pytest.mark.asyncio
+
+CURSOR = (datetime(2026, 1, 1, tzinfo=timezone.utc), str(uuid.UUID(int=0)))
+
+# (member_id, status, fraud_flag) -> index that must serve the query
+SHAPES = [
+    ((None, None, None), "ix_claims_created_at_id"),
+    (("M123", None, None), "ix_claims_member_id_created_at"),
+    ((None, "REJECTED", None), "ix_claims_status_created_at"),
+    ((None, None, True), "ix_claims_fraud_created_at"),
+]
+
+
+def _explain_sql(conn_engine, filters, after):
+    query = _list_query(*filters, after=after).limit(21)
+    return str(
+        query.compile(
+            dialect=conn_engine.dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+
+@pytest.mark.parametrize("after", [None, CURSOR], ids=["page", "cursor"])
+@pytest.mark.parametrize("filters,index_name", SHAPES)
+async def test_sqlite_list_plans_use_index(filters, index_name, after):
+    sql = _explain_sql(engine, filters, after)
+    async with engine.connect() as conn:
+        rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")).all()
+    plan = " | ".join(row[-1] for row in rows)
+
+    assert f"USING INDEX {index_name}" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_POSTGRES_URL"),
+    reason="TEST_POSTGRES_URL not set",
+)
+@pytest.mark.parametrize("after", [None, CURSOR], ids=["page", "cursor"])
+@pytest.mark.parametrize("filters,index_name", SHAPES)
+async def test_postgres_list_plans_use_index(filters, index_name, after):
+    pg_engine = create_async_engine(os.environ["TEST_POSTGRES_URL"])
+    try:
+        async with pg_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+            # An empty table would otherwise always be seq-scanned (or
+            # bitmap-scanned and sorted); this checks that an index
+            # providing the order exists, not the cost model.
+            await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            await conn.exec_driver_sql("SET LOCAL enable_bitmapscan = off")
+            sql = _explain_sql(pg_engine, filters, after)
+            rows = (await conn.exec_driver_sql(f"EXPLAIN {sql}")).all()
+            plan = " | ".join(row[0] for row in rows)
+            # claims is partitioned: plans name each partition's index.
+            partition_indexes = await conn.exec_driver_sql(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                f"WHERE i.inhparent = '{index_name}'::regclass"
+            )
+            names = [index_name, *partition_indexes.scalars()]
+            await conn.run_sync(Base.metadata.drop_all)
+    finally:
+        await pg_engine.dispose()
+
+    assert any(f"using {name} on" in plan for name in names), plan
+    assert "Sort" not in plan, plan
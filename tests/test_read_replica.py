@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import database
+from app.auth import api_clients, parse_api_keys
+from app.config import Settings
+from app.database import Base, ReadPins, async_session, read_pins
+from app.models.claim import Claim
+from app.services.claim_cache import claim_cache
+from tests.conftest import AUTH_HEADERS
+
+pytestmark = pytest.mark.asyncio
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 1000,
+}
+OTHER_HEADERS = {"X-API-Key": "other-key"}
+
+
+@pytest_asyncio.fixture
+async def replica(tmp_path, monkeypatch):
+    """A second SQLite file standing in for a replica that has not caught up."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(
+        database, "read_session", async_sessionmaker(engine, expire_on_commit=False)
+    )
+    clients = parse_api_keys(Settings(api_key="", api_keys="other:other-key"))
+    api_clients.update(clients)
+    read_pins.clear()
+    yield database.read_session
+    read_pins.clear()
+    for key in clients:
+        del api_clients[key]
+    await engine.dispose()
+
+
+async def _listed(client, headers) -> int:
+    resp = await client.get("/claims", headers=headers)
+    return len(resp.json()["items"])
+
+
+async def test_writer_reads_its_own_writes(client, replica):
+    resp = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    claim_id = resp.json()["claim_id"]
+
+    # Pinned to the primary after the write.
+    assert await _listed(client, AUTH_HEADERS) == 1
+    resp = await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)
+    assert resp.status_code == 200
+    resp = await client.get("/claims/export", headers=AUTH_HEADERS)
+    assert len(resp.text.splitlines()) == 1
+
+    # Other clients read the replica, which has not seen the claim yet.
+    assert await _listed(client, OTHER_HEADERS) == 0
+    resp = await client.get("/claims/export", headers=OTHER_HEADERS)
+    assert resp.text == ""
+
+
+async def test_reads_return_to_the_replica_when_the_pin_expires(client, replica):
+    await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    read_pins.clear()
+    assert await _listed(client, AUTH_HEADERS) == 0
+
+
+async def test_replica_reads_are_not_cached(client, replica):
+    resp = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    claim_id = resp.json()["claim_id"]
+    # The replica has the claim, but not yet its adjudication.
+    async with async_session() as db:
+        row = (await db.execute(select(*Claim.__table__.columns))).one()._asdict()
+    async with replica() as db:
+        await db.execute(insert(Claim), [{**row, "status": "PENDING"}])
+        await db.commit()
+
+    resp = await client.get(f"/claims/{claim_id}", headers=OTHER_HEADERS)
+    assert resp.json()["status"] == "PENDING"
+    assert claim_cache.stats()["size"] == 0
+
+    # Primary reads are cached, and then served to every client.
+    resp = await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)
+    assert resp.json()["status"] == "APPROVED"
+    assert claim_cache.stats()["size"] == 1
+    resp = await client.get(f"/claims/{claim_id}", headers=OTHER_HEADERS)
+    assert resp.json()["status"] == "APPROVED"
+
+
+async def test_read_pins_expire():
+    pins = ReadPins(window=0.05)
+    pins.pin("a")
+    pins.pin(None)
+    assert pins.pinned("a")
+    assert not pins.pinned("b")
+    assert not pins.pinned(None)
+    await asyncio.sleep(0.06)
+    assert not pins.pinned("a")
+
+    disabled = ReadPins(window=0)
+    disabled.pin("a")
+    assert not disabled.pinned("a")
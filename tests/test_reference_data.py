@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import event, update
+
+from app.database import async_session, engine
+from app.models.reference import Member
+from app.services.claim_processor import ClaimProcessor
+from app.services.reference_data import (
+    ReferenceDataCache,
+    ReferenceSnapshot,
+    bump_reference_version,
+    seed_reference_data,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _loaded_cache():
+    cache = ReferenceDataCache(ReferenceSnapshot.from_mock_data())
+    async with async_session() as db:
+        assert await seed_reference_data(db)
+        await db.commit()
+        await cache.load(db)
+    return cache
+
+
+async def test_seeded_snapshot_matches_mock_data():
+    cache = await _loaded_cache()
+    seed = ReferenceSnapshot.from_mock_data()
+    assert cache.snapshot.version == 1
+    assert dict(cache.snapshot.member_status) == dict(seed.member_status)
+    assert cache.snapshot.providers == seed.providers
+    assert dict(cache.snapshot.benefit_limits) == dict(seed.benefit_limits)
+    assert dict(cache.snapshot.procedure_avg_costs) == dict(
+        seed.procedure_avg_costs
+    )
+
+    async with async_session() as db:
+        assert not await seed_reference_data(db)
+
+
+async def test_version_bump_swaps_snapshot():
+    cache = await _loaded_cache()
+    processor = ClaimProcessor(reference=cache)
+    assert processor.adjudicate("M125", "H456", "D001", "P001", 100).status == (
+        "REJECTED"
+    )
+
+    async with async_session() as db:
+        await db.execute(
+            update(Member).where(Member.member_id == "M125").values(status="active")
+        )
+        await db.commit()
+        # Data changed but version did not: the snapshot is left alone.
+        assert not await cache.refresh_if_changed(db)
+
+        await bump_reference_version(db)
+        await db.commit()
+        old_snapshot = cache.snapshot
+        assert await cache.refresh_if_changed(db)
+
+    assert cache.snapshot.version == 2
+    assert old_snapshot.member_status["M125"] == "inactive"
+    assert processor.adjudicate("M125", "H456", "D001", "P001", 100).status == (
+        "APPROVED"
+    )
+    columns = processor.adjudicate_many(["M125"], ["H456"], ["D001"], ["P001"], [100])
+    assert columns.status.tolist() == ["APPROVED"]
+
+
+async def test_adjudication_does_not_query_database():
+    cache = await _loaded_cache()
+    processor = ClaimProcessor(reference=cache)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        for _ in range(10):
+            processor.adjudicate("M123", "H456", "D001", "P001", 30000)
+        processor.adjudicate_many(["M123"], ["H456"], ["D001"], ["P001"], [1])
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    assert statements == []
@@ -0,0 +1,163 @@
+import json
+import os
+
+import pytest
+
+from app.services.claim_processor import ClaimProcessor
+from app.services.rules import (
+    DEFAULT_RULES_PATH,
+    RuleConfigError,
+    RuleSet,
+    evaluation_order,
+    read_rules,
+)
+
+
+def _write_rules(path, short_circuit=False, extra=()):
+    config = json.loads(DEFAULT_RULES_PATH.read_text())
+    config["short_circuit"] = short_circuit
+    config["rules"].extend(extra)
+    path.write_text(json.dumps(config))
+    return path
+
+
+def _processor(path) -> ClaimProcessor:
+    return ClaimProcessor(rules=RuleSet(path))
+
+
+def test_default_rules_use_columnar_engine():
+    pipeline = ClaimProcessor(rules=RuleSet(DEFAULT_RULES_PATH)).pipeline()
+    assert pipeline.names == (
+        "member_eligibility",
+        "provider",
+        "benefit_limit",
+        "fraud",
+    )
+    assert pipeline.columnar_multiplier == 2.0
+
+
+def test_short_circuit_orders_by_cost_per_rejection(tmp_path):
+    config = read_rules(_write_rules(tmp_path / "rules.json", short_circuit=True))
+    # cost / selectivity: member 20, benefit 40, provider 50, fraud 150.
+    assert [rule["name"] for rule in evaluation_order(config)] == [
+        "member_eligibility",
+        "benefit_limit",
+        "provider",
+        "fraud",
+    ]
+
+
+def test_short_circuit_stops_at_first_rejection(tmp_path):
+    processor = _processor(_write_rules(tmp_path / "rules.json", short_circuit=True))
+    result = processor.adjudicate("M125", "UNKNOWN", "D999", "P999", 10_000)
+    assert result.status == "REJECTED"
+    assert result.rejection_reasons == [
+        "Member M125 is not eligible (status: inactive)"
+    ]
+
+    # Approved claims still go through every rule.
+    result = processor.adjudicate("M123", "H456", "D002", "P001", 45_000)
+    assert result.status == "APPROVED"
+    assert result.fraud_flag is True
+
+
+def test_custom_rules_apply_in_single_and_batch_paths(tmp_path):
+    path = _write_rules(
+        tmp_path / "rules.json",
+        extra=[
+            {
+                "name": "excluded_procedure",
+                "type": "deny",
+                "field": "procedure_code",
+                "values": ["P002"],
+                "reason": "Procedure {procedure_code} is excluded",
+            },
+            {"name": "ceiling", "type": "max_amount", "limit": 60_000},
+        ],
+    )
+    processor = _processor(path)
+    assert processor.pipeline().columnar_multiplier is None
+
+    rows = [
+        ("M123", "H456", "D001", "P002", 1_000),
+        ("M123", "H456", "D002", "P001", 70_000),
+        ("M123", "H456", "D001", "P001", 30_000),
+    ]
+    columns = processor.adjudicate_many(*[list(c) for c in zip(*rows)])
+    for i, row in enumerate(rows):
+        expected = processor.adjudicate(*row)
+        assert columns.status[i] == expected.status
+        assert columns.approved_amount[i] == expected.approved_amount
+        assert bool(columns.fraud_flag[i]) is expected.fraud_flag
+        assert columns.reasons(i) == expected.rejection_reasons
+
+    assert columns.reasons(0) == ["Procedure P002 is excluded"]
+    assert columns.reasons(1) == ["Claim amount 70000 exceeds 60000"]
+    assert columns.status.tolist() == ["REJECTED", "REJECTED", "APPROVED"]
+
+
+def test_rules_reload_when_file_changes(tmp_path):
+    path = _write_rules(tmp_path / "rules.json")
+    rules = RuleSet(path)
+    processor = ClaimProcessor(rules=rules)
+    assert processor.adjudicate("M123", "H456", "D001", "P001", 30_000).status == (
+        "APPROVED"
+    )
+
+    _write_rules(
+        path,
+        extra=[{"name": "ceiling", "type": "max_amount", "limit": 20_000}],
+    )
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert rules.reload_if_changed() is True
+    assert rules.reload_if_changed() is False
+    assert processor.adjudicate("M123", "H456", "D001", "P001", 30_000).status == (
+        "REJECTED"
+    )
+
+
+def test_invalid_reload_keeps_previous_rules(tmp_path):
+    path = _write_rules(tmp_path / "rules.json")
+    rules = RuleSet(path)
+    config = rules.config
+
+    path.write_text(json.dumps({"rules": [{"name": "x", "type": "nope"}]}))
+    with pytest.raises(RuleConfigError, match="unknown type"):
+        rules.load()
+    assert rules.config is config
+
+    # The poller reports a bad edit once, then waits for the next one.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    with pytest.raises(RuleConfigError, match="unknown type"):
+        rules.reload_if_changed()
+    assert rules.reload_if_changed() is False
+    assert rules.config is config
+
+
+@pytest.mark.parametrize("reason", ["{amount} too high", "over {limit", 42])
+def test_bad_reason_template_keeps_previous_rules(tmp_path, reason):
+    path = _write_rules(tmp_path / "rules.json")
+    rules = RuleSet(path)
+    config = rules.config
+
+    extra = [{"name": "ceiling", "type": "max_amount", "limit": 1, "reason": reason}]
+    _write_rules(path, extra=extra)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    with pytest.raises(RuleConfigError, match="ceiling: bad reason"):
+        rules.reload_if_changed()
+    assert rules.config is config
+
+    # Claims the rule would have matched still adjudicate.
+    result = ClaimProcessor(rules=rules).adjudicate("M123", "H456", "D001", "P001", 10)
+    assert result.status == "APPROVED"
+
+
+def test_yaml_rules(tmp_path):
+    yaml = pytest.importorskip("yaml")
+    config = json.loads(DEFAULT_RULES_PATH.read_text())
+    path = tmp_path / "rules.yaml"
+    path.write_text(yaml.safe_dump(config))
+    assert read_rules(path)["rules"][0]["name"] == "member_eligibility"
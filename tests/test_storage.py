@@ -0,0 +1,54 @@
+import base64
+import json
+
+import pytest
+
+from app.database import engine
+from tests.conftest import AUTH_HEADERS
+
+pytestmark = pytest.mark.asyncio
+
+CLAIM = {
+    "member_id": "M125",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 1234.56,
+}
+
+
+async def test_claims_are_stored_compactly(client):
+    resp = await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+    claim_id = resp.json()["claim_id"]
+
+    async with engine.connect() as conn:
+        row = (
+            await conn.exec_driver_sql(
+                "SELECT typeof(id), length(id), claim_amount, approved_amount, "
+                "status, rejection_reasons FROM claims"
+            )
+        ).one()
+    assert row[:5] == ("blob", 16, 123456, 0, 3)
+    assert json.loads(row[5]) == ["Member M125 is not eligible (status: inactive)"]
+
+    detail = (await client.get(f"/claims/{claim_id}", headers=AUTH_HEADERS)).json()
+    assert detail["claim_id"] == claim_id
+    assert detail["claim_amount"] == 1234.56
+    assert detail["status"] == "REJECTED"
+    assert detail["rejection_reasons"] == [
+        "Member M125 is not eligible (status: inactive)"
+    ]
+
+
+async def test_unknown_status_and_ids_match_nothing(client):
+    await client.post("/claims", json=CLAIM, headers=AUTH_HEADERS)
+
+    resp = await client.get("/claims?status=unknown", headers=AUTH_HEADERS)
+    assert resp.json()["total"] == 0
+    resp = await client.get("/claims/not-a-uuid", headers=AUTH_HEADERS)
+    assert resp.status_code == 404
+
+    raw = json.dumps(["2026-01-01T00:00:00+00:00", "not-a-uuid"]).encode()
+    cursor = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    resp = await client.get(f"/claims?cursor={cursor}", headers=AUTH_HEADERS)
+    assert resp.status_code == 400
@@ -0,0 +1,123 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.config import settings
+from app.database import async_session, engine
+from app.models.claim import Claim
+from app.services.claim_counters import count_claims
+from app.services.write_coalescer import ClaimWriteCoalescer
+from tests.conftest import AUTH_HEADERS
+
+pytestmark = pytest.mark.asyncio
+
+ID_A, ID_B, ID_C = (str(uuid.UUID(int=i)) for i in (1, 2, 3))
+
+CLAIM = {
+    "member_id": "M123",
+    "provider_id": "H456",
+    "diagnosis_code": "D001",
+    "procedure_code": "P001",
+    "claim_amount": 30000,
+}
+
+
+@pytest.fixture
+def coalescing(monkeypatch):
+    monkeypatch.setattr(settings, "write_coalesce_enabled", True)
+
+
+class CommitCounter:
+    def __init__(self):
+        self.commits = 0
+
+    def __call__(self, conn):
+        self.commits += 1
+
+
+async def test_concurrent_submissions_share_commits(client, coalescing):
+    counter = CommitCounter()
+    event.listen(engine.sync_engine, "commit", counter)
+    try:
+        responses = await asyncio.gather(
+            *(
+                client.post(
+                    "/claims",
+                    json={**CLAIM, "claim_amount": 1000 + i},
+                    headers=AUTH_HEADERS,
+                )
+                for i in range(20)
+            )
+        )
+    finally:
+        event.remove(engine.sync_engine, "commit", counter)
+
+    assert [r.status_code for r in responses] == [201] * 20
+    ids = {r.json()["claim_id"] for r in responses}
+    assert len(ids) == 20
+    assert counter.commits < 20
+
+    async with async_session() as db:
+        stored = (await db.execute(select(func.count(Claim.id)))).scalar_one()
+        assert stored == 20
+        assert await count_claims(db, "M123", None, None) == 20
+
+    detail = await client.get(f"/claims/{ids.pop()}", headers=AUTH_HEADERS)
+    assert detail.status_code == 200
+
+
+def _row(claim_id, amount):
+    return {
+        "id": claim_id,
+        "member_id": "M123",
+        "provider_id": "H456",
+        "diagnosis_code": "D001",
+        "procedure_code": "P001",
+        "claim_amount": amount,
+        "status": "APPROVED",
+        "fraud_flag": False,
+        "approved_amount": amount,
+        "rejection_reasons": None,
+        "created_at": datetime.now(timezone.utc),
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+
+async def test_failed_row_only_fails_its_caller():
+    coalescer = ClaimWriteCoalescer(async_session, window=0.05, max_batch=10)
+    results = await asyncio.gather(
+        coalescer.submit(_row(ID_A, 1)),
+        coalescer.submit(_row(ID_A, 2)),
+        coalescer.submit(_row(ID_B, 3)),
+        return_exceptions=True,
+    )
+    await coalescer.stop()
+
+    assert results[0]["id"] == ID_A
+    assert isinstance(results[1], Exception)
+    assert results[2]["id"] == ID_B
+
+
+async def test_stop_flushes_queued_rows():
+    coalescer = ClaimWriteCoalescer(async_session, window=10, max_batch=100)
+    pending = asyncio.ensure_future(coalescer.submit(_row(ID_C, 1)))
+    await asyncio.sleep(0)
+    await coalescer.stop()
+    assert (await pending)["id"] == ID_C
+
+
+async def test_stop_after_the_task_ended():
+    coalescer = ClaimWriteCoalescer(async_session, window=0, max_batch=100)
+    await coalescer.submit(_row(ID_A, 1))
+    coalescer._task.cancel()
+    await asyncio.sleep(0)
+    await coalescer.stop()
+
+    # The next task keeps running after its first batch.
+    assert (await coalescer.submit(_row(ID_B, 2)))["id"] == ID_B
+    await asyncio.sleep(0)
+    assert not coalescer._task.done()
+    await coalescer.stop()